@@ -0,0 +1,159 @@
+"""
+Deterministic generative model answering every pipeline prompt with canned
+responses, so benchmarks measure the SDK and the database rather than an LLM.
+"""
+
+import json
+import time
+import zlib
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.fixtures.prompts import (
+    CREATE_ONTOLOGY_SYSTEM,
+    CYPHER_GEN_SYSTEM,
+    GRAPH_QA_SYSTEM,
+)
+from graphrag_sdk.models import (
+    GenerativeModel,
+    GenerativeModelChatSession,
+    GenerationResponse,
+    FinishReason,
+)
+
+
+def benchmark_ontology() -> Ontology:
+    """
+    Returns the ontology of the canned extractions: people knowing each other.
+
+    Returns:
+        Ontology: The benchmark ontology.
+    """
+    person = Entity(
+        "Person",
+        [
+            Attribute("name", AttributeType.STRING, True, True),
+            Attribute("description", AttributeType.STRING, False, False),
+        ],
+    )
+    return Ontology(
+        [person],
+        [
+            Relation(
+                "KNOWS",
+                "Person",
+                "Person",
+                [Attribute("since", AttributeType.NUMBER, False, False)],
+            )
+        ],
+    )
+
+
+class FakeGenerativeModel(GenerativeModel):
+    """
+    Generative model returning canned responses after a fixed latency.
+
+    The response depends on the system instruction the model is bound to: ontology
+    creation returns the benchmark ontology, Cypher generation a fixed query, question
+    answering a fixed size answer and data extraction `entities_per_document` people
+    and `relations_per_document` relations. The people of a document are drawn from a
+    pool of `entity_pool` names by hashing the prompt, so runs are reproducible and
+    documents share entities, exercising merges.
+
+    Args:
+        latency (float): Seconds each response takes.
+        entities_per_document (int): The number of entities extracted from a document.
+        relations_per_document (int): The number of relations extracted from a document.
+        entity_pool (int): The number of distinct entities across all documents.
+        description_size (int): The number of characters of each entity description.
+        answer_size (int): The number of characters of question answers.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        entities_per_document: int = 20,
+        relations_per_document: int = 20,
+        entity_pool: int = 100000,
+        description_size: int = 100,
+        answer_size: int = 500,
+        system_instruction: str | None = None,
+    ):
+        self.latency = latency
+        self.entities_per_document = entities_per_document
+        self.relations_per_document = relations_per_document
+        self.entity_pool = entity_pool
+        self.description_size = description_size
+        self.answer_size = answer_size
+        self.system_instruction = system_instruction
+
+    def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
+        model = FakeGenerativeModel(**{**self.to_json(), "system_instruction": system_instruction})
+        model.response_cache = self.response_cache
+        model.rate_limiter = self.rate_limiter
+        return model
+
+    def start_chat(self, args: dict | None = None) -> GenerativeModelChatSession:
+        return FakeGenerativeModelChatSession(self)
+
+    def ask(self, message: str) -> GenerationResponse:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return GenerationResponse(self._respond(message), FinishReason.STOP)
+
+    def _respond(self, message: str) -> str:
+        if self.system_instruction == CREATE_ONTOLOGY_SYSTEM:
+            return json.dumps(benchmark_ontology().to_json())
+        if self.system_instruction == CYPHER_GEN_SYSTEM:
+            return (
+                "```cypher\nMATCH (a:Person)-[r:KNOWS]->(b:Person) "
+                "RETURN a.name, b.name, r.since LIMIT 20\n```"
+            )
+        if self.system_instruction == GRAPH_QA_SYSTEM:
+            return ("answer " * (self.answer_size // 7 + 1))[: self.answer_size]
+        return json.dumps(self._extraction(zlib.crc32(message.encode("utf-8"))))
+
+    def _extraction(self, seed: int) -> dict:
+        names = [
+            f"Person {(seed + i * 7919) % self.entity_pool}"
+            for i in range(self.entities_per_document)
+        ]
+        description = "d" * self.description_size
+        entities = [
+            {"label": "Person", "attributes": {"name": name, "description": description}}
+            for name in names
+        ]
+        relations = [
+            {
+                "label": "KNOWS",
+                "source": {"label": "Person", "attributes": {"name": names[i % len(names)]}},
+                "target": {"label": "Person", "attributes": {"name": names[(i + 1) % len(names)]}},
+                "attributes": {"since": 1900 + (seed + i) % 120},
+            }
+            for i in range(self.relations_per_document if len(names) > 0 else 0)
+        ]
+        return {"entities": entities, "relations": relations}
+
+    def to_json(self) -> dict:
+        return {
+            "latency": self.latency,
+            "entities_per_document": self.entities_per_document,
+            "relations_per_document": self.relations_per_document,
+            "entity_pool": self.entity_pool,
+            "description_size": self.description_size,
+            "answer_size": self.answer_size,
+        }
+
+    @staticmethod
+    def from_json(json: dict) -> "GenerativeModel":
+        return FakeGenerativeModel(**json)
+
+
+class FakeGenerativeModelChatSession(GenerativeModelChatSession):
+
+    def __init__(self, model: FakeGenerativeModel):
+        self.model = model
+
+    def send_message(self, message: str) -> GenerationResponse:
+        return self.model.ask(message)
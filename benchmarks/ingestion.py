@@ -0,0 +1,219 @@
+"""
+Benchmark of the SDK overhead in ingestion, ontology creation and question answering.
+
+A deterministic fake model replaces the LLM, so the figures only account for the
+SDK and FalkorDB. Each scenario reports its throughput, CPU time per unit of work
+and the peak resident memory of the process, as JSON. The peak memory is a process
+high-water mark, run a single scenario per process to attribute it.
+
+Usage:
+    python -m benchmarks.ingestion --host 127.0.0.1 --port 6379 --documents 1000
+    python -m benchmarks.ingestion --scenario extract --latency 0.05 --output extract.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import resource
+import threading
+from typing import Iterator
+from falkordb import FalkorDB, Graph
+from graphrag_sdk.kg import KnowledgeGraph
+from graphrag_sdk.document import Document
+from graphrag_sdk.source import AbstractSource
+from graphrag_sdk.model_config import KnowledgeGraphModelConfig
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from graphrag_sdk.steps.create_ontology_step import CreateOntologyStep
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.metrics import InMemoryMetrics, set_metrics
+from benchmarks.fake_model import FakeGenerativeModel, benchmark_ontology
+
+
+class SyntheticSource(AbstractSource):
+    """
+    Source of generated documents of a fixed number of words.
+    """
+
+    def __init__(self, documents: int, words: int):
+        super().__init__(f"synthetic://{documents}x{words}")
+        self.documents = documents
+        self.words = words
+
+    def load(self) -> Iterator[Document]:
+        for i in range(self.documents):
+            yield Document(f"Document {i}. " + "lorem ipsum " * (self.words // 2))
+
+
+class CountingGraph:
+    """
+    Graph proxy counting the queries and the `UNWIND` rows written through it.
+    """
+
+    def __init__(self, graph: Graph):
+        self._graph = graph
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.rows = 0
+
+    def query(self, q: str, params: dict = None, *args, **kwargs):
+        with self._lock:
+            self.queries += 1
+            self.rows += len((params or {}).get("rows", []))
+        return self._graph.query(q, params, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._graph, name)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(run) -> dict:
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    run()
+    return {
+        "wall_seconds": time.perf_counter() - start_wall,
+        "cpu_seconds": time.process_time() - start_cpu,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _extract(db: FalkorDB, model: FakeGenerativeModel, args) -> dict:
+    ontology = benchmark_ontology()
+    graph = db.select_graph("bench_extract")
+    ontology.ensure_indexes(graph)
+    counting_graph = CountingGraph(graph)
+    step = ExtractDataStep(
+        sources=[SyntheticSource(args.documents, args.words)],
+        ontology=ontology,
+        model=model,
+        graph=counting_graph,
+        config={
+            "max_workers": args.workers,
+            "max_input_tokens": 500000,
+            "write_batch_size": 500,
+        },
+    )
+
+    try:
+        metrics = _measure(step.run)
+    finally:
+        graph.delete()
+
+    entities = args.documents * model.entities_per_document
+    return {
+        **metrics,
+        "documents_per_second": args.documents / metrics["wall_seconds"],
+        "db_queries_per_second": counting_graph.queries / metrics["wall_seconds"],
+        "db_rows_per_second": counting_graph.rows / metrics["wall_seconds"],
+        "cpu_ms_per_entity": 1000 * metrics["cpu_seconds"] / max(entities, 1),
+    }
+
+
+def _create_ontology(model: FakeGenerativeModel, args) -> dict:
+    step = CreateOntologyStep(
+        sources=[SyntheticSource(args.documents, args.words)],
+        ontology=Ontology(),
+        model=model,
+        config={"max_workers": args.workers, "max_input_tokens": 500000},
+    )
+
+    metrics = _measure(step.run)
+    return {
+        **metrics,
+        "documents_per_second": args.documents / metrics["wall_seconds"],
+        "cpu_ms_per_document": 1000 * metrics["cpu_seconds"] / max(args.documents, 1),
+    }
+
+
+def _ask(db: FalkorDB, model: FakeGenerativeModel, args) -> dict:
+    kg = KnowledgeGraph(
+        "bench_ask",
+        KnowledgeGraphModelConfig.with_model(model),
+        benchmark_ontology(),
+        db=db,
+    )
+    latencies = []
+
+    def run():
+        for i in range(args.questions):
+            start = time.perf_counter()
+            kg.ask(f"Who does person {i} know?")
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        kg.process_sources([SyntheticSource(min(args.documents, 100), args.words)])
+        metrics = _measure(run)
+    finally:
+        kg.delete()
+
+    latencies.sort()
+    return {
+        **metrics,
+        "questions_per_second": args.questions / metrics["wall_seconds"],
+        "cpu_ms_per_question": 1000 * metrics["cpu_seconds"] / max(args.questions, 1),
+        "p50_latency_ms": 1000 * latencies[len(latencies) // 2],
+        "p99_latency_ms": 1000 * latencies[int(0.99 * (len(latencies) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument(
+        "--scenario", choices=["all", "extract", "ontology", "ask"], default="all"
+    )
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake model latency in seconds")
+    parser.add_argument("--entities", type=int, default=20, help="entities per document")
+    parser.add_argument("--relations", type=int, default=20, help="relations per document")
+    parser.add_argument("--entity-pool", type=int, default=100000)
+    parser.add_argument("--stages", action="store_true", help="report per stage timings")
+    parser.add_argument("--output", help="file the JSON results are written to")
+    args = parser.parse_args()
+
+    model = FakeGenerativeModel(
+        latency=args.latency,
+        entities_per_document=args.entities,
+        relations_per_document=args.relations,
+        entity_pool=args.entity_pool,
+    )
+    scenarios = {
+        "extract": lambda db: _extract(db, model, args),
+        "ontology": lambda db: _create_ontology(model, args),
+        "ask": lambda db: _ask(db, model, args),
+    }
+
+    metrics = InMemoryMetrics()
+    if args.stages:
+        set_metrics(metrics)
+
+    # Ontology creation alone runs without a database
+    db = FalkorDB(host=args.host, port=args.port) if args.scenario != "ontology" else None
+    results = {"config": {**vars(args), "model": model.to_json()}, "results": {}}
+    for name, scenario in scenarios.items():
+        if args.scenario not in ("all", name):
+            continue
+        metrics.clear()
+        results["results"][name] = scenario(db)
+        if args.stages:
+            results["results"][name]["stages"] = metrics.summary()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
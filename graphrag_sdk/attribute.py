@@ -145,6 +145,15 @@ class Attribute:
             "required": self.required,
         }
 
+    def type_string(self) -> str:
+        """
+        Returns the attribute type annotated with its uniqueness and requirement status.
+
+        Returns:
+            str: The annotated type, e.g. "string!*".
+        """
+        return f"{self.type}{'!' if self.unique else ''}{'*' if self.required else ''}"
+
     def __str__(self) -> str:
         """
         Returns a string representation of the Attribute object.
@@ -154,4 +163,4 @@ class Attribute:
         Returns:
             str: A string representation of the Attribute object.
         """
-        return f"{self.name}: \"{self.type}{'!' if self.unique else ''}{'*' if self.required else ''}\""
+        return f"{self.name}: \"{self.type_string()}\""
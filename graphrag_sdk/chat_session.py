@@ -3,7 +3,12 @@ from graphrag_sdk.model_config import KnowledgeGraphModelConfig
 from graphrag_sdk.steps.graph_query_step import GraphQueryGenerationStep
 from graphrag_sdk.steps.qa_step import QAStep
 from graphrag_sdk.fixtures.prompts import GRAPH_QA_SYSTEM, CYPHER_GEN_SYSTEM
+from graphrag_sdk.query_cache import QueryResultCache
+from graphrag_sdk.query_guard import QueryGuard
+from graphrag_sdk.context_builder import ContextBuilder
+from graphrag_sdk.models.history import HistoryPolicy
 from falkordb import Graph
+from typing import Iterator
 
 
 class ChatSession:
@@ -14,6 +19,10 @@ class ChatSession:
         model_config (KnowledgeGraphModelConfig): The model configuration to use.
         ontology (Ontology): The ontology to use.
         graph (Graph): The graph to query.
+        query_cache (QueryResultCache | None): The cache of query results, if any.
+        history_policy (HistoryPolicy | None): The policy bounding the history of the model sessions, if any.
+        query_guard (QueryGuard | None): The guard against expensive generated queries, if any.
+        context_builder (ContextBuilder | None): The serializer of query results, defaults to ContextBuilder().
 
     Examples:
         >>> from graphrag_sdk import KnowledgeGraph, Orchestrator
@@ -25,7 +34,16 @@ class ChatSession:
         >>> chat_session.send_message("What is the capital of France?")
     """
 
-    def __init__(self, model_config: KnowledgeGraphModelConfig, ontology: Ontology, graph: Graph):
+    def __init__(
+        self,
+        model_config: KnowledgeGraphModelConfig,
+        ontology: Ontology,
+        graph: Graph,
+        query_cache: QueryResultCache | None = None,
+        history_policy: HistoryPolicy | None = None,
+        query_guard: QueryGuard | None = None,
+        context_builder: ContextBuilder | None = None,
+    ):
         """
         Initializes a new ChatSession object.
 
@@ -33,6 +51,10 @@ class ChatSession:
             model_config (KnowledgeGraphModelConfig): The model configuration.
             ontology (Ontology): The ontology object.
             graph (Graph): The graph object.
+            query_cache (QueryResultCache | None): The cache of query results.
+            history_policy (HistoryPolicy | None): The policy bounding the model sessions history.
+            query_guard (QueryGuard | None): The guard against expensive generated queries.
+            context_builder (ContextBuilder | None): The serializer of query results.
 
         Attributes:
             model_config (KnowledgeGraphModelConfig): The model configuration.
@@ -44,14 +66,18 @@ class ChatSession:
         self.model_config = model_config
         self.graph = graph
         self.ontology = ontology
+        self.query_cache = query_cache
+        self.query_guard = query_guard
+        self.context_builder = context_builder
+        args = {"history_policy": history_policy} if history_policy is not None else None
         self.cypher_chat_session = (
             model_config.cypher_generation.with_system_instruction(
                 CYPHER_GEN_SYSTEM.replace("#ONTOLOGY", str(ontology.to_json()))
-            ).start_chat()
+            ).start_chat(args)
         )
         self.qa_chat_session = model_config.qa.with_system_instruction(
             GRAPH_QA_SYSTEM
-        ).start_chat()
+        ).start_chat(args)
 
     def send_message(self, message: str):
         """
@@ -67,6 +93,9 @@ class ChatSession:
             graph=self.graph,
             chat_session=self.cypher_chat_session,
             ontology=self.ontology,
+            query_cache=self.query_cache,
+            query_guard=self.query_guard,
+            context_builder=self.context_builder,
         )
 
         (context, cypher) = cypher_step.run(message)
@@ -81,3 +110,34 @@ class ChatSession:
         answer = qa_step.run(message, cypher, context)
 
         return answer
+
+    def send_message_stream(self, message: str) -> Iterator[str]:
+        """
+        Sends a message to the chat session, yielding the response as it is generated.
+
+        Args:
+            message (str): The message to send.
+
+        Returns:
+            Iterator[str]: The response chunks.
+        """
+        cypher_step = GraphQueryGenerationStep(
+            graph=self.graph,
+            chat_session=self.cypher_chat_session,
+            ontology=self.ontology,
+            query_cache=self.query_cache,
+            query_guard=self.query_guard,
+            context_builder=self.context_builder,
+        )
+
+        (context, cypher) = cypher_step.run(message)
+
+        if not cypher or len(cypher) == 0:
+            yield "I am sorry, I could not find the answer to your question"
+            return
+
+        qa_step = QAStep(
+            chat_session=self.qa_chat_session,
+        )
+
+        yield from qa_step.run_stream(message, cypher, context)
@@ -0,0 +1,178 @@
+import re
+import logging
+from typing import Iterator
+from graphrag_sdk.document import Document
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Average number of characters per token, used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+# Boundaries a document is split on, from the coarsest to the finest
+_BOUNDARIES = [
+    re.compile(r"\n\s*\n"),  # paragraphs
+    re.compile(r"(?<=[.!?])\s+"),  # sentences
+    re.compile(r"\s+"),  # words
+]
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.debug(f"Failed to load tiktoken encoding, estimating tokens: {e}")
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens of a text, using tiktoken when installed
+    and estimating from the text length otherwise.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The number of tokens.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class TokenChunker:
+    """
+    Splits documents into chunks fitting a token budget, cutting on paragraph,
+    then sentence, then word boundaries, with consecutive chunks overlapping.
+
+    Chunks are returned as documents holding the offset of their content
+    within the original document, so nothing beyond the budget is dropped.
+    The overlap is made of whole paragraphs or sentences, so it may fall short
+    of `overlap_tokens` when these are long.
+
+    Args:
+        max_tokens (int): The maximum number of tokens per chunk.
+        overlap_tokens (int): The number of tokens repeated at the start of the following chunk.
+
+    Examples:
+        >>> chunker = TokenChunker(max_tokens=4096, overlap_tokens=200)
+        >>> for chunk in chunker.split(document):
+        ...     print(chunk.offset, len(chunk.content))
+    """
+
+    def __init__(self, max_tokens: int = 4096, overlap_tokens: int = 200):
+        if max_tokens <= 0:
+            raise Exception("max_tokens should be a positive integer")
+        if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+            raise Exception("overlap_tokens should be between 0 and max_tokens")
+
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    @staticmethod
+    def from_config(config: dict) -> "TokenChunker":
+        """
+        Creates the chunker of a step from its model config: chunks fill the model input
+        budget `max_input_tokens` unless `chunk_size_tokens` sets a smaller size, and the
+        overlap `chunk_overlap_tokens` is capped to a quarter of the chunk size.
+
+        Args:
+            config (dict): The step config.
+
+        Returns:
+            TokenChunker: The chunker.
+        """
+        max_tokens = min(
+            config.get("chunk_size_tokens") or config["max_input_tokens"],
+            config["max_input_tokens"],
+        )
+        overlap_tokens = min(config.get("chunk_overlap_tokens", 200), max_tokens // 4)
+        return TokenChunker(max_tokens, overlap_tokens)
+
+    def split(self, document: Document) -> Iterator[Document]:
+        """
+        Splits a document into chunks.
+
+        Args:
+            document (Document): The document to split.
+
+        Returns:
+            Iterator[Document]: The chunks, in order.
+        """
+        text = document.content
+        if count_tokens(text) <= self.max_tokens:
+            yield document
+            return
+
+        spans = self._spans(text, 0, len(text), 0)
+        tokens = [count_tokens(text[start:end]) for (start, end) in spans]
+
+        i = 0
+        while i < len(spans):
+            # Pack as many spans as fit the budget
+            j = i
+            size = 0
+            while j < len(spans) and (j == i or size + tokens[j] <= self.max_tokens):
+                size += tokens[j]
+                j += 1
+
+            start, end = spans[i][0], spans[j - 1][1]
+            yield Document(text[start:end], offset=document.offset + start)
+
+            if j == len(spans):
+                break
+
+            # Step back over the trailing spans fitting the overlap
+            k = j
+            overlap = 0
+            while k - 1 > i and overlap + tokens[k - 1] <= self.overlap_tokens:
+                overlap += tokens[k - 1]
+                k -= 1
+            i = k
+
+    def _spans(self, text: str, start: int, end: int, level: int) -> list[tuple[int, int]]:
+        """
+        Splits text[start:end] into contiguous spans each fitting the budget.
+        """
+        if count_tokens(text[start:end]) <= self.max_tokens:
+            return [(start, end)]
+
+        if level == len(_BOUNDARIES):
+            return self._hard_split(text, start, end)
+
+        # Keep each boundary attached to the span preceding it
+        cuts = [
+            m.end()
+            for m in _BOUNDARIES[level].finditer(text, start, end)
+            if start < m.end() < end
+        ]
+        if len(cuts) == 0:
+            return self._spans(text, start, end, level + 1)
+
+        spans = []
+        for (s, e) in zip([start, *cuts], [*cuts, end]):
+            spans.extend(self._spans(text, s, e, level + 1))
+        return spans
+
+    def _hard_split(self, text: str, start: int, end: int) -> list[tuple[int, int]]:
+        """
+        Splits text without boundaries, e.g. a long URL, by length.
+        """
+        tokens = count_tokens(text[start:end])
+        step = max(1, (end - start) * self.max_tokens // tokens)
+        spans = []
+        while start < end:
+            spans.append((start, min(start + step, end)))
+            start += step
+        return spans
@@ -0,0 +1,143 @@
+import logging
+import threading
+from falkordb import FalkorDB
+from redis import BlockingConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """
+    Shares pooled FalkorDB clients across knowledge graphs and agents in a process.
+
+    Clients are keyed by server and credentials, so every knowledge graph connecting
+    to the same server reuses one client and its connection pool. Each query checks a
+    connection out of the pool for its duration only, so threads and tasks run their
+    queries on separate connections, up to `max_connections`. Once the pool is
+    exhausted, callers wait up to `timeout` seconds for a connection to be returned.
+    Idle connections are checked with a PING before reuse when they were not used for
+    `health_check_interval` seconds, so broken connections are replaced transparently.
+
+    Examples:
+        >>> db = ConnectionManager.get("127.0.0.1", 6379, max_connections=32)
+        >>> kg_a = KnowledgeGraph("movies", model_config, ontology, db=db)
+        >>> kg_b = KnowledgeGraph("books", model_config, ontology, db=db)
+    """
+
+    _clients: dict[tuple, FalkorDB] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def create_pool(
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        username: str | None = None,
+        password: str | None = None,
+        max_connections: int = 64,
+        health_check_interval: int = 30,
+        timeout: float | None = 20,
+    ) -> BlockingConnectionPool:
+        """
+        Creates a bounded connection pool to a FalkorDB server.
+        No connection is opened until one is checked out.
+
+        Args:
+            host (str): FalkorDB hostname.
+            port (int): FalkorDB port number.
+            username (str | None): FalkorDB username.
+            password (str | None): FalkorDB password.
+            max_connections (int): The maximum number of open connections.
+            health_check_interval (int): Idle seconds after which a connection is checked before reuse.
+            timeout (float | None): Seconds to wait for a free connection, None to wait forever.
+
+        Returns:
+            BlockingConnectionPool: The connection pool.
+        """
+        return BlockingConnectionPool(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            max_connections=max_connections,
+            health_check_interval=health_check_interval,
+            timeout=timeout,
+            decode_responses=True,
+        )
+
+    @staticmethod
+    def get(
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        username: str | None = None,
+        password: str | None = None,
+        max_connections: int = 64,
+        health_check_interval: int = 30,
+        timeout: float | None = 20,
+    ) -> FalkorDB:
+        """
+        Returns the shared client of a FalkorDB server, creating it on first use.
+        The pool settings only apply when the client is created.
+
+        Args:
+            host (str): FalkorDB hostname.
+            port (int): FalkorDB port number.
+            username (str | None): FalkorDB username.
+            password (str | None): FalkorDB password.
+            max_connections (int): The maximum number of open connections.
+            health_check_interval (int): Idle seconds after which a connection is checked before reuse.
+            timeout (float | None): Seconds to wait for a free connection, None to wait forever.
+
+        Returns:
+            FalkorDB: The shared client.
+        """
+        key = (host, port, username, password)
+        with ConnectionManager._lock:
+            db = ConnectionManager._clients.get(key)
+            if db is None:
+                logger.debug(
+                    f"Creating FalkorDB client for {host}:{port} with {max_connections} connections"
+                )
+                pool = ConnectionManager.create_pool(
+                    host,
+                    port,
+                    username,
+                    password,
+                    max_connections,
+                    health_check_interval,
+                    timeout,
+                )
+                db = FalkorDB(connection_pool=pool)
+                ConnectionManager._clients[key] = db
+            return db
+
+    @staticmethod
+    def close(
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        username: str | None = None,
+        password: str | None = None,
+    ) -> None:
+        """
+        Closes the shared client of a FalkorDB server and its connections.
+
+        Args:
+            host (str): FalkorDB hostname.
+            port (int): FalkorDB port number.
+            username (str | None): FalkorDB username.
+            password (str | None): FalkorDB password.
+        """
+        with ConnectionManager._lock:
+            db = ConnectionManager._clients.pop((host, port, username, password), None)
+        if db is not None:
+            db.connection.connection_pool.disconnect()
+
+    @staticmethod
+    def close_all() -> None:
+        """
+        Closes every shared client and their connections.
+        """
+        with ConnectionManager._lock:
+            clients = list(ConnectionManager._clients.values())
+            ConnectionManager._clients.clear()
+        for db in clients:
+            db.connection.connection_pool.disconnect()
@@ -0,0 +1,232 @@
+import re
+import logging
+from falkordb import Node, Edge, Path
+from graphrag_sdk.chunker import count_tokens
+from graphrag_sdk.cypher_parser import tokenize_cypher
+from graphrag_sdk.metrics import get_metrics
+from graphrag_sdk.vector_index import EMBEDDING_ATTRIBUTE
+
+logger = logging.getLogger(__name__)
+
+_WORD_REGEX = re.compile(r"\w+")
+
+
+class Context:
+    """
+    The query results serialized for a QA prompt, see `ContextBuilder`.
+
+    Args:
+        text (str): The serialized results.
+        rows (int): The number of rows in the results.
+        included_rows (int): The number of rows serialized.
+        tokens (int): The number of tokens of the header and rows.
+    """
+
+    def __init__(self, text: str, rows: int, included_rows: int, tokens: int):
+        self.text = text
+        self.rows = rows
+        self.included_rows = included_rows
+        self.tokens = tokens
+
+    @property
+    def dropped_rows(self) -> int:
+        return self.rows - self.included_rows
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class ContextBuilder:
+    """
+    Serializes the results of a Cypher query into a compact context for the QA prompt.
+
+    Results are written as tab separated values under a header of the returned columns.
+    Nodes and relationships are written as their labels and properties, and a node already
+    written is only referred to by its label and id. Identical rows are written once,
+    followed by their count, e.g. "8.0 (x3)", so that counts and averages stay right.
+    Rows are then added until the token budget is reached, the most relevant first:
+    in the query order when it has an ORDER BY clause, otherwise ranked by the number of
+    question words they contain. The context ends with the number of rows left out, if any.
+
+    Args:
+        max_tokens (int): The token budget of the context.
+        max_value_chars (int): The length values are truncated to.
+
+    Examples:
+        >>> kg.with_context_builder(ContextBuilder(max_tokens=2000))
+    """
+
+    def __init__(self, max_tokens: int = 4000, max_value_chars: int = 500):
+        self.max_tokens = max_tokens
+        self.max_value_chars = max_value_chars
+
+    def build(self, result_set: list, cypher: str | None = None, question: str | None = None) -> Context:
+        """
+        Serializes query results.
+
+        Args:
+            result_set (list): The query result set, a list of rows.
+            cypher (str | None): The query, naming the columns and telling whether rows are ordered.
+            question (str | None): The question, ranking unordered rows.
+
+        Returns:
+            Context: The serialized results.
+        """
+        if not isinstance(result_set, list):
+            result_set = [[result_set]]
+        rows = [row if isinstance(row, list) else [row] for row in result_set]
+
+        (columns, ordered) = _return_clause(cypher)
+        lines = []
+        if columns and len(rows) > 0 and len(columns) == len(rows[0]):
+            lines.append("\t".join(columns))
+        budget = self.max_tokens - count_tokens("\n".join(lines))
+
+        # Identical rows are counted before ranking, comparing the values written in full
+        total = len(rows)
+        distinct = {}
+        for row in rows:
+            key = tuple(self._value(value, set()) for value in row)
+            if key in distinct:
+                distinct[key][1] += 1
+            else:
+                distinct[key] = [row, 1]
+        rows = list(distinct.values())
+        if question and not ordered:
+            rows = _rank(rows, list(distinct.keys()), question)
+
+        written_nodes = set()
+        included = 0
+        for row, count in rows:
+            nodes = set(written_nodes)
+            line = "\t".join(self._value(value, nodes) for value in row)
+            if count > 1:
+                line += f" (x{count})"
+            tokens = count_tokens(line) + 1
+            if tokens > budget:
+                break
+            lines.append(line)
+            written_nodes = nodes
+            budget -= tokens
+            included += count
+
+        if total == 0:
+            lines.append("(no rows)")
+        elif included < total:
+            lines.append(f"({total - included} of {total} rows omitted to fit the context)")
+
+        text = "\n".join(lines)
+        context = Context(text, total, included, self.max_tokens - budget)
+
+        metrics = get_metrics()
+        metrics.record("graphrag.context.tokens", context.tokens)
+        metrics.record("graphrag.context.dropped_rows", context.dropped_rows)
+        if context.dropped_rows > 0:
+            logger.debug(
+                f"Context budget of {self.max_tokens} tokens reached, "
+                f"{context.dropped_rows} of {context.rows} rows dropped"
+            )
+        return context
+
+    def _value(self, value, written_nodes: set) -> str:
+        if isinstance(value, Node):
+            label = ":".join(value.labels or [])
+            if value.id in written_nodes:
+                return f"{label}#{value.id}"
+            written_nodes.add(value.id)
+            properties = {
+                key: v for key, v in value.properties.items() if key != EMBEDDING_ATTRIBUTE
+            }
+            return f"{label}#{value.id}{self._properties(properties, written_nodes)}"
+        if isinstance(value, Edge):
+            return f"{value.relation}{self._properties(value.properties, written_nodes)}"
+        if isinstance(value, Path):
+            parts = [self._value(value.get_node(0), written_nodes)]
+            for i, edge in enumerate(value.edges()):
+                parts.append(f"-[{self._value(edge, written_nodes)}]-")
+                parts.append(self._value(value.get_node(i + 1), written_nodes))
+            return "".join(parts)
+        if isinstance(value, list):
+            return "[" + ", ".join(self._value(v, written_nodes) for v in value) + "]"
+        if isinstance(value, dict):
+            return self._properties(value, written_nodes) or "{}"
+        if value is None:
+            return ""
+
+        text = " ".join(str(value).split())
+        if len(text) > self.max_value_chars:
+            text = text[: self.max_value_chars] + "..."
+        return text
+
+    def _properties(self, properties: dict, written_nodes: set) -> str:
+        if not properties:
+            return ""
+        return (
+            "{"
+            + ", ".join(
+                f"{key}: {self._value(value, written_nodes)}"
+                for key, value in properties.items()
+            )
+            + "}"
+        )
+
+
+def _return_clause(cypher: str | None) -> tuple[list[str], bool]:
+    # The columns of the last top-level RETURN, as named in the query header, and whether it orders rows
+    if not cypher:
+        return ([], False)
+    try:
+        tokens = list(tokenize_cypher(cypher))
+    except Exception:
+        return ([], False)
+
+    depth = 0
+    start = None
+    items = []
+    ordered = False
+    for i, token in enumerate(tokens):
+        if token.kind == "symbol" and token.text in "([{":
+            depth += 1
+        elif token.kind == "symbol" and token.text in ")]}":
+            depth -= 1
+        elif depth == 0 and token.kind == "name":
+            keyword = token.text.upper()
+            if keyword == "RETURN":
+                (start, items, ordered) = (i + 1, [], False)
+                if i + 1 < len(tokens) and tokens[i + 1].text.upper() == "DISTINCT":
+                    start += 1
+            elif keyword in ("ORDER", "SKIP", "LIMIT", "UNION") and start is not None:
+                if keyword == "ORDER":
+                    ordered = True
+                items.append((start, i))
+                start = None
+        if depth == 0 and start is not None and token.kind == "symbol" and token.text == ",":
+            items.append((start, i))
+            start = i + 1
+    if start is not None:
+        end = len(tokens) - 1 if tokens[-1].text == ";" else len(tokens)
+        items.append((start, end))
+
+    columns = []
+    for begin, end in items:
+        if begin >= end:
+            continue
+        if end - begin >= 2 and tokens[end - 2].text.upper() == "AS":
+            columns.append(tokens[end - 1].text)
+        else:
+            last = tokens[end - 1]
+            columns.append(cypher[tokens[begin].position : last.position + len(last.text)])
+    return (columns, ordered)
+
+
+def _rank(rows: list, texts: list[tuple], question: str) -> list:
+    # Short words are mostly stop words
+    words = set(word.lower() for word in _WORD_REGEX.findall(question) if len(word) > 2)
+
+    def score(i: int) -> int:
+        return -sum(
+            1 for word in _WORD_REGEX.findall(" ".join(texts[i]).lower()) if word in words
+        )
+
+    # Stable, rows as relevant keep the query order
+    return [rows[i] for i in sorted(range(len(rows)), key=score)]
@@ -0,0 +1,251 @@
+import re
+import logging
+import threading
+from abc import ABC, abstractmethod
+from falkordb import FalkorDB
+from graphrag_sdk.models.embedding import EmbeddingModel, cosine_similarity
+from graphrag_sdk.cypher_parser import tokenize_cypher
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CypherCache(ABC):
+    """
+    A semantic cache of the Cypher statements generated to answer questions.
+
+    Questions are embedded, and a question whose embedding is within `threshold`
+    cosine similarity of a cached one reuses the cached Cypher statement instead of
+    asking the model to generate one. As statements hard-code the values of the question
+    they answer, a statement is only reused when each of its string and number literals
+    appears in the new question: "movies released in 1999" never reuses the statement
+    of "movies released in 2005". Only statements that validated and ran successfully
+    are cached. A cache should only be shared by knowledge graphs with the same ontology.
+
+    Args:
+        embedding_model (EmbeddingModel): The model embedding the questions.
+        threshold (float): The minimum similarity for a cached statement to be reused.
+
+    Attributes:
+        hits (int): The number of questions answered with a cached statement.
+        misses (int): The number of questions without a similar cached question.
+    """
+
+    def __init__(self, embedding_model: EmbeddingModel, threshold: float = 0.95):
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, question: str) -> str | None:
+        """
+        Finds the Cypher statement of the most similar cached question.
+
+        Args:
+            question (str): The question.
+
+        Returns:
+            str | None: The cached statement, or None if no cached question is similar enough.
+        """
+        embedding = self.embedding_model.embed([question])[0]
+        nearest = self._nearest(embedding)
+        if nearest is not None and nearest[0] >= self.threshold:
+            if literals_in_question(nearest[1], question):
+                logger.debug(f"Cypher cache hit ({nearest[0]:.3f}): {question}")
+                self.hits += 1
+                return nearest[1]
+            logger.debug(f"Cached Cypher has literals missing from the question: {question}")
+        self.misses += 1
+        return None
+
+    def store(self, question: str, cypher: str) -> None:
+        """
+        Caches the Cypher statement answering a question.
+
+        Args:
+            question (str): The question.
+            cypher (str): The validated Cypher statement.
+        """
+        self._add(question, self.embedding_model.embed([question])[0], cypher)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits and misses.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    @abstractmethod
+    def _nearest(self, embedding: list[float]) -> tuple[float, str] | None:
+        pass
+
+    @abstractmethod
+    def _add(self, question: str, embedding: list[float], cypher: str) -> None:
+        pass
+
+
+def literals_in_question(cypher: str, question: str) -> bool:
+    """
+    Tells whether every string and number literal of a statement appears in a question,
+    ignoring case and whitespace. Row limits and relationship hop counts are not compared.
+
+    Args:
+        cypher (str): The Cypher statement.
+        question (str): The question.
+
+    Returns:
+        bool: True if the statement can answer the question as far as its literals go.
+    """
+    question = " ".join(question.lower().split())
+    words = set(re.findall(r"[\w.]+", question))
+    try:
+        tokens = list(tokenize_cypher(cypher))
+    except Exception:
+        return False
+
+    for i, token in enumerate(tokens):
+        previous = tokens[i - 1].text.upper() if i > 0 else ""
+        if token.kind == "string":
+            value = " ".join(token.text[1:-1].lower().split())
+            if value not in question:
+                return False
+        elif token.kind == "number" and previous not in ("LIMIT", "SKIP", "*", ".."):
+            if token.text not in words and token.text.rstrip("0").rstrip(".") not in words:
+                return False
+    return True
+
+
+class InMemoryCypherCache(CypherCache):
+    """
+    Cypher cache holding the question embeddings in memory,
+    in a NumPy matrix when NumPy is installed.
+
+    Args:
+        embedding_model (EmbeddingModel): The model embedding the questions.
+        threshold (float): The minimum similarity for a cached statement to be reused.
+        max_size (int): The maximum number of cached statements, the oldest are evicted first.
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        threshold: float = 0.95,
+        max_size: int = 10000,
+    ):
+        super().__init__(embedding_model, threshold)
+        self.max_size = max_size
+        self._questions: list[str] = []
+        self._embeddings: list[list[float]] = []
+        self._cyphers: list[str] = []
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def _nearest(self, embedding: list[float]) -> tuple[float, str] | None:
+        with self._lock:
+            if len(self._cyphers) == 0:
+                return None
+
+            if np is not None:
+                if self._matrix is None:
+                    matrix = np.array(self._embeddings, dtype=np.float32)
+                    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                    self._matrix = matrix / np.where(norms == 0, 1, norms)
+                query = np.array(embedding, dtype=np.float32)
+                query = query / (np.linalg.norm(query) or 1)
+                similarities = self._matrix @ query
+                index = int(np.argmax(similarities))
+                return (float(similarities[index]), self._cyphers[index])
+
+            similarities = [cosine_similarity(embedding, e) for e in self._embeddings]
+            index = max(range(len(similarities)), key=similarities.__getitem__)
+            return (similarities[index], self._cyphers[index])
+
+    def _add(self, question: str, embedding: list[float], cypher: str) -> None:
+        with self._lock:
+            # A question answered again replaces its previous statement
+            if question in self._questions:
+                index = self._questions.index(question)
+                self._questions.pop(index)
+                self._embeddings.pop(index)
+                self._cyphers.pop(index)
+
+            self._questions.append(question)
+            self._embeddings.append(embedding)
+            self._cyphers.append(cypher)
+            if len(self._cyphers) > self.max_size:
+                self._questions.pop(0)
+                self._embeddings.pop(0)
+                self._cyphers.pop(0)
+            self._matrix = None
+
+
+class FalkorDBCypherCache(CypherCache):
+    """
+    Cypher cache stored in a FalkorDB graph with a vector index over the question
+    embeddings, shared by every process connected to the same database.
+
+    Args:
+        db (FalkorDB): The database connection.
+        name (str): The name of the graph holding the cache, e.g. "<knowledge graph>_cypher_cache".
+        embedding_model (EmbeddingModel): The model embedding the questions.
+        threshold (float): The minimum similarity for a cached statement to be reused.
+    """
+
+    def __init__(
+        self,
+        db: FalkorDB,
+        name: str,
+        embedding_model: EmbeddingModel,
+        threshold: float = 0.95,
+    ):
+        super().__init__(embedding_model, threshold)
+        self.graph = db.select_graph(name)
+        self._index_created = False
+
+    def _ensure_index(self) -> None:
+        if self._index_created:
+            return
+        try:
+            self.graph.create_node_vector_index(
+                "Question",
+                "embedding",
+                dim=self.embedding_model.dimension,
+                similarity_function="cosine",
+            )
+        except Exception as e:
+            # The index already exists
+            logger.debug(f"Cypher cache index not created: {e}")
+        self._index_created = True
+
+    def _nearest(self, embedding: list[float]) -> tuple[float, str] | None:
+        self._ensure_index()
+        result = self.graph.query(
+            "CALL db.idx.vector.queryNodes('Question', 'embedding', 1, vecf32($embedding)) "
+            "YIELD node RETURN node.embedding, node.cypher",
+            {"embedding": embedding},
+        ).result_set
+        if len(result) == 0:
+            return None
+        # Similarity is computed here as the index score depends on its metric
+        return (cosine_similarity(embedding, list(result[0][0])), result[0][1])
+
+    def _add(self, question: str, embedding: list[float], cypher: str) -> None:
+        self._ensure_index()
+        self.graph.query(
+            "MERGE (q:Question {question: $question}) "
+            "SET q.embedding = vecf32($embedding), q.cypher = $cypher",
+            {"question": question, "embedding": embedding, "cypher": cypher},
+        )
+
+    def delete(self) -> None:
+        """
+        Deletes the cache graph.
+        """
+        self.graph.delete()
+        self._index_created = False
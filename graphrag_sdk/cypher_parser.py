@@ -0,0 +1,479 @@
+import re
+import graphrag_sdk
+import logging
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# A single alternation matched once over the statement, in priority order
+_TOKEN_REGEX = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<quoted>`(?:[^`]|``)*`)
+    | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<parameter>\$[A-Za-z0-9_]+)
+    | (?P<operator>\.\.|<>|<=|>=|=~|\+=)
+    | (?P<unterminated>['"`]|/\*)
+    | (?P<symbol>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+
+
+class CypherToken:
+    """
+    A token of a Cypher statement.
+
+    Args:
+        kind (str): The token kind: name, string, number, parameter, operator or symbol.
+        text (str): The token text, unquoted for backticked names.
+        position (int): The offset of the token in the statement.
+    """
+
+    __slots__ = ("kind", "text", "position")
+
+    def __init__(self, kind: str, text: str, position: int):
+        self.kind = kind
+        self.text = text
+        self.position = position
+
+    def __repr__(self) -> str:
+        return f"CypherToken({self.kind}, {self.text!r}, {self.position})"
+
+
+class CypherError:
+    """
+    An error found in a Cypher statement.
+
+    Args:
+        kind (str): The error kind: "syntax", "entity", "relation" or "direction".
+        message (str): The error, as fed back to the model.
+        label (str | None): The entity or relation label at fault.
+        source (str | None): The source entity label of a misdirected relation.
+        target (str | None): The target entity label of a misdirected relation.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        message: str,
+        label: str | None = None,
+        source: str | None = None,
+        target: str | None = None,
+    ):
+        self.kind = kind
+        self.message = message
+        self.label = label
+        self.source = source
+        self.target = target
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"CypherError({self.kind}, {self.message!r})"
+
+
+class NodePattern:
+    """
+    A node pattern, e.g. `(a:Actor {name: 'Tom Hanks'})`.
+
+    Args:
+        variable (str | None): The node variable.
+        labels (list[str]): The node labels.
+    """
+
+    def __init__(self, variable: str | None, labels: list[str]):
+        self.variable = variable
+        self.labels = labels
+
+
+class RelationshipPattern:
+    """
+    A relationship pattern between two node patterns, e.g. `-[r:ACTED_IN]->`.
+
+    Args:
+        variable (str | None): The relationship variable.
+        types (list[str]): The relationship types, alternatives when more than one.
+        direction (str): "->", "<-" or "-" when undirected.
+        left (NodePattern): The node written before the relationship.
+        right (NodePattern): The node written after the relationship.
+        hops (tuple[int, int | None, int, int] | None): For variable-length relationships, the minimum
+            and maximum number of hops, None when unbounded, and the offsets of the `*...` range in the statement.
+    """
+
+    def __init__(
+        self,
+        variable: str | None,
+        types: list[str],
+        direction: str,
+        left: NodePattern,
+        right: NodePattern,
+        hops: tuple[int, int | None, int, int] | None = None,
+    ):
+        self.variable = variable
+        self.types = types
+        self.direction = direction
+        self.left = left
+        self.right = right
+        self.hops = hops
+
+    @property
+    def variable_length(self) -> bool:
+        return self.hops is not None
+
+
+class CypherPatterns:
+    """
+    The node and relationship patterns of a Cypher statement, extracted by `parse_cypher`.
+
+    Args:
+        nodes (list[NodePattern]): The node patterns.
+        relationships (list[RelationshipPattern]): The relationship patterns.
+        errors (list[CypherError]): The syntax errors.
+    """
+
+    def __init__(
+        self,
+        nodes: list[NodePattern],
+        relationships: list[RelationshipPattern],
+        errors: list[CypherError],
+    ):
+        self.nodes = nodes
+        self.relationships = relationships
+        self.errors = errors
+
+    def labels_of(self, node: NodePattern) -> list[str]:
+        """
+        Returns the labels of a node, including those given to its variable elsewhere,
+        e.g. `Actor` for `(a)` in `MATCH (a:Actor) MATCH (a)-[:ACTED_IN]->(m)`.
+
+        Args:
+            node (NodePattern): The node pattern.
+
+        Returns:
+            list[str]: The node labels.
+        """
+        if node.labels or node.variable is None:
+            return node.labels
+        labels = []
+        for other in self.nodes:
+            if other.variable == node.variable:
+                labels.extend(label for label in other.labels if label not in labels)
+        return labels
+
+
+def tokenize_cypher(cypher: str) -> Iterator[CypherToken]:
+    """
+    Splits a Cypher statement into tokens, skipping whitespace and comments.
+
+    Args:
+        cypher (str): The Cypher statement.
+
+    Returns:
+        Iterator[CypherToken]: The tokens.
+
+    Raises:
+        Exception: If a string, quoted name or comment is not terminated.
+    """
+    for match in _TOKEN_REGEX.finditer(cypher):
+        kind = match.lastgroup
+        if kind == "space" or kind == "comment":
+            continue
+        if kind == "unterminated":
+            raise Exception(f"Unterminated {match.group()} at position {match.start()}")
+        text = match.group()
+        if kind == "quoted":
+            (kind, text) = ("name", text[1:-1].replace("``", "`"))
+        yield CypherToken(kind, text, match.start())
+
+
+class _Parser:
+
+    def __init__(self, tokens: list[CypherToken]):
+        self.tokens = tokens
+        self.nodes: list[NodePattern] = []
+        self.relationships: list[RelationshipPattern] = []
+
+    def _text(self, i: int) -> str | None:
+        token = self.tokens[i] if i < len(self.tokens) else None
+        return token.text if token is not None and token.kind in ("symbol", "operator") else None
+
+    def _name(self, i: int) -> str | None:
+        token = self.tokens[i] if i < len(self.tokens) else None
+        return token.text if token is not None and token.kind == "name" else None
+
+    def _skip_map(self, i: int) -> int:
+        # Skips a property map, returning the index after its closing brace
+        depth = 0
+        while i < len(self.tokens):
+            text = self._text(i)
+            if text == "{":
+                depth += 1
+            elif text == "}":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+            i += 1
+        return i
+
+    def _labels(self, i: int, separators: tuple[str, ...]) -> tuple[list[str], int]:
+        labels = []
+        while self._text(i) in separators:
+            i += 1
+            if self._text(i) == ":":
+                i += 1
+            label = self._name(i)
+            if label is None:
+                break
+            labels.append(label)
+            i += 1
+        return (labels, i)
+
+    def node(self, i: int) -> tuple[NodePattern | None, int]:
+        # ( [variable] [:Label[:Label...]] [{...} | $parameter] )
+        if self._text(i) != "(":
+            return (None, i)
+        i += 1
+        variable = self._name(i)
+        if variable is not None:
+            i += 1
+        (labels, i) = self._labels(i, (":",))
+        if self._text(i) == "{":
+            i = self._skip_map(i)
+        elif i < len(self.tokens) and self.tokens[i].kind == "parameter":
+            i += 1
+        if self._text(i) != ")":
+            return (None, i)
+        return (NodePattern(variable, labels), i + 1)
+
+    def _number(self, i: int) -> int | None:
+        token = self.tokens[i] if i < len(self.tokens) else None
+        return int(token.text) if token is not None and token.text.isdigit() else None
+
+    def _hops(self, i: int) -> tuple[tuple, int]:
+        # *, *2, *1..3, *..3 or *1..
+        start = self.tokens[i].position
+        end = start + 1
+        i += 1
+        minimum = self._number(i)
+        if minimum is not None:
+            end = self.tokens[i].position + len(self.tokens[i].text)
+            i += 1
+        maximum = minimum
+        if self._text(i) == "..":
+            end = self.tokens[i].position + 2
+            i += 1
+            maximum = self._number(i)
+            if maximum is not None:
+                end = self.tokens[i].position + len(self.tokens[i].text)
+                i += 1
+        elif minimum is None:
+            maximum = None
+        return ((1 if minimum is None else minimum, maximum, start, end), i)
+
+    def relationship(self, i: int) -> tuple[tuple | None, int]:
+        # <-[...]- or -[...]-> or -[...]- and the bracket-less --, -->, <--
+        left_arrow = self._text(i) == "<"
+        if left_arrow:
+            i += 1
+        if self._text(i) != "-":
+            return (None, i)
+        i += 1
+
+        variable = None
+        types = []
+        hops = None
+        if self._text(i) == "[":
+            i += 1
+            variable = self._name(i)
+            if variable is not None:
+                i += 1
+            (types, i) = self._labels(i, (":", "|"))
+            if self._text(i) == "*":
+                (hops, i) = self._hops(i)
+            if self._text(i) == "{":
+                i = self._skip_map(i)
+            elif i < len(self.tokens) and self.tokens[i].kind == "parameter":
+                i += 1
+            if self._text(i) != "]":
+                return (None, i)
+            i += 1
+
+        if self._text(i) != "-":
+            return (None, i)
+        i += 1
+        right_arrow = self._text(i) == ">"
+        if right_arrow:
+            i += 1
+
+        if left_arrow == right_arrow:
+            direction = "-"
+        else:
+            direction = "<-" if left_arrow else "->"
+        return ((variable, types, direction, hops), i)
+
+    def parse(self) -> None:
+        i = 0
+        while i < len(self.tokens):
+            (left, end) = self.node(i)
+            if left is None:
+                i += 1
+                continue
+            self.nodes.append(left)
+            i = end
+
+            # Follow the chain of relationships and nodes
+            while True:
+                (relationship, end) = self.relationship(i)
+                if relationship is None:
+                    break
+                (right, end) = self.node(end)
+                if right is None:
+                    break
+                (variable, types, direction, hops) = relationship
+                self.nodes.append(right)
+                self.relationships.append(
+                    RelationshipPattern(
+                        variable, types, direction, left, right, hops
+                    )
+                )
+                left = right
+                i = end
+
+
+def _bracket_errors(tokens: list[CypherToken]) -> list[CypherError]:
+    stack = []
+    for token in tokens:
+        if token.kind != "symbol":
+            continue
+        if token.text in _BRACKETS:
+            stack.append(token)
+        elif token.text in _BRACKETS.values():
+            if not stack or _BRACKETS[stack[-1].text] != token.text:
+                return [
+                    CypherError(
+                        "syntax", f"Unbalanced {token.text} at position {token.position}"
+                    )
+                ]
+            stack.pop()
+    if stack:
+        return [
+            CypherError(
+                "syntax", f"Unclosed {stack[-1].text} at position {stack[-1].position}"
+            )
+        ]
+    return []
+
+
+def parse_cypher(cypher: str) -> CypherPatterns:
+    """
+    Extracts the node and relationship patterns of a Cypher statement in a single pass,
+    covering the subset of Cypher generated by the SDK.
+
+    Args:
+        cypher (str): The Cypher statement.
+
+    Returns:
+        CypherPatterns: The patterns and the syntax errors found.
+    """
+    try:
+        tokens = list(tokenize_cypher(cypher))
+    except Exception as e:
+        return CypherPatterns([], [], [CypherError("syntax", str(e))])
+
+    parser = _Parser(tokens)
+    parser.parse()
+    return CypherPatterns(parser.nodes, parser.relationships, _bracket_errors(tokens))
+
+
+def find_cypher_errors(
+    cypher: str, ontology: "graphrag_sdk.Ontology"
+) -> list[CypherError]:
+    """
+    Checks the labels, relationship types and relationship directions of a Cypher
+    statement against an ontology.
+
+    Args:
+        cypher (str): The Cypher statement.
+        ontology (Ontology): The ontology.
+
+    Returns:
+        list[CypherError]: The errors, empty if none were found.
+    """
+    if not cypher or len(cypher) == 0:
+        return [CypherError("syntax", "Cypher statement is empty")]
+
+    patterns = parse_cypher(cypher)
+    errors = list(patterns.errors)
+    reported = set()
+
+    def report(error: CypherError):
+        if error.message not in reported:
+            reported.add(error.message)
+            errors.append(error)
+
+    for node in patterns.nodes:
+        for label in node.labels:
+            if not ontology.has_entity_with_label(label):
+                report(
+                    CypherError("entity", f"Entity {label} not found in ontology", label)
+                )
+
+    for relationship in patterns.relationships:
+        types = [t for t in relationship.types if ontology.has_relation_with_label(t)]
+        for label in relationship.types:
+            if label not in types:
+                report(
+                    CypherError(
+                        "relation", f"Relation {label} not found in ontology", label
+                    )
+                )
+
+        # Endpoints are only adjacent for single hops
+        if len(types) == 0 or relationship.variable_length:
+            continue
+        if relationship.direction == "<-":
+            (sources, targets) = (relationship.right, relationship.left)
+        else:
+            (sources, targets) = (relationship.left, relationship.right)
+        sources = patterns.labels_of(sources)
+        targets = patterns.labels_of(targets)
+        if len(sources) == 0 or len(targets) == 0:
+            continue
+
+        def connects(source: str, target: str) -> bool:
+            return any(
+                ontology.get_relation(t, source, target) is not None
+                or (
+                    relationship.direction == "-"
+                    and ontology.get_relation(t, target, source) is not None
+                )
+                for t in types
+            )
+
+        if any(connects(s, t) for s in sources for t in targets):
+            continue
+
+        (source, target) = (sources[0], targets[0])
+        valid_relations = "\n".join(
+            str(r) for t in types for r in ontology.get_relations_with_label(t)
+        )
+        report(
+            CypherError(
+                "direction",
+                f"Relation {'|'.join(types)} does not connect {source} to {target}. "
+                f"Make sure the relation direction is correct.\n"
+                f"Valid relations:\n{valid_relations}",
+                "|".join(types),
+                source,
+                target,
+            )
+        )
+
+    return errors
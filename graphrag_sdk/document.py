@@ -3,14 +3,16 @@ class Document():
     Common class containing text extracted from a source
     """
 
-    def __init__(self, content: str) -> None:
+    def __init__(self, content: str, offset: int = 0) -> None:
         """
         Initializes a new Document object.
 
         Args:
             content (str): The content of the document.
+            offset (int): The position of the content within the document it was split from.
 
         Returns:
             None
         """
         self.content = content
+        self.offset = offset
@@ -1,11 +1,17 @@
 import csv
+from itertools import islice
 from typing import Iterator
 from graphrag_sdk.document import Document
 
 
 class CSVLoader:
     """
-    CSV loader
+    CSV loader, grouping rows into documents.
+    The last document holds the remaining rows, even if fewer than `rows_per_document`.
+
+    Args:
+        path (str): The path to the file.
+        rows_per_document (int): The number of rows per document.
     """
 
     def __init__(self, path: str, rows_per_document: int = 500):
@@ -15,18 +21,7 @@ class CSVLoader:
     def load(self) -> Iterator[Document]:
         with open(self.path, "r") as f:
             reader = csv.reader(f)
-            rows = [row for row in reader]
-            num_rows = len(rows)
-            num_documents = num_rows // self.rows_per_document
-            for i in range(num_documents):
-                content = "\n".join(
-                    [
-                        ",".join(row)
-                        for row in rows[
-                            i
-                            * self.rows_per_document : (i + 1)
-                            * self.rows_per_document
-                        ]
-                    ]
-                )
+            # Stream the file, only keeping one document's rows in memory
+            while rows := list(islice(reader, self.rows_per_document)):
+                content = "\n".join([",".join(row) for row in rows])
                 yield Document(content)
@@ -1,10 +1,16 @@
+from itertools import islice
 from typing import Iterator
 from graphrag_sdk.document import Document
 
 
 class JSONLLoader:
     """
-    JSONL loader
+    JSONL loader, grouping rows into documents.
+    The last document holds the remaining rows, even if fewer than `rows_per_document`.
+
+    Args:
+        path (str): The path to the file.
+        rows_per_document (int): The number of rows per document.
     """
 
     def __init__(self, path: str, rows_per_document: int = 500):
@@ -13,15 +19,7 @@ class JSONLLoader:
 
     def load(self) -> Iterator[Document]:
         with open(self.path, "r") as f:
-            rows = f.readlines()
-            num_rows = len(rows)
-            num_documents = num_rows // self.rows_per_document
-            for i in range(num_documents):
-                content = "\n".join(
-                    rows[
-                        i
-                        * self.rows_per_document : (i + 1)
-                        * self.rows_per_document
-                    ]
-                )
+            # Stream the file, only keeping one document's rows in memory
+            while rows := list(islice(f, self.rows_per_document)):
+                content = "\n".join(rows)
                 yield Document(content)
@@ -34,7 +34,5 @@ class PDFLoader():
         from pypdf import PdfReader # pylint: disable=import-outside-toplevel
 
         reader = PdfReader(self.path)
-        yield from [
-            Document(page.extract_text())
-            for page in reader.pages
-        ]
+        for page in reader.pages:
+            yield Document(page.extract_text())
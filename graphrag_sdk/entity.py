@@ -1,6 +1,7 @@
 import json
 import logging
 from .attribute import Attribute
+from graphrag_sdk.helpers import quote_cypher_identifier
 from falkordb import Node as GraphNode
 import re
 
@@ -25,6 +26,7 @@ class Entity:
         merge(entity2: Entity) -> Entity: Overwrites attributes of self with attributes of entity2.
         get_unique_attributes() -> list[Attribute]: Returns a list of unique attributes of the entity.
         to_graph_query() -> str: Generates a Cypher query to merge the entity in the graph.
+        to_graph_params() -> dict: Generates the parameters of the query to merge the entity in the graph.
     """
 
     def __init__(self, label: str, attributes: list[Attribute], description: str = ""):
@@ -133,19 +135,40 @@ class Entity:
     def to_graph_query(self):
         """
         Generates a Cypher query string for creating or updating a node in a graph database.
+        The attribute values are passed as parameters, see `to_graph_params`.
 
         Returns:
             str: The Cypher query string.
         """
         unique_attributes = ", ".join(
-            [str(attr) for attr in self.attributes if attr.unique]
+            [
+                f"{quote_cypher_identifier(attr.name)}: $a{i}"
+                for i, attr in enumerate(self.attributes)
+                if attr.unique
+            ]
         )
         non_unique_attributes = ", ".join(
-            [str(attr) for attr in self.attributes if not attr.unique]
+            [
+                f"{quote_cypher_identifier(attr.name)}: $a{i}"
+                for i, attr in enumerate(self.attributes)
+                if not attr.unique
+            ]
         )
         if self.description:
-            non_unique_attributes += f"{', ' if len(non_unique_attributes) > 0 else ''} {descriptionKey}: '{self.description}'"
-        return f"MERGE (n:{self.label} {{{unique_attributes}}}) SET n += {{{non_unique_attributes}}} RETURN n"
+            non_unique_attributes += f"{', ' if len(non_unique_attributes) > 0 else ''}{descriptionKey}: $description"
+        return f"MERGE (n:{quote_cypher_identifier(self.label)} {{{unique_attributes}}}) SET n += {{{non_unique_attributes}}} RETURN n"
+
+    def to_graph_params(self):
+        """
+        Generates the parameters of the query returned by `to_graph_query`.
+
+        Returns:
+            dict: The query parameters.
+        """
+        params = {f"a{i}": attr.type_string() for i, attr in enumerate(self.attributes)}
+        if self.description:
+            params["description"] = self.description
+        return params
 
     def __str__(self) -> str:
         """
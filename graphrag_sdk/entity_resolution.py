@@ -0,0 +1,302 @@
+import json
+import logging
+import threading
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from graphrag_sdk.models.embedding import EmbeddingModel, cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+_ROMAN_NUMERAL_REGEX = re.compile(r"^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$")
+
+
+def normalize_name(value: str) -> str:
+    """
+    Normalizes an entity name for comparison: accents, case and punctuation are removed.
+
+    Args:
+        value (str): The name, e.g. "Hanks, Tom".
+
+    Returns:
+        str: The normalized name, e.g. "hanks tom".
+    """
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(c if c.isalnum() else " " for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+def soundex(token: str) -> str:
+    """
+    Computes the Soundex code of a token, equal for most tokens sounding alike.
+
+    Args:
+        token (str): The token, lowercase.
+
+    Returns:
+        str: The code, e.g. "h520" for "hanks", the token itself if it does not start with a letter.
+    """
+    if not token or not token[0].isalpha() or not token.isascii():
+        return token
+    code = token[0]
+    previous = _SOUNDEX_CODES.get(token[0])
+    for c in token[1:]:
+        digit = _SOUNDEX_CODES.get(c)
+        if digit is not None and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters of the same code
+        if c not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def blocking_keys(name: str) -> list[str]:
+    """
+    Computes the blocking keys of a normalized name: names that may refer to the same entity
+    share at least one key, so only names within the same blocks are compared.
+
+    Args:
+        name (str): The normalized name.
+
+    Returns:
+        list[str]: The sorted tokens, sorted token prefixes and sorted phonetic keys.
+    """
+    tokens = sorted(name.split())
+    return [
+        "t:" + " ".join(tokens),
+        "x:" + " ".join(sorted(token[:4] for token in tokens)),
+        "p:" + " ".join(sorted(soundex(token) for token in tokens)),
+    ]
+
+
+def _split_tokens(tokens: list[str]) -> tuple[list[str], list[str]]:
+    # Short, numeric and roman numeral tokens tell entities apart and must match exactly
+    exact = []
+    fuzzy = []
+    for token in tokens:
+        if (
+            len(token) <= 2
+            or any(c.isdigit() for c in token)
+            or _ROMAN_NUMERAL_REGEX.match(token)
+        ):
+            exact.append(token)
+        else:
+            fuzzy.append(token)
+    return (exact, fuzzy)
+
+
+def _token_similarity(exact: list[str], tokens: list[str], others: list[str]) -> float:
+    # Tokens are compared pairwise in sorted order and weighted by their length,
+    # the tokens matched exactly counting as identical
+    total = sum(len(token) for token in exact)
+    for token, other in zip(tokens, others):
+        total += SequenceMatcher(None, token, other).ratio() * len(token)
+    return total / sum(len(token) for token in exact + tokens)
+
+
+class EntityResolver:
+    """
+    Maps extracted entities to canonical ones before they are written, so that
+    "Tom Hanks", "tom hanks" and "Hanks, Tom" are merged into a single node.
+
+    The string unique attributes of an entity are normalized and looked up in an alias index.
+    Unknown names are compared to the canonical names sharing one of their blocking keys,
+    and resolved to the most similar one when close enough, by string similarity or, given an
+    embedding model, embedding similarity. Otherwise they become canonical themselves.
+    Short, numeric and roman numeral tokens, as in "Rocky III" or "Louis XV", and
+    non-string unique attributes must match exactly.
+
+    Aliases are kept in memory and, given a connection, persisted in a hash stored next to
+    the knowledge graph, shared by every process ingesting into it. Resolving an entity
+    costs a dictionary lookup once its name was seen, and a handful of comparisons otherwise.
+
+    Args:
+        connection (redis.Redis | None): The FalkorDB connection, None to keep aliases in memory only.
+        graph_name (str | None): The knowledge graph name.
+        similarity (float): The string similarity, between 0 and 1, from which names are merged.
+        embedding_model (EmbeddingModel | None): The model comparing names not similar enough as strings, if any.
+        embedding_similarity (float): The cosine similarity from which names are merged by embedding.
+
+    Examples:
+        >>> resolver = EntityResolver()
+        >>> resolver.resolve("Actor", {"name": "Tom Hanks"})
+        {'name': 'Tom Hanks'}
+        >>> resolver.resolve("Actor", {"name": "Hanks, Tom"})
+        {'name': 'Tom Hanks'}
+    """
+
+    def __init__(
+        self,
+        connection=None,
+        graph_name: str | None = None,
+        similarity: float = 0.92,
+        embedding_model: EmbeddingModel | None = None,
+        embedding_similarity: float = 0.9,
+    ):
+        self.connection = connection
+        self.key = f"graphrag:{graph_name}:aliases" if graph_name is not None else None
+        self.similarity = similarity
+        self.embedding_model = embedding_model
+        self.embedding_similarity = embedding_similarity
+
+        self._aliases: dict[tuple, dict] = {}
+        self._blocks: dict[tuple, list[str]] = {}
+        self._canonicals: dict[tuple, dict] = {}
+        self._vectors: dict[str, list[float]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def resolve(self, label: str, unique: dict) -> dict:
+        """
+        Resolves an entity to its canonical unique attribute values.
+
+        Args:
+            label (str): The entity label.
+            unique (dict): The unique attribute values.
+
+        Returns:
+            dict: The canonical unique attribute values, the given ones if the entity is new.
+        """
+        names = {k: v for k, v in unique.items() if isinstance(v, str) and v != ""}
+        if len(names) == 0:
+            return unique
+
+        # Entities only resolve to entities with the same label and exact non-string values
+        others = {k: v for k, v in unique.items() if k not in names}
+        scope = (label, json.dumps(others, sort_keys=True, default=str), tuple(sorted(names)))
+        name = " ".join(normalize_name(names[k]) for k in sorted(names))
+        if name == "":
+            return unique
+
+        with self._lock:
+            self._load()
+            canonical = self._aliases.get((scope, name))
+        if canonical is not None:
+            return canonical
+
+        # Redis round trips and embeddings run outside the lock, HSETNX claims the alias atomically
+        canonical = self._stored_alias(scope, name)
+        if canonical is None:
+            canonical = self._match(scope, name) or unique
+            canonical = self._store_alias(scope, name, canonical)
+
+        with self._lock:
+            # Another thread may have resolved the name meanwhile, the first one wins
+            canonical = self._aliases.get((scope, name), canonical)
+            self._add(scope, name, canonical)
+        if canonical != unique:
+            logger.debug(f"Resolved {label} {unique} to {canonical}")
+        return canonical
+
+    def delete(self) -> None:
+        """
+        Deletes all aliases.
+        """
+        with self._lock:
+            self._aliases.clear()
+            self._blocks.clear()
+            self._canonicals.clear()
+            self._vectors.clear()
+            if self.connection is not None and self.key is not None:
+                self.connection.delete(self.key)
+
+    def _add(self, scope: tuple, name: str, canonical: dict) -> None:
+        self._aliases[(scope, name)] = canonical
+        canonical_name = " ".join(
+            normalize_name(canonical[k]) for k in scope[2] if isinstance(canonical.get(k), str)
+        )
+        if (scope, canonical_name) in self._canonicals:
+            return
+        self._canonicals[(scope, canonical_name)] = canonical
+        for key in blocking_keys(canonical_name):
+            self._blocks.setdefault((scope, key), []).append(canonical_name)
+
+    def _match(self, scope: tuple, name: str) -> dict | None:
+        tokens = sorted(name.split())
+        (exact, fuzzy) = _split_tokens(tokens)
+        candidates = []
+        seen = set()
+        with self._lock:
+            for key in blocking_keys(name):
+                for candidate in self._blocks.get((scope, key), []):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    candidate_tokens = sorted(candidate.split())
+                    if candidate_tokens == tokens:
+                        return self._canonicals[(scope, candidate)]
+                    # "Rocky II" and "Rocky III" only differ in a token that must match exactly
+                    (candidate_exact, candidate_fuzzy) = _split_tokens(candidate_tokens)
+                    if candidate_exact != exact or len(candidate_fuzzy) != len(fuzzy):
+                        continue
+                    candidates.append(
+                        (candidate, candidate_fuzzy, self._canonicals[(scope, candidate)])
+                    )
+
+        best = (self.similarity, None)
+        for (_, candidate_fuzzy, canonical) in candidates:
+            ratio = _token_similarity(exact, fuzzy, candidate_fuzzy)
+            if ratio >= best[0]:
+                best = (ratio, canonical)
+
+        if best[1] is None and self.embedding_model is not None and len(candidates) > 0:
+            vectors = self._embed([name, *(candidate for (candidate, _, _) in candidates)])
+            best = (self.embedding_similarity, None)
+            for (candidate, _, canonical) in candidates:
+                similarity = cosine_similarity(vectors[name], vectors[candidate])
+                if similarity >= best[0]:
+                    best = (similarity, canonical)
+
+        return best[1]
+
+    def _embed(self, names: list[str]) -> dict[str, list[float]]:
+        with self._lock:
+            vectors = {name: self._vectors[name] for name in names if name in self._vectors}
+        missing = [name for name in names if name not in vectors]
+        if len(missing) > 0:
+            embedded = dict(zip(missing, self.embedding_model.embed(missing)))
+            vectors.update(embedded)
+            with self._lock:
+                self._vectors.update(embedded)
+        return vectors
+
+    def _field(self, scope: tuple, name: str) -> str:
+        return json.dumps([scope[0], scope[1], list(scope[2]), name])
+
+    def _stored_alias(self, scope: tuple, name: str) -> dict | None:
+        # Aliases added by other processes since the index was loaded
+        if self.connection is None or self.key is None:
+            return None
+        value = self.connection.hget(self.key, self._field(scope, name))
+        return json.loads(value) if value else None
+
+    def _store_alias(self, scope: tuple, name: str, canonical: dict) -> dict:
+        if self.connection is None or self.key is None:
+            return canonical
+        field = self._field(scope, name)
+        # The first process to resolve a name wins
+        if not self.connection.hsetnx(self.key, field, json.dumps(canonical)):
+            return json.loads(self.connection.hget(self.key, field))
+        return canonical
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.connection is None or self.key is None:
+            return
+        for field, value in self.connection.hscan_iter(self.key, count=1000):
+            (label, others, keys, name) = json.loads(field)
+            self._add((label, others, tuple(keys)), name, json.loads(value))
+        logger.debug(f"Loaded {len(self._aliases)} entity aliases")
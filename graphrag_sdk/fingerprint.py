@@ -0,0 +1,161 @@
+import json
+import hashlib
+import logging
+from graphrag_sdk.document import Document
+
+logger = logging.getLogger(__name__)
+
+# Bump when a change to the extraction logic requires documents to be re-extracted
+EXTRACTION_VERSION = "1"
+
+
+class DocumentFingerprint:
+    """
+    Identifies the content a document had when it was last ingested.
+
+    Attributes:
+        source (str): The path of the document's source.
+        index (int): The position of the document within its source.
+        content_hash (str): The hash of the document's content.
+        version (str): The extraction version, covering the ontology and instructions used.
+    """
+
+    def __init__(self, source: str, index: int, content_hash: str, version: str):
+        """
+        Initializes a new DocumentFingerprint object.
+
+        Args:
+            source (str): The path of the document's source.
+            index (int): The position of the document within its source.
+            content_hash (str): The hash of the document's content.
+            version (str): The extraction version.
+        """
+        self.source = source
+        self.index = index
+        self.content_hash = content_hash
+        self.version = version
+
+    @staticmethod
+    def from_document(
+        source: str, index: int, document: Document, version: str
+    ) -> "DocumentFingerprint":
+        """
+        Fingerprints a document.
+
+        Args:
+            source (str): The path of the document's source.
+            index (int): The position of the document within its source.
+            document (Document): The document.
+            version (str): The extraction version.
+
+        Returns:
+            DocumentFingerprint: The document fingerprint.
+        """
+        return DocumentFingerprint(
+            source,
+            index,
+            hashlib.sha256(document.content.encode("utf-8")).hexdigest(),
+            version,
+        )
+
+    @staticmethod
+    def extraction_version(*parts: str | None) -> str:
+        """
+        Computes an extraction version from everything that shapes the extraction,
+        e.g. the system instruction holding the ontology and the user instructions.
+
+        Args:
+            *parts (str | None): The extraction inputs.
+
+        Returns:
+            str: The extraction version.
+        """
+        payload = json.dumps([EXTRACTION_VERSION, *parts])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def key(self) -> str:
+        """
+        The key identifying the document, independently of its content.
+        """
+        return f"{self.source}:{self.index}"
+
+    def to_json(self) -> dict:
+        return {
+            "source": self.source,
+            "index": self.index,
+            "content_hash": self.content_hash,
+            "version": self.version,
+        }
+
+    @staticmethod
+    def from_json(json: dict) -> "DocumentFingerprint":
+        return DocumentFingerprint(
+            json["source"],
+            json["index"],
+            json["content_hash"],
+            json["version"],
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DocumentFingerprint):
+            return False
+        return self.to_json() == other.to_json()
+
+    def __str__(self) -> str:
+        return f"DocumentFingerprint(source={self.source}, index={self.index}, content_hash={self.content_hash}, version={self.version})"
+
+
+class FingerprintStore:
+    """
+    Persists the fingerprints of successfully ingested documents in FalkorDB,
+    in a hash stored next to the knowledge graph, so they survive restarts.
+
+    Args:
+        connection (redis.Redis): The FalkorDB connection.
+        graph_name (str): The knowledge graph name.
+    """
+
+    def __init__(self, connection, graph_name: str):
+        self.connection = connection
+        self.key = f"graphrag:{graph_name}:fingerprints"
+
+    def get(self, key: str) -> DocumentFingerprint | None:
+        """
+        Retrieves the fingerprint a document had when it was last ingested.
+
+        Args:
+            key (str): The document key.
+
+        Returns:
+            DocumentFingerprint | None: The stored fingerprint, or None if the document was never ingested.
+        """
+        value = self.connection.hget(self.key, key)
+        return DocumentFingerprint.from_json(json.loads(value)) if value else None
+
+    def is_unchanged(self, fingerprint: DocumentFingerprint) -> bool:
+        """
+        Checks whether a document was already ingested with the same content and extraction version.
+
+        Args:
+            fingerprint (DocumentFingerprint): The current document fingerprint.
+
+        Returns:
+            bool: True if the document is unchanged since it was last ingested.
+        """
+        return self.get(fingerprint.key) == fingerprint
+
+    def save(self, fingerprint: DocumentFingerprint) -> None:
+        """
+        Records a successfully ingested document.
+
+        Args:
+            fingerprint (DocumentFingerprint): The document fingerprint.
+        """
+        self.connection.hset(self.key, fingerprint.key, json.dumps(fingerprint.to_json()))
+
+    def delete(self) -> None:
+        """
+        Deletes all stored fingerprints.
+        """
+        self.connection.delete(self.key)
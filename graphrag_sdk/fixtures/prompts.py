@@ -570,3 +570,12 @@ Your response should be a json object with the following schema:
   "new_step": ... # Required if code is "update_step"
 }}
 """
+
+HISTORY_SUMMARY_PROMPT = """
+Summarize the following conversation between a user and an assistant.
+Keep every fact, entity, name and decision needed to continue the conversation, drop greetings and repetitions.
+Respond with the summary only.
+
+Conversation:
+{conversation}
+"""
@@ -0,0 +1,294 @@
+import logging
+from falkordb import Graph
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.helpers import quote_cypher_identifier
+from graphrag_sdk.query_cache import GraphVersion
+from graphrag_sdk.metrics import get_metrics
+from graphrag_sdk.validation import AttributesValidator, EntityValidator
+from graphrag_sdk.models.embedding import EmbeddingModel
+from graphrag_sdk.vector_index import EMBEDDING_ATTRIBUTE, entity_text
+from graphrag_sdk.entity_resolution import EntityResolver
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Errors of the connection rather than of the rows written, never counted as failed rows
+_CONNECTION_ERRORS = (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError)
+
+
+def _property_map(keys: tuple, row_key: str) -> str:
+    """
+    Builds a Cypher property map that reads its values from an UNWIND row.
+
+    Args:
+        keys (tuple): The property names.
+        row_key (str): The row field holding the values.
+
+    Returns:
+        str: The Cypher property map, e.g. `{`name`: row.unique.`name`}`.
+    """
+    if len(keys) == 0:
+        return ""
+    properties = []
+    for key in keys:
+        key = quote_cypher_identifier(key)
+        properties.append(f"{key}: row.{row_key}.{key}")
+    return "{" + ", ".join(properties) + "}"
+
+
+def _clean_properties(properties: dict) -> dict:
+    """
+    Replaces missing values with empty strings, matching how the SDK stores them.
+
+    Args:
+        properties (dict): The properties to clean.
+
+    Returns:
+        dict: The cleaned properties.
+    """
+    if not isinstance(properties, dict):
+        return {}
+    return {
+        key: (value if value is not None else "") for key, value in properties.items()
+    }
+
+
+class GraphWriter:
+    """
+    Buffers extracted entities and relations and writes them to the graph in batches.
+
+    Entities are grouped per label and relations per (label, source label, target label),
+    each group being flushed as a parameterized `UNWIND $rows AS row MERGE ...` statement,
+    so a document costs a handful of round trips instead of one per entity and relation.
+
+    Args:
+        graph (Graph): The graph to write to.
+        ontology (Ontology): The ontology used to validate the extracted data.
+        batch_size (int): The number of buffered rows that triggers a flush.
+        graph_version (GraphVersion | None): The graph version, bumped by each flush that writes rows.
+        embedding_model (EmbeddingModel | None): The model embedding entities as they are written, if any.
+        entity_resolver (EntityResolver | None): The resolver mapping entities and relation endpoints to canonical ones, if any.
+
+    Examples:
+        >>> writer = GraphWriter(graph, ontology)
+        >>> writer.add_entity({"label": "Actor", "attributes": {"name": "Tom Hanks"}})
+        >>> writer.flush()
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        ontology: Ontology,
+        batch_size: int = 500,
+        graph_version: GraphVersion | None = None,
+        embedding_model: EmbeddingModel | None = None,
+        entity_resolver: EntityResolver | None = None,
+    ):
+        self.graph = graph
+        self.ontology = ontology
+        self.batch_size = batch_size
+        self.graph_version = graph_version
+        self.embedding_model = embedding_model
+        self.entity_resolver = entity_resolver
+        self._entities: dict[tuple, list[dict]] = {}
+        self._relations: dict[tuple, list[dict]] = {}
+        self._pending = 0
+        self._failed = 0
+
+    def add_entity(self, args: dict) -> bool:
+        """
+        Buffers an extracted entity.
+
+        Args:
+            args (dict): The extracted entity, with a label and attributes.
+
+        Returns:
+            bool: True if the entity was buffered, False if it is not part of the ontology.
+        """
+        validator = self.ontology.validator().entity(args["label"])
+        if validator is None:
+            logger.debug(f"Entity with label {args['label']} not found in ontology")
+            return False
+
+        (unique_attributes, non_unique_attributes) = validator.split(
+            args.get("attributes", {})
+        )
+        if self.entity_resolver is not None:
+            unique_attributes = self.entity_resolver.resolve(validator.label, unique_attributes)
+
+        key = (validator.label, validator.unique)
+        self._entities.setdefault(key, []).append(
+            {"unique": unique_attributes, "attributes": non_unique_attributes}
+        )
+        self._added()
+        return True
+
+    def add_relation(self, args: dict) -> bool:
+        """
+        Buffers an extracted relation.
+
+        Args:
+            args (dict): The extracted relation, with a label, source, target and attributes.
+
+        Returns:
+            bool: True if the relation was buffered, False if it is not part of the ontology.
+        """
+        relations = self.ontology.get_relations_with_label(args["label"])
+        if len(relations) == 0:
+            logger.debug(f"Relations with label {args['label']} not found in ontology")
+            return False
+
+        validator = self.ontology.validator()
+        source_attributes = self._endpoint(
+            validator.entity(args["source"]["label"]),
+            args["source"].get("attributes", {}) if "source" in args else {},
+        )
+        target_attributes = self._endpoint(
+            validator.entity(args["target"]["label"]),
+            args["target"].get("attributes", {}) if "target" in args else {},
+        )
+        attributes = self._normalize(
+            validator.relation(
+                relations[0].label, args["source"]["label"], args["target"]["label"]
+            ),
+            args.get("attributes", {}),
+        )
+
+        key = (
+            relations[0].label,
+            args["source"]["label"],
+            args["target"]["label"],
+            tuple(source_attributes.keys()),
+            tuple(target_attributes.keys()),
+        )
+        self._relations.setdefault(key, []).append(
+            {
+                "source": source_attributes,
+                "target": target_attributes,
+                "attributes": attributes,
+            }
+        )
+        self._added()
+        return True
+
+    def flush(self) -> int:
+        """
+        Writes all buffered entities, then all buffered relations, to the graph.
+
+        Returns:
+            int: The number of rows that failed to be written, including those of
+                the flushes triggered by full batches since the last call.
+        """
+        entities, self._entities = self._entities, {}
+        relations, self._relations = self._relations, {}
+        self._pending = 0
+        failed, self._failed = self._failed, 0
+
+        if len(entities) == 0 and len(relations) == 0:
+            return failed
+
+        embedded = self.embedding_model is not None
+        for (label, unique_keys), rows in entities.items():
+            if embedded:
+                self._embed(rows)
+            failed += self._write(
+                self._entity_query(label, unique_keys, embedded), rows, "entity"
+            )
+
+        for (label, source, target, source_keys, target_keys), rows in relations.items():
+            failed += self._write(
+                self._relation_query(label, source, target, source_keys, target_keys),
+                rows,
+                "relation",
+            )
+
+        # Invalidate cached query results
+        if self.graph_version is not None:
+            self.graph_version.bump()
+
+        return failed
+
+    @staticmethod
+    def _normalize(validator: AttributesValidator | None, values: dict) -> dict:
+        # Values of entities and relations missing from the ontology are only cleaned
+        if validator is None:
+            return _clean_properties(values)
+        return validator.normalize(values)
+
+    def _endpoint(self, validator: EntityValidator | None, values: dict) -> dict:
+        values = self._normalize(validator, values)
+        if self.entity_resolver is None or validator is None:
+            return values
+        # Endpoints are matched on their unique attributes, resolved like entities
+        unique = {name: values[name] for name in validator.unique if name in values}
+        if len(unique) == 0 or len(unique) < len(validator.unique):
+            return values
+        return {**values, **self.entity_resolver.resolve(validator.label, unique)}
+
+    def _embed(self, rows: list[dict]) -> None:
+        # A single model call per label and flush
+        metrics = get_metrics()
+        with metrics.span("graphrag.embed"):
+            vectors = self.embedding_model.embed(
+                [entity_text(row["unique"], row["attributes"]) for row in rows]
+            )
+        metrics.record("graphrag.embed.texts", len(rows))
+        for row, vector in zip(rows, vectors):
+            row["embedding"] = vector
+
+    def _added(self):
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._failed += self.flush()
+
+    def _write(self, query: str, rows: list[dict], kind: str) -> int:
+        logger.debug(f"Query: {query} ({len(rows)} rows)")
+        metrics = get_metrics()
+        failed = 0
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i : i + self.batch_size]
+            try:
+                with metrics.span("graphrag.write", {"kind": kind}):
+                    self.graph.query(query, {"rows": batch})
+                metrics.record("graphrag.write.rows", len(batch), {"kind": kind})
+            except _CONNECTION_ERRORS:
+                raise
+            except Exception as e:
+                logger.debug(f"Batch write failed, retrying row by row: {e}")
+                # Isolate the offending rows so a single bad value does not drop the batch
+                for row in batch:
+                    try:
+                        self.graph.query(query, {"rows": [row]})
+                    except _CONNECTION_ERRORS:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error writing row {row}: {e}")
+                        failed += 1
+        return failed
+
+    @staticmethod
+    def _entity_query(label: str, unique_keys: tuple, embedded: bool = False) -> str:
+        query = (
+            f"UNWIND $rows AS row "
+            f"MERGE (n:{quote_cypher_identifier(label)} {_property_map(unique_keys, 'unique')}) "
+            f"SET n += row.attributes"
+        )
+        if embedded:
+            query += f", n.{quote_cypher_identifier(EMBEDDING_ATTRIBUTE)} = vecf32(row.embedding)"
+        return query
+
+    @staticmethod
+    def _relation_query(
+        label: str,
+        source: str,
+        target: str,
+        source_keys: tuple,
+        target_keys: tuple,
+    ) -> str:
+        return (
+            f"UNWIND $rows AS row "
+            f"MATCH (s:{quote_cypher_identifier(source)} {_property_map(source_keys, 'source')}) "
+            f"MATCH (d:{quote_cypher_identifier(target)} {_property_map(target_keys, 'target')}) "
+            f"MERGE (s)-[r:{quote_cypher_identifier(label)}]->(d) "
+            f"SET r += row.attributes"
+        )
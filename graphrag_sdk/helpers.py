@@ -1,7 +1,11 @@
 import re
 import graphrag_sdk
 import logging
+from typing import Callable, Iterable, Iterator
+from collections import deque
+from concurrent.futures import Executor, Future, wait
 from fix_busted_json import repair_json
+from graphrag_sdk.cypher_parser import find_cypher_errors
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,42 @@ def extract_json(text: str | dict, skip_repair=False) -> str:
         return "".join(matches)
 
 
+def submit_bounded(
+    executor: Executor,
+    fn: Callable,
+    items: Iterable[tuple],
+    max_pending: int,
+) -> Iterator[Future]:
+    """
+    Submits `fn(*item)` for every item while keeping at most `max_pending` tasks in flight.
+
+    Items are consumed lazily, so a streaming source is only read as fast as the
+    executor drains it and memory stays bounded regardless of the number of items.
+    Tasks are returned in submission order, so results are combined deterministically.
+
+    Args:
+        executor (Executor): The executor to submit the tasks to.
+        fn (Callable): The task function.
+        items (Iterable[tuple]): The task arguments.
+        max_pending (int): The maximum number of submitted but unfinished tasks.
+
+    Returns:
+        Iterator[Future]: The completed tasks, in submission order.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_pending:
+            head = pending.popleft()
+            wait([head])
+            yield head
+        pending.append(executor.submit(fn, *item))
+
+    while pending:
+        head = pending.popleft()
+        wait([head])
+        yield head
+
+
 def map_dict_to_cypher_properties(d: dict):
     cypher = "{"
     if isinstance(d, list):
@@ -49,6 +89,46 @@ def map_dict_to_cypher_properties(d: dict):
     return cypher
 
 
+def quote_cypher_identifier(name: str) -> str:
+    """
+    Quotes a label or property name so it can be safely embedded in a Cypher query.
+
+    Args:
+        name (str): The label or property name.
+
+    Returns:
+        str: The backtick-quoted name.
+    """
+    return "`" + str(name).replace("`", "") + "`"
+
+
+def map_dict_to_cypher_parameters(d: dict, prefix: str) -> tuple[str, dict]:
+    """
+    Builds a Cypher property map whose values are passed as query parameters.
+
+    Unlike `map_dict_to_cypher_properties`, the generated map only depends on the
+    keys of `d`, so queries of the same shape share a single cached execution plan.
+
+    Args:
+        d (dict): The properties.
+        prefix (str): The prefix of the generated parameter names.
+
+    Returns:
+        tuple[str, dict]: The property map, e.g. `{`name`: $n0}`, and its parameters.
+
+    Examples:
+        >>> map_dict_to_cypher_parameters({"name": "Tom Hanks"}, "n")
+        ('{`name`: $n0}', {'n0': 'Tom Hanks'})
+    """
+    properties = []
+    params = {}
+    for i, (key, value) in enumerate(d.items()):
+        param = f"{prefix}{i}"
+        properties.append(f"{quote_cypher_identifier(key)}: ${param}")
+        params[param] = value if value is not None else ""
+    return "{" + ", ".join(properties) + "}", params
+
+
 def stringify_falkordb_response(response):
     if not isinstance(response, list) or len(response) == 0:
         data = str(response).strip()
@@ -78,136 +158,43 @@ def extract_cypher(text: str):
 
 
 def validate_cypher(
-    cypher: str, ontology: graphrag_sdk.Ontology
+    cypher: str, ontology: "graphrag_sdk.Ontology"
 ) -> list[str] | None:
-    try:
-        if not cypher or len(cypher) == 0:
-            return ["Cypher statement is empty"]
-
-        errors = []
+    """
+    Checks a Cypher statement against an ontology, see `find_cypher_errors`.
 
-        # Check if entities exist in ontology
-        errors.extend(validate_cypher_entities_exist(cypher, ontology))
+    Args:
+        cypher (str): The Cypher statement.
+        ontology (Ontology): The ontology.
 
-        # Check if relations exist in ontology
-        errors.extend(validate_cypher_relations_exist(cypher, ontology))
+    Returns:
+        list[str] | None: The errors, None if none were found.
+    """
+    errors = find_cypher_errors(cypher, ontology)
+    if len(errors) > 0:
+        return [str(e) for e in errors]
 
-        # Check if relation directions are correct
-        errors.extend(validate_cypher_relation_directions(cypher, ontology))
+    return None
 
-        if len(errors) > 0:
-            return errors
 
-        return None
-    except Exception as e:
-        print(f"Failed to verify cypher labels: {e}")
-        return None
+def _cypher_errors_of_kind(
+    cypher: str, ontology: "graphrag_sdk.Ontology", kind: str
+) -> list[str]:
+    return [str(e) for e in find_cypher_errors(cypher, ontology) if e.kind == kind]
 
 
-def validate_cypher_entities_exist(cypher: str, ontology: graphrag_sdk.Ontology):
+def validate_cypher_entities_exist(cypher: str, ontology: "graphrag_sdk.Ontology"):
     # Check if entities exist in ontology
-    not_found_entity_labels = []
-    entity_labels = re.findall(r"\(:(.*?)\)", cypher)
-    for label in entity_labels:
-        label = label.split(":")[1] if ":" in label else label
-        label = label.split("{")[0].strip() if "{" in label else label
-        if label not in [entity.label for entity in ontology.entities]:
-            not_found_entity_labels.append(label)
-
-    return [
-        f"Entity {label} not found in ontology" for label in not_found_entity_labels
-    ]
+    return _cypher_errors_of_kind(cypher, ontology, "entity")
 
 
-def validate_cypher_relations_exist(cypher: str, ontology: graphrag_sdk.Ontology):
+def validate_cypher_relations_exist(cypher: str, ontology: "graphrag_sdk.Ontology"):
     # Check if relations exist in ontology
-    not_found_relation_labels = []
-    relation_labels = re.findall(r"\[:(.*?)\]", cypher)
-    for label in relation_labels:
-        label = label.split(":")[1] if ":" in label else label
-        label = label.split("{")[0].strip() if "{" in label else label
-        if label not in [relation.label for relation in ontology.relations]:
-            not_found_relation_labels.append(label)
-
-    return [
-        f"Relation {label} not found in ontology" for label in not_found_relation_labels
-    ]
+    return _cypher_errors_of_kind(cypher, ontology, "relation")
 
 
 def validate_cypher_relation_directions(
-    cypher: str, ontology: graphrag_sdk.Ontology
+    cypher: str, ontology: "graphrag_sdk.Ontology"
 ):
-
-    errors = []
-    relations = list(re.finditer(r"\[.*?\]", cypher))
-    i = 0
-    for relation in relations:
-        try:
-            relation_label = (
-                re.search(r"(?:\[)(?:\w)*(?:\:)([^{\]]+)", relation.group(0))
-                .group(1)
-                .strip()
-            )
-            prev_relation = relations[i - 1] if i > 0 else None
-            next_relation = relations[i + 1] if i < len(relations) - 1 else None
-            before = (
-                cypher[prev_relation.end() : relation.start()]
-                if prev_relation
-                else cypher[: relation.start()]
-            )
-            if "," in before:
-                before = before.split(",")[-1]
-            rel_before = re.search(r"([^\)\],]+)", before[::-1]).group(0)[::-1]
-            after = (
-                cypher[relation.end() : next_relation.start()]
-                if next_relation
-                else cypher[relation.end() :]
-            )
-            rel_after = re.search(r"([^\(\[,]+)", after).group(0)
-            entity_before = re.search(r"\(.+:(.*?)\)", before).group(0)
-            entity_after = re.search(r"\(([^\),]+)(\)?)", after).group(0)
-            if rel_before == "-" and rel_after == "->":
-                source = entity_before
-                target = entity_after
-            elif rel_before == "<-" and rel_after == "-":
-                source = entity_after
-                target = entity_before
-            else:
-                continue
-
-            source_label = re.search(r"(?:\:)([^\)\{]+)", source).group(1).strip()
-            target_label = re.search(r"(?:\:)([^\)\{]+)", target).group(1).strip()
-
-            ontology_relations = ontology.get_relations_with_label(relation_label)
-
-            if len(ontology_relations) == 0:
-                errors.append(f"Relation {relation_label} not found in ontology")
-
-            found_relation = False
-            for ontology_relation in ontology_relations:
-                if (
-                    ontology_relation.source.label == source_label
-                    and ontology_relation.target.label == target_label
-                ):
-                    found_relation = True
-                    break
-
-            if not found_relation:
-                errors.append(
-                    """
-                    Relation {relation_label} does not connect {source_label} to {target_label}. Make sure the relation direction is correct. 
-                    Valid relations: 
-                    {valid_relations}
-""".format(
-                        relation_label=relation_label,
-                        source_label=source_label,
-                        target_label=target_label,
-                        valid_relations="\n".join([str(e) for e in ontology_relations]),
-                    )
-                )
-
-            i += 1
-        except Exception:
-            continue
-
-    return errors
+    # Check if relations connect the right entities
+    return _cypher_errors_of_kind(cypher, ontology, "direction")
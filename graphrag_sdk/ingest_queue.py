@@ -0,0 +1,326 @@
+import json
+import socket
+import logging
+from os import getpid
+from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from graphrag_sdk.document import Document
+from graphrag_sdk.fingerprint import DocumentFingerprint
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from graphrag_sdk.task_log import default_task_log
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueue:
+    """
+    Queue of extraction jobs stored as a Redis stream on the FalkorDB server,
+    consumed by a consumer group so jobs are spread across worker processes and hosts.
+
+    A job is acknowledged once its data is written. A failed job is re-enqueued
+    until it has been attempted `max_attempts` times, then moved to a dead-letter stream.
+    Jobs left pending by a crashed worker are claimed by another worker after `claim_idle_ms`.
+
+    Args:
+        connection (redis.Redis): The FalkorDB connection.
+        graph_name (str): The knowledge graph name.
+        group (str): The consumer group name.
+        max_attempts (int): The number of times a job is attempted before being dead-lettered.
+        claim_idle_ms (int): The time after which a job pending on a worker is claimed by another.
+    """
+
+    def __init__(
+        self,
+        connection,
+        graph_name: str,
+        group: str = "workers",
+        max_attempts: int = 3,
+        claim_idle_ms: int = 300000,
+    ):
+        self.connection = connection
+        self.stream = f"graphrag:{graph_name}:ingest"
+        self.dead_letter_stream = f"graphrag:{graph_name}:ingest:dead"
+        self.group = group
+        self.max_attempts = max_attempts
+        self.claim_idle_ms = claim_idle_ms
+        self._group_created = False
+
+    def _ensure_group(self) -> None:
+        if self._group_created:
+            return
+        try:
+            self.connection.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise e
+        self._group_created = True
+
+    def enqueue(self, job: dict) -> str:
+        """
+        Adds a job to the queue.
+
+        Args:
+            job (dict): The job.
+
+        Returns:
+            str: The job id.
+        """
+        self._ensure_group()
+        return self.connection.xadd(self.stream, {"job": json.dumps(job)})
+
+    def read(self, consumer: str, count: int = 1, block_ms: int = 5000) -> list[tuple[str, dict]]:
+        """
+        Reads jobs for a consumer, reclaiming jobs abandoned by crashed workers first.
+
+        Args:
+            consumer (str): The consumer name.
+            count (int): The maximum number of jobs to read.
+            block_ms (int): How long to wait for new jobs.
+
+        Returns:
+            list[tuple[str, dict]]: The job ids and jobs.
+        """
+        self._ensure_group()
+
+        entries = self.connection.xautoclaim(
+            self.stream,
+            self.group,
+            consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=count,
+        )[1]
+        jobs = []
+        for (entry_id, fields) in entries:
+            if fields is None:
+                continue
+            job = json.loads(fields["job"])
+            if self._delivery_count(entry_id) > self.max_attempts:
+                # The job keeps crashing its workers
+                self._dead_letter(entry_id, job, "Worker stopped while processing the job")
+                continue
+            jobs.append((entry_id, job))
+
+        if len(jobs) > 0:
+            return jobs
+
+        response = self.connection.xreadgroup(
+            self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        return [
+            (entry_id, json.loads(fields["job"]))
+            for (_, entries) in response or []
+            for (entry_id, fields) in entries
+        ]
+
+    def ack(self, job_id: str) -> None:
+        """
+        Acknowledges a processed job, removing it from the queue.
+
+        Args:
+            job_id (str): The job id.
+        """
+        pipeline = self.connection.pipeline(transaction=True)
+        self._ack(pipeline, job_id)
+        pipeline.execute()
+
+    def _ack(self, pipeline, job_id: str) -> None:
+        pipeline.xack(self.stream, self.group, job_id)
+        pipeline.xdel(self.stream, job_id)
+
+    def _move(self, job_id: str, stream: str, fields: dict) -> None:
+        # Added and acknowledged in a MULTI transaction, so a crash cannot duplicate the job
+        pipeline = self.connection.pipeline(transaction=True)
+        pipeline.xadd(stream, fields)
+        self._ack(pipeline, job_id)
+        pipeline.execute()
+
+    def fail(self, job_id: str, job: dict, error: str) -> None:
+        """
+        Records a failed job, re-enqueuing it or moving it to the dead-letter stream.
+
+        Args:
+            job_id (str): The job id.
+            job (dict): The job.
+            error (str): The failure reason.
+        """
+        attempts = job.get("attempts", 0) + 1
+        if attempts >= self.max_attempts:
+            self._dead_letter(job_id, job, error)
+            return
+
+        self._move(job_id, self.stream, {"job": json.dumps({**job, "attempts": attempts})})
+
+    def _delivery_count(self, job_id: str) -> int:
+        pending = self.connection.xpending_range(
+            self.stream, self.group, min=job_id, max=job_id, count=1
+        )
+        return pending[0]["times_delivered"] if len(pending) > 0 else 0
+
+    def _dead_letter(self, job_id: str, job: dict, error: str) -> None:
+        logger.error(f"Moving job {job_id} to the dead-letter stream: {error}")
+        self._move(job_id, self.dead_letter_stream, {"job": json.dumps(job), "error": error})
+
+    def dead_letters(self, count: int = 100) -> list[tuple[dict, str]]:
+        """
+        Lists dead-lettered jobs.
+
+        Args:
+            count (int): The maximum number of jobs to list.
+
+        Returns:
+            list[tuple[dict, str]]: The jobs and their failure reason.
+        """
+        return [
+            (json.loads(fields["job"]), fields["error"])
+            for (_, fields) in self.connection.xrange(self.dead_letter_stream, count=count)
+        ]
+
+    def size(self) -> int:
+        """
+        Returns the number of jobs waiting or being processed.
+
+        Returns:
+            int: The number of jobs.
+        """
+        return self.connection.xlen(self.stream)
+
+    def delete(self) -> None:
+        """
+        Deletes the queue and its dead-letter stream.
+        """
+        self.connection.delete(self.stream, self.dead_letter_stream)
+        self._group_created = False
+
+
+def enqueue_documents(
+    queue: IngestQueue, step: ExtractDataStep, instructions: str = None
+) -> int:
+    """
+    Enqueues the documents of an extraction step's sources, chunked and
+    skipping unchanged documents, as jobs for ingest workers.
+
+    Args:
+        queue (IngestQueue): The queue.
+        step (ExtractDataStep): The extraction step holding the sources.
+        instructions (str): Additional instructions for the extraction model.
+
+    Returns:
+        int: The number of enqueued jobs.
+    """
+    count = 0
+    for document, source_instructions, fingerprint in step._documents(instructions):
+        queue.enqueue(
+            {
+                "content": document.content,
+                "offset": document.offset,
+                "source_instructions": source_instructions,
+                "instructions": instructions,
+                "fingerprint": fingerprint.to_json() if fingerprint is not None else None,
+            }
+        )
+        count += 1
+    logger.debug(f"Enqueued {count} documents")
+    return count
+
+
+class IngestWorker:
+    """
+    Consumes extraction jobs from an ingest queue, extracting and writing
+    each document with an extraction step. Run one worker per process,
+    on as many cores and hosts as needed.
+
+    Args:
+        queue (IngestQueue): The queue.
+        step (ExtractDataStep): The extraction step used to process jobs.
+        consumer (str | None): The consumer name, unique per worker, defaults to host and pid.
+        concurrency (int): The number of jobs processed concurrently.
+
+    Examples:
+        >>> kg.ingest_worker().run()
+    """
+
+    def __init__(
+        self,
+        queue: IngestQueue,
+        step: ExtractDataStep,
+        consumer: str | None = None,
+        concurrency: int = 8,
+    ):
+        self.queue = queue
+        self.step = step
+        self.consumer = consumer or f"{socket.gethostname()}-{getpid()}"
+        self.concurrency = concurrency
+        self.processed = 0
+        self.failed = 0
+
+    def _process(self, job: dict) -> None:
+        fingerprint = job.get("fingerprint")
+        failed = self.step._process_source(
+            "ingest_worker_" + str(uuid4()),
+            self.step._create_chat(),
+            Document(job["content"], offset=job.get("offset", 0)),
+            self.step.ontology,
+            self.step.graph,
+            job.get("source_instructions"),
+            job.get("instructions"),
+            DocumentFingerprint.from_json(fingerprint) if fingerprint else None,
+        )
+        # Retried like any failed job rather than acknowledged with rows missing
+        if failed > 0:
+            raise Exception(f"Failed to write {failed} entities and relations")
+
+    def run(self, max_jobs: int | None = None, stop_when_empty: bool = False, block_ms: int = 5000) -> int:
+        """
+        Processes jobs until stopped.
+
+        Args:
+            max_jobs (int | None): Stop after processing this many jobs.
+            stop_when_empty (bool): Stop once the queue has no more jobs.
+            block_ms (int): How long to wait for new jobs on each read.
+
+        Returns:
+            int: The number of processed jobs.
+        """
+        try:
+            return self._run(max_jobs, stop_when_empty, block_ms)
+        finally:
+            # Write the task log records still buffered when the worker stops
+            (self.step.task_log or default_task_log()).flush()
+
+    def _run(self, max_jobs: int | None, stop_when_empty: bool, block_ms: int) -> int:
+        running: dict[Future, tuple[str, dict]] = {}
+        started = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                free = self.concurrency - len(running)
+                if max_jobs is not None:
+                    free = min(free, max_jobs - started)
+
+                if free > 0:
+                    jobs = self.queue.read(
+                        self.consumer, free, block_ms if len(running) == 0 else 1
+                    )
+                    for job_id, job in jobs:
+                        running[executor.submit(self._process, job)] = (job_id, job)
+                    started += len(jobs)
+                    if len(jobs) == 0 and len(running) == 0 and stop_when_empty:
+                        break
+
+                if len(running) == 0:
+                    if max_jobs is not None and started >= max_jobs:
+                        break
+                    continue
+
+                (done, _) = wait(running.keys(), timeout=1, return_when=FIRST_COMPLETED)
+                for task in done:
+                    (job_id, job) = running.pop(task)
+                    try:
+                        task.result()
+                        self.queue.ack(job_id)
+                        self.processed += 1
+                    except Exception as e:
+                        self.queue.fail(job_id, job, str(e))
+                        self.failed += 1
+
+        return self.processed
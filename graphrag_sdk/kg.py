@@ -1,16 +1,30 @@
 import logging
+from typing import Iterator
 from graphrag_sdk.ontology import Ontology
 from falkordb import FalkorDB
 from graphrag_sdk.source import AbstractSource
+from graphrag_sdk.connection import ConnectionManager
+from graphrag_sdk.metrics import get_metrics
+from graphrag_sdk.fingerprint import FingerprintStore
+from graphrag_sdk.ingest_queue import IngestQueue, IngestWorker, enqueue_documents
+from graphrag_sdk.query_cache import GraphVersion, QueryResultCache
+from graphrag_sdk.cypher_cache import CypherCache
+from graphrag_sdk.query_guard import QueryGuard
+from graphrag_sdk.context_builder import ContextBuilder
+from graphrag_sdk.entity_resolution import EntityResolver
 from graphrag_sdk.model_config import KnowledgeGraphModelConfig
 from graphrag_sdk.steps.extract_data_step import ExtractDataStep
 from graphrag_sdk.steps.graph_query_step import GraphQueryGenerationStep
+from graphrag_sdk.steps.vector_retrieval_step import VectorRetrievalStep, DEFAULT_MAX_DISTANCE
 from graphrag_sdk.fixtures.prompts import GRAPH_QA_SYSTEM, CYPHER_GEN_SYSTEM
 from graphrag_sdk.steps.qa_step import QAStep
 from graphrag_sdk.chat_session import ChatSession
-from graphrag_sdk.helpers import map_dict_to_cypher_properties
-from graphrag_sdk.attribute import AttributeType, Attribute
-from graphrag_sdk.models import GenerativeModelChatSession
+from graphrag_sdk.helpers import (
+    map_dict_to_cypher_parameters,
+    quote_cypher_identifier,
+)
+from graphrag_sdk.models import GenerativeModelChatSession, EmbeddingModel
+from graphrag_sdk.models.history import HistoryPolicy
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -31,6 +45,7 @@ class KnowledgeGraph:
         port: int = 6379,
         username: str | None = None,
         password: str | None = None,
+        db: FalkorDB | None = None,
     ):
         """
         Initialize Knowledge Graph
@@ -43,14 +58,27 @@ class KnowledgeGraph:
             username (str|None): FalkorDB username.
             password (str|None): FalkorDB password.
             ontology (Ontology|None): Ontology to use.
+            db (FalkorDB|None): FalkorDB client to use, e.g. from ConnectionManager.get,
+                defaults to the client shared by every knowledge graph on the same server.
         """
 
         if not isinstance(name, str) or name == "":
             raise Exception("name should be a non empty string")
 
-        # connect to database
-        self.db = FalkorDB(host=host, port=port, username=username, password=password)
+        # connect to database, sharing the pooled client of the server
+        self.db = db or ConnectionManager.get(host, port, username, password)
         self.graph = self.db.select_graph(name)
+        self.fingerprints = FingerprintStore(self.db.connection, name)
+        self.ingest_queue = IngestQueue(self.db.connection, name)
+        self.graph_version = GraphVersion(self.db.connection, name)
+        self.query_cache = None
+        self.cypher_cache = None
+        self.query_guard = QueryGuard()
+        self.context_builder = ContextBuilder()
+        self.embedding_model = None
+        self.vector_retrieval_config = {}
+        self.entity_resolver = None
+        self._indexed = None
 
         self._name = name
         self._ontology = ontology
@@ -85,41 +113,319 @@ class KnowledgeGraph:
 
         return [s.source for s in self.sources]
 
+    def with_query_cache(
+        self, max_size: int = 1000, ttl: float | None = None
+    ) -> "KnowledgeGraph":
+        """
+        Cache the results of the Cypher queries run to answer questions,
+        until the graph is modified through the SDK
+
+        Parameters:
+            max_size (int): maximum number of cached results
+            ttl (float|None): number of seconds a result is served for, None for no expiry
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.query_cache = QueryResultCache(self.graph_version, max_size, ttl)
+
+        return self
+
+    def with_cypher_cache(self, cypher_cache: CypherCache) -> "KnowledgeGraph":
+        """
+        Reuse the Cypher statements generated for similar questions in `ask`,
+        skipping the cypher generation model call
+
+        Parameters:
+            cypher_cache (CypherCache): the cache, e.g. InMemoryCypherCache(HashingEmbeddingModel())
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.cypher_cache = cypher_cache
+
+        return self
+
+    def with_query_guard(self, query_guard: QueryGuard | None) -> "KnowledgeGraph":
+        """
+        Guard the graph against expensive generated Cypher queries in `ask` and chat sessions,
+        by default with QueryGuard(): at most 100 rows, 5 hops per variable-length
+        relationship, a 10 seconds timeout and no cartesian products
+
+        Parameters:
+            query_guard (QueryGuard|None): the guard, None to run generated queries unchecked
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.query_guard = query_guard
+
+        return self
+
+    def with_context_builder(self, context_builder: ContextBuilder) -> "KnowledgeGraph":
+        """
+        Serialize the query results answering questions with the given builder,
+        by default ContextBuilder(): compact rows within a budget of 4000 tokens
+
+        Parameters:
+            context_builder (ContextBuilder): the builder, e.g. ContextBuilder(max_tokens=2000)
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.context_builder = context_builder
+
+        return self
+
+    def with_embeddings(
+        self,
+        embedding_model: EmbeddingModel,
+        top_k: int = 5,
+        max_distance: float | None = DEFAULT_MAX_DISTANCE,
+        max_neighbors: int = 100,
+    ) -> "KnowledgeGraph":
+        """
+        Embed the unique attributes and description of entities as they are ingested,
+        into vector indexes, enabling `ask(question, retrieval="hybrid")`
+
+        Parameters:
+            embedding_model (EmbeddingModel): the embedding model, e.g. OpenAiEmbeddingModel()
+            top_k (int): number of entities closest to the question retrieved
+            max_distance (float|None): cosine distance beyond which entities are not retrieved,
+                falling back to Cypher generation when none is close enough, None for no limit
+            max_neighbors (int): number of relationships around the retrieved entities returned
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.embedding_model = embedding_model
+        self.vector_retrieval_config = {
+            "top_k": top_k,
+            "max_distance": max_distance,
+            "max_neighbors": max_neighbors,
+        }
+
+        return self
+
+    def with_entity_resolution(
+        self,
+        similarity: float = 0.92,
+        embedding_model: EmbeddingModel | None = None,
+        embedding_similarity: float = 0.9,
+    ) -> "KnowledgeGraph":
+        """
+        Resolve extracted entities to canonical ones before they are written, merging
+        variants of a name such as "Tom Hanks", "tom hanks" and "Hanks, Tom" into one node.
+        Aliases are stored next to the graph and shared by every process ingesting into it
+
+        Parameters:
+            similarity (float): string similarity, between 0 and 1, from which names are merged
+            embedding_model (EmbeddingModel|None): model comparing names not similar enough as strings
+            embedding_similarity (float): cosine similarity from which names are merged by embedding
+
+        Returns:
+            KnowledgeGraph: the knowledge graph
+        """
+
+        self.entity_resolver = EntityResolver(
+            self.db.connection,
+            self.name,
+            similarity,
+            embedding_model,
+            embedding_similarity,
+        )
+
+        return self
+
+    def ensure_indexes(self, unique_constraints: bool = False) -> list[str]:
+        """
+        Create the missing indexes over the unique attributes of the ontology entities,
+        called before extracted data is written so entity merges stay index lookups
+
+        Parameters:
+            unique_constraints (bool): also constrain the unique attributes to be unique,
+                fails to apply if the graph already holds duplicated entities
+
+        Returns:
+            list[str]: created indexes and constraints
+        """
+
+        if self.ontology is None:
+            raise Exception("Ontology is not defined")
+
+        # Skip when the ontology did not change since the indexes were last ensured
+        vector_labels = (
+            (tuple(e.label for e in self.ontology.entities), self.embedding_model.dimension)
+            if self.embedding_model is not None
+            else None
+        )
+        definitions = (self.ontology.get_index_definitions(), vector_labels)
+        if self._indexed is not None and self._indexed[0] == definitions:
+            if self._indexed[1] or not unique_constraints:
+                return []
+
+        created = self.ontology.ensure_indexes(self.graph, unique_constraints)
+        if self.embedding_model is not None:
+            created += self.ontology.ensure_vector_indexes(
+                self.graph, self.embedding_model.dimension
+            )
+        self._indexed = (definitions, unique_constraints)
+
+        return created
+
     def process_sources(
-        self, sources: list[AbstractSource], instructions: str = None
+        self,
+        sources: list[AbstractSource],
+        instructions: str = None,
+        skip_unchanged: bool = True,
     ) -> None:
         """
         Add entities and relations found in sources into the knowledge-graph
 
         Parameters:
             sources (list[AbstractSource]): list of sources to extract knowledge from
+            instructions (str): additional instructions for the extraction model
+            skip_unchanged (bool): skip documents already ingested with the same content, ontology and instructions
         """
 
         if self.ontology is None:
             raise Exception("Ontology is not defined")
 
         # Create graph with sources
-        self._create_graph_with_sources(sources, instructions)
+        self._create_graph_with_sources(sources, instructions, skip_unchanged)
 
         # Add processed sources
         for src in sources:
             self.sources.add(src)
 
-    def _create_graph_with_sources(
-        self, sources: list[AbstractSource] | None = None, instructions: str = None
-    ):
+    async def aprocess_sources(
+        self,
+        sources: list[AbstractSource],
+        instructions: str = None,
+        skip_unchanged: bool = True,
+    ) -> None:
+        """
+        Asynchronously add entities and relations found in sources into the knowledge-graph.
+        Model calls and graph writes are bounded by the `max_concurrent_llm_requests`
+        and `max_concurrent_db_writes` settings of the extraction step.
+
+        Parameters:
+            sources (list[AbstractSource]): list of sources to extract knowledge from
+            instructions (str): additional instructions for the extraction model
+            skip_unchanged (bool): skip documents already ingested with the same content, ontology and instructions
+
+        Example:
+            >>> await kg.aprocess_sources(sources)
+        """
+
+        if self.ontology is None:
+            raise Exception("Ontology is not defined")
+
+        step = self._create_extract_data_step(sources, skip_unchanged)
+
+        await step.arun(instructions)
+
+        # Add processed sources
+        for src in sources:
+            self.sources.add(src)
+
+    def enqueue_sources(
+        self,
+        sources: list[AbstractSource],
+        instructions: str = None,
+        skip_unchanged: bool = True,
+    ) -> int:
+        """
+        Enqueue the documents of sources for ingest workers, instead of processing them in this process
+
+        Parameters:
+            sources (list[AbstractSource]): list of sources to extract knowledge from
+            instructions (str): additional instructions for the extraction model
+            skip_unchanged (bool): skip documents already ingested with the same content, ontology and instructions
+
+        Returns:
+            int: number of enqueued documents
+
+        Example:
+            >>> kg.enqueue_sources(sources)
+            >>> # then, in as many processes as needed
+            >>> kg.ingest_worker().run()
+        """
+
+        if self.ontology is None:
+            raise Exception("Ontology is not defined")
+
+        count = enqueue_documents(
+            self.ingest_queue,
+            self._create_extract_data_step(sources, skip_unchanged),
+            instructions,
+        )
+
+        # Add enqueued sources
+        for src in sources:
+            self.sources.add(src)
+
+        return count
+
+    def ingest_worker(self, consumer: str | None = None, concurrency: int = 8) -> IngestWorker:
+        """
+        Create a worker extracting and writing the documents enqueued by `enqueue_sources`
+
+        Parameters:
+            consumer (str|None): unique worker name, defaults to host and process id
+            concurrency (int): number of documents processed concurrently by the worker
+
+        Returns:
+            IngestWorker: the worker, start it with `run()`
+        """
 
-        step = ExtractDataStep(
+        if self.ontology is None:
+            raise Exception("Ontology is not defined")
+
+        return IngestWorker(
+            self.ingest_queue,
+            self._create_extract_data_step([], True),
+            consumer,
+            concurrency,
+        )
+
+    def _create_extract_data_step(
+        self, sources: list[AbstractSource], skip_unchanged: bool = True
+    ) -> ExtractDataStep:
+        self.ensure_indexes()
+
+        return ExtractDataStep(
             sources=list(sources),
             ontology=self.ontology,
             model=self._model_config.extract_data,
             graph=self.graph,
+            fingerprints=self.fingerprints if skip_unchanged else None,
+            graph_version=self.graph_version,
+            embedding_model=self.embedding_model,
+            entity_resolver=self.entity_resolver,
         )
 
+    def _create_graph_with_sources(
+        self,
+        sources: list[AbstractSource] | None = None,
+        instructions: str = None,
+        skip_unchanged: bool = True,
+    ):
+
+        step = self._create_extract_data_step(sources, skip_unchanged)
+
         step.run(instructions)
 
     def ask(
-        self, question: str, qa_chat_session: GenerativeModelChatSession | None = None
+        self,
+        question: str,
+        qa_chat_session: GenerativeModelChatSession | None = None,
+        retrieval: str = "cypher",
     ) -> tuple[str, GenerativeModelChatSession]:
         """
         Query the knowledge graph using natural language.
@@ -128,6 +434,8 @@ class KnowledgeGraph:
         Parameters:
             question (str): question to ask the knowledge graph
             qa_chat_session (GenerativeModelChatSession|None): qa_chat_session to use for the query
+            retrieval (str): "cypher" to generate a Cypher query answering the question, or "hybrid"
+                to retrieve the entities closest to the question and their neighbors, see `with_embeddings`
 
         Returns:
             tuple[str, GenerativeModelChatSession]: answer, qa_chat_session
@@ -137,21 +445,54 @@ class KnowledgeGraph:
             >>> print(ans)
         """
 
-        cypher_chat_session = (
-            self._model_config.cypher_generation.with_system_instruction(
-                CYPHER_GEN_SYSTEM.replace("#ONTOLOGY", str(self.ontology.to_json())),
-            ).start_chat()
-        )
-        cypher_step = GraphQueryGenerationStep(
-            ontology=self.ontology,
-            chat_session=cypher_chat_session,
-            graph=self.graph,
-        )
+        with get_metrics().span("graphrag.ask", {"retrieval": retrieval}):
+            (context, cypher) = self._retrieve(question, retrieval)
+
+            if not cypher or len(cypher) == 0:
+                return "I am sorry, I could not find the answer to your question"
 
-        (context, cypher) = cypher_step.run(question)
+            qa_chat_session = (
+                qa_chat_session
+                or self._model_config.qa.with_system_instruction(
+                    GRAPH_QA_SYSTEM
+                ).start_chat()
+            )
+            qa_step = QAStep(
+                chat_session=qa_chat_session,
+            )
+
+            answer = qa_step.run(question, cypher, context)
+
+            return (answer, qa_chat_session)
+
+    def ask_stream(
+        self,
+        question: str,
+        qa_chat_session: GenerativeModelChatSession | None = None,
+        retrieval: str = "cypher",
+    ) -> Iterator[str]:
+        """
+        Query the knowledge graph using natural language, yielding the answer as it is generated.
+        Optionally, you can provide a qa_chat_session to use for the query.
+
+        Parameters:
+            question (str): question to ask the knowledge graph
+            qa_chat_session (GenerativeModelChatSession|None): qa_chat_session to use for the query
+            retrieval (str): "cypher" or "hybrid", see `ask`
+
+        Returns:
+            Iterator[str]: answer chunks
+
+         Example:
+            >>> for chunk in kg.ask_stream("List a few movies in which Tom Hanks played in"):
+            ...     print(chunk, end="")
+        """
+
+        (context, cypher) = self._retrieve(question, retrieval)
 
         if not cypher or len(cypher) == 0:
-            return "I am sorry, I could not find the answer to your question"
+            yield "I am sorry, I could not find the answer to your question"
+            return
 
         qa_chat_session = (
             qa_chat_session
@@ -163,9 +504,47 @@ class KnowledgeGraph:
             chat_session=qa_chat_session,
         )
 
-        answer = qa_step.run(question, cypher, context)
+        yield from qa_step.run_stream(question, cypher, context)
+
+    def _retrieve(self, question: str, retrieval: str) -> tuple[str, str]:
+        if retrieval == "cypher":
+            return self._generate_cypher(question)
+        if retrieval != "hybrid":
+            raise Exception(f"Unknown retrieval {retrieval}, expected cypher or hybrid")
+        if self.embedding_model is None:
+            raise Exception("Hybrid retrieval requires embeddings, see with_embeddings")
+
+        vector_step = VectorRetrievalStep(
+            graph=self.graph,
+            ontology=self.ontology,
+            embedding_model=self.embedding_model,
+            config=self.vector_retrieval_config,
+            context_builder=self.context_builder,
+        )
+        (context, query) = vector_step.run(question)
+        if query is not None:
+            return (context, query)
+
+        # No entity is close enough to the question
+        return self._generate_cypher(question)
+
+    def _generate_cypher(self, question: str) -> tuple[str, str]:
+        cypher_chat_session = (
+            self._model_config.cypher_generation.with_system_instruction(
+                CYPHER_GEN_SYSTEM.replace("#ONTOLOGY", str(self.ontology.to_json())),
+            ).start_chat()
+        )
+        cypher_step = GraphQueryGenerationStep(
+            ontology=self.ontology,
+            chat_session=cypher_chat_session,
+            graph=self.graph,
+            query_cache=self.query_cache,
+            cypher_cache=self.cypher_cache,
+            query_guard=self.query_guard,
+            context_builder=self.context_builder,
+        )
 
-        return (answer, qa_chat_session)
+        return cypher_step.run(question)
 
     def delete(self) -> None:
         """
@@ -179,12 +558,28 @@ class KnowledgeGraph:
         if self.name in available_graphs:
             self.graph.delete()
 
+        # Delete ingested documents fingerprints and pending ingest jobs
+        self.fingerprints.delete()
+        self.ingest_queue.delete()
+        (self.entity_resolver or EntityResolver(self.db.connection, self.name)).delete()
+        # The version is bumped rather than deleted, so results cached
+        # by other processes are not served for a recreated graph
+        self.graph_version.bump()
+
         # Nullify all attributes
         for key in self.__dict__.keys():
             setattr(self, key, None)
 
-    def chat_session(self) -> ChatSession:
-        return ChatSession(self._model_config, self.ontology, self.graph)
+    def chat_session(self, history_policy: HistoryPolicy | None = None) -> ChatSession:
+        return ChatSession(
+            self._model_config,
+            self.ontology,
+            self.graph,
+            self.query_cache,
+            history_policy,
+            self.query_guard,
+            self.context_builder,
+        )
 
     def add_node(self, entity: str, attributes: dict):
         """
@@ -198,9 +593,11 @@ class KnowledgeGraph:
         self._validate_entity(entity, attributes)
 
         # Add node to graph
+        properties, params = map_dict_to_cypher_parameters(attributes, "n")
         self.graph.query(
-            f"MERGE (n:{entity} {map_dict_to_cypher_properties(attributes)})"
+            f"MERGE (n:{quote_cypher_identifier(entity)} {properties})", params
         )
+        self.graph_version.bump()
 
     def add_edge(
         self,
@@ -232,17 +629,21 @@ class KnowledgeGraph:
         )
 
         # Add relation to graph
+        source_properties, source_params = map_dict_to_cypher_parameters(
+            source_attr, "s"
+        )
+        target_properties, target_params = map_dict_to_cypher_parameters(
+            target_attr, "t"
+        )
+        properties, params = map_dict_to_cypher_parameters(attributes, "r")
         self.graph.query(
-            f"MATCH (s:{source} {map_dict_to_cypher_properties(source_attr)}) MATCH (t:{target} {map_dict_to_cypher_properties(target_attr)}) MERGE (s)-[r:{relation} {map_dict_to_cypher_properties(attributes)}]->(t)"
+            f"MATCH (s:{quote_cypher_identifier(source)} {source_properties}) MATCH (t:{quote_cypher_identifier(target)} {target_properties}) MERGE (s)-[r:{quote_cypher_identifier(relation)} {properties}]->(t)",
+            {**source_params, **target_params, **params},
         )
+        self.graph_version.bump()
 
-    def _validate_entity(self, entity: str, attributes: str):
-        ontology_entity = self.ontology.get_entity_with_label(entity)
-
-        if ontology_entity is None:
-            raise Exception(f"Entity {entity} not found in ontology")
-
-        self._validate_attributes_dict(attributes, ontology_entity.attributes)
+    def _validate_entity(self, entity: str, attributes: dict):
+        self.ontology.validator().validate_entity(entity, attributes)
 
     def _validate_relation(
         self,
@@ -253,44 +654,6 @@ class KnowledgeGraph:
         target_attr: dict,
         attributes: dict,
     ):
-        ontology_relations = self.ontology.get_relations_with_label(relation)
-
-        found_relation = [
-            relation
-            for relation in ontology_relations
-            if relation.source.label == source and relation.target.label == target
-        ]
-        if len(ontology_relations) == 0 or len(found_relation) == 0:
-            raise Exception(f"Relation {relation} not found in ontology")
-
-        self._validate_attributes_dict(attributes, found_relation[0].attributes)
-
-        self._validate_entity(source, source_attr)
-        self._validate_entity(target, target_attr)
-
-    def _validate_attributes_dict(
-        self, attr_dict: dict, attributes_list: list[Attribute]
-    ):
-        # validate attributes
-        for attr in attributes_list:
-            if attr.name not in attr_dict:
-                if attr.required or attr.unique:
-                    raise Exception(f"Attribute {attr.name} is required")
-
-        for attr in attr_dict.keys():
-            valid_attr = [a for a in attributes_list if a.name == attr]
-            if len(valid_attr) == 0:
-                raise Exception(f"Invalid attribute {attr}")
-            valid_attr = valid_attr[0]
-
-            if valid_attr.type == AttributeType.STRING:
-                if not isinstance(attr_dict[attr], str):
-                    raise Exception(f"Attribute {attr} should be a string")
-            elif valid_attr.type == AttributeType.NUMBER:
-                if not isinstance(attr_dict[attr], int) and not isinstance(
-                    attr_dict[attr], float
-                ):
-                    raise Exception(f"Attribute {attr} should be an number")
-            elif valid_attr.type == AttributeType.BOOLEAN:
-                if not isinstance(attr_dict[attr], bool):
-                    raise Exception(f"Attribute {attr} should be a boolean")
+        self.ontology.validator().validate_relation(
+            relation, source, target, source_attr, target_attr, attributes
+        )
@@ -0,0 +1,334 @@
+import time
+import bisect
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Awaitable, Callable, ContextManager, Iterator
+from graphrag_sdk.chunker import count_tokens
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace, metrics as otel_metrics
+except ImportError:
+    trace = None
+    otel_metrics = None
+
+
+class Span:
+    """
+    A timed pipeline stage, attributes can be added while it runs.
+
+    The duration of the stage is recorded with its initial attributes and its error, if any,
+    attributes added while it runs are only traced.
+
+    Args:
+        name (str): The stage name, e.g. "graphrag.llm".
+        attributes (dict | None): The stage attributes, low cardinality values only.
+    """
+
+    def __init__(self, name: str, attributes: dict | None = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.duration_attributes = dict(self.attributes)
+        self.start = time.perf_counter()
+
+    def set_attribute(self, key: str, value) -> None:
+        """
+        Sets an attribute of the span, not recorded with its duration.
+
+        Args:
+            key (str): The attribute name.
+            value (str | int | float | bool): The attribute value.
+        """
+        self.attributes[key] = value
+
+    def elapsed(self) -> float:
+        """
+        Returns the number of seconds since the span started.
+
+        Returns:
+            float: The span duration so far.
+        """
+        return time.perf_counter() - self.start
+
+    def set_error(self, error: BaseException) -> None:
+        """
+        Marks the span as failed, the error type being recorded with its duration.
+
+        Args:
+            error (BaseException): The error raised by the stage.
+        """
+        self.set_attribute("error", type(error).__name__)
+        self.duration_attributes["error"] = type(error).__name__
+
+
+class Metrics(ABC):
+    """
+    Receives the timings and measurements of the pipeline stages.
+
+    Every stage runs in a span whose duration is recorded in the `<span name>.duration`
+    histogram, in seconds. The stages are:
+
+    - graphrag.document: extracting and writing a document
+    - graphrag.load: loading and chunking the next document of a source
+    - graphrag.prompt: building an extraction prompt
+    - graphrag.llm: a model call, with the `graphrag.llm.prompt_tokens`
+      and `graphrag.llm.completion_tokens` histograms
+    - graphrag.json.extract and graphrag.json.repair: parsing a model response
+    - graphrag.write: a Cypher write statement, with the `graphrag.write.rows` histogram
+    - graphrag.embed: embedding the entities of a write, with the `graphrag.embed.texts` histogram
+    - graphrag.ask: answering a question
+    - graphrag.cypher.validate: validating a generated Cypher query
+    - graphrag.cypher.guard: bounding and explaining a generated Cypher query
+    - graphrag.cypher.query: running a generated Cypher query
+    - graphrag.vector.search: finding the entities closest to a question, and their neighbors,
+      with the `graphrag.vector.hits` histogram
+    - graphrag.qa: generating an answer, with the `graphrag.context.tokens`
+      and `graphrag.context.dropped_rows` histograms of the query results context
+
+    Attributes:
+        enabled (bool): Whether measurements are recorded, measurements costly to take are skipped when not.
+    """
+
+    enabled = True
+
+    @abstractmethod
+    def span(self, name: str, attributes: dict | None = None) -> ContextManager[Span]:
+        """
+        Times a pipeline stage.
+
+        Args:
+            name (str): The stage name.
+            attributes (dict | None): The stage attributes.
+
+        Returns:
+            ContextManager[Span]: The span, ended when the context exits.
+        """
+        pass
+
+    @abstractmethod
+    def record(self, name: str, value: float, attributes: dict | None = None) -> None:
+        """
+        Records a measurement in a histogram.
+
+        Args:
+            name (str): The histogram name.
+            value (float): The measurement.
+            attributes (dict | None): The measurement attributes.
+        """
+        pass
+
+
+class NoopMetrics(Metrics):
+    """
+    Metrics discarding everything, the default.
+    """
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name: str, attributes: dict | None = None) -> Iterator[Span]:
+        yield _NOOP_SPAN
+
+    def record(self, name: str, value: float, attributes: dict | None = None) -> None:
+        pass
+
+
+class _NoopSpan(Span):
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan("noop")
+
+
+class InMemoryMetrics(Metrics):
+    """
+    Metrics keeping every measurement in memory, summarized by `summary()`.
+    Meant for benchmarks, tests and short investigations rather than long running processes.
+
+    Examples:
+        >>> metrics = InMemoryMetrics()
+        >>> set_metrics(metrics)
+        >>> kg.process_sources(sources)
+        >>> metrics.summary()["graphrag.llm.duration"]["p95"]
+    """
+
+    def __init__(self):
+        self._values: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, attributes: dict | None = None) -> Iterator[Span]:
+        span = Span(name, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            self.record(f"{name}.duration", span.elapsed(), span.duration_attributes)
+
+    def record(self, name: str, value: float, attributes: dict | None = None) -> None:
+        with self._lock:
+            bisect.insort(self._values.setdefault(name, []), value)
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Summarizes the histograms.
+
+        Returns:
+            dict[str, dict]: The count, sum, mean, median, 95th percentile and maximum of each histogram.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": len(values),
+                    "sum": sum(values),
+                    "mean": sum(values) / len(values),
+                    "p50": values[len(values) // 2],
+                    "p95": values[int(0.95 * (len(values) - 1))],
+                    "max": values[-1],
+                }
+                for name, values in self._values.items()
+            }
+
+    def clear(self) -> None:
+        """
+        Removes all measurements.
+        """
+        with self._lock:
+            self._values.clear()
+
+
+class OpenTelemetryMetrics(Metrics):
+    """
+    Metrics exported through OpenTelemetry: spans are traced and every
+    histogram is an OpenTelemetry histogram. Requires `opentelemetry-api`,
+    configure the SDK and exporters as usual.
+
+    Args:
+        tracer (opentelemetry.trace.Tracer | None): The tracer, defaults to the global "graphrag_sdk" tracer.
+        meter (opentelemetry.metrics.Meter | None): The meter, defaults to the global "graphrag_sdk" meter.
+    """
+
+    def __init__(self, tracer=None, meter=None):
+        if trace is None:
+            raise Exception(
+                "OpenTelemetry is not installed, install it with `pip install opentelemetry-api`"
+            )
+        self.tracer = tracer or trace.get_tracer("graphrag_sdk")
+        self.meter = meter or otel_metrics.get_meter("graphrag_sdk")
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name: str):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self.meter.create_histogram(
+                    name, unit="s" if name.endswith(".duration") else "1"
+                )
+                self._histograms[name] = histogram
+            return histogram
+
+    @contextmanager
+    def span(self, name: str, attributes: dict | None = None) -> Iterator[Span]:
+        with self.tracer.start_as_current_span(name, attributes=attributes) as otel_span:
+            span = _OpenTelemetrySpan(otel_span, name, attributes)
+            try:
+                yield span
+            except BaseException as e:
+                span.set_error(e)
+                raise
+            finally:
+                self.record(f"{name}.duration", span.elapsed(), span.duration_attributes)
+
+    def record(self, name: str, value: float, attributes: dict | None = None) -> None:
+        self._histogram(name).record(value, attributes=attributes)
+
+
+class _OpenTelemetrySpan(Span):
+
+    def __init__(self, otel_span, name: str, attributes: dict | None = None):
+        super().__init__(name, attributes)
+        self._otel_span = otel_span
+
+    def set_attribute(self, key: str, value) -> None:
+        super().set_attribute(key, value)
+        self._otel_span.set_attribute(key, value)
+
+
+_metrics: Metrics = NoopMetrics()
+
+
+def get_metrics() -> Metrics:
+    """
+    Returns the process-wide metrics the pipeline reports to.
+
+    Returns:
+        Metrics: The metrics, no-op unless set with `set_metrics`.
+    """
+    return _metrics
+
+
+def set_metrics(metrics: Metrics | None) -> None:
+    """
+    Sets the process-wide metrics the pipeline reports to.
+
+    Args:
+        metrics (Metrics | None): The metrics, None to stop reporting.
+    """
+    global _metrics
+    _metrics = metrics or NoopMetrics()
+
+
+def _record_tokens(metrics: Metrics, step: str, prompt: str, text: str) -> None:
+    # Counts go to their own histograms, never to the attributes of the call duration
+    prompt_tokens = count_tokens(prompt)
+    completion_tokens = count_tokens(text or "")
+    metrics.record("graphrag.llm.prompt_tokens", prompt_tokens, {"step": step})
+    metrics.record("graphrag.llm.completion_tokens", completion_tokens, {"step": step})
+
+
+def measure_llm_call(step: str, prompt: str, call: Callable):
+    """
+    Times a model call in a `graphrag.llm` span and records its token counts.
+
+    Args:
+        step (str): The pipeline step making the call, e.g. "extract_data".
+        prompt (str): The prompt sent to the model.
+        call (Callable): Sends the prompt, returning a GenerationResponse.
+
+    Returns:
+        GenerationResponse: The model response.
+    """
+    metrics = get_metrics()
+    with metrics.span("graphrag.llm", {"step": step}):
+        response = call()
+        if metrics.enabled:
+            _record_tokens(metrics, step, prompt, response.text)
+        return response
+
+
+async def ameasure_llm_call(step: str, prompt: str, call: Callable[[], Awaitable]):
+    """
+    Asynchronous counterpart of `measure_llm_call`.
+
+    Args:
+        step (str): The pipeline step making the call, e.g. "extract_data".
+        prompt (str): The prompt sent to the model.
+        call (Callable[[], Awaitable]): Sends the prompt, returning a GenerationResponse.
+
+    Returns:
+        GenerationResponse: The model response.
+    """
+    metrics = get_metrics()
+    with metrics.span("graphrag.llm", {"step": step}):
+        response = await call()
+        if metrics.enabled:
+            _record_tokens(metrics, step, prompt, response.text)
+        return response
@@ -5,6 +5,20 @@ from .model import (
     GenerativeModelChatSession,
     GenerativeModelConfig,
 )
+from .response_cache import (
+    ResponseCache,
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+)
+from .embedding import EmbeddingModel, HashingEmbeddingModel
+from .history import HistoryPolicy, SlidingWindowPolicy, SummarizingPolicy
+from .rate_limiter import (
+    RateLimiter,
+    RateLimitBackend,
+    InMemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    default_rate_limiter,
+)
 
 
 __all__ = [
@@ -13,4 +27,17 @@ __all__ = [
     "GenerativeModel",
     "GenerativeModelChatSession",
     "GenerativeModelConfig",
+    "ResponseCache",
+    "InMemoryResponseCache",
+    "SQLiteResponseCache",
+    "HistoryPolicy",
+    "SlidingWindowPolicy",
+    "SummarizingPolicy",
+    "EmbeddingModel",
+    "HashingEmbeddingModel",
+    "RateLimiter",
+    "RateLimitBackend",
+    "InMemoryRateLimitBackend",
+    "RedisRateLimitBackend",
+    "default_rate_limiter",
 ]
\ No newline at end of file
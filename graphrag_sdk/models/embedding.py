@@ -0,0 +1,83 @@
+import re
+import math
+import hashlib
+from abc import ABC, abstractmethod
+
+_WORDS = re.compile(r"\w+")
+
+
+class EmbeddingModel(ABC):
+    """
+    A model turning texts into fixed size vectors, close for similar texts.
+    """
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """
+        The size of the embeddings.
+        """
+        pass
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds texts.
+
+        Args:
+            texts (list[str]): The texts to embed.
+
+        Returns:
+            list[list[float]]: The embeddings, one per text.
+        """
+        pass
+
+
+class HashingEmbeddingModel(EmbeddingModel):
+    """
+    Local embedding model hashing the words and word pairs of a text into a
+    normalized vector. It needs no external service and is deterministic, but only
+    texts sharing most of their words are close, e.g. rephrased or re-cased questions.
+
+    Args:
+        dimension (int): The size of the embeddings.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> list[float]:
+        words = _WORDS.findall(text.lower())
+        features = words + [f"{a} {b}" for (a, b) in zip(words, words[1:])]
+
+        vector = [0.0] * self._dimension
+        for feature in features:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self._dimension
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm > 0 else vector
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    """
+    Computes the cosine similarity of two vectors.
+
+    Args:
+        a (list[float]): The first vector.
+        b (list[float]): The second vector.
+
+    Returns:
+        float: The similarity, between -1 and 1.
+    """
+    dot = sum(x * y for (x, y) in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm > 0 else 0.0
@@ -1,4 +1,5 @@
 import os
+from typing import Generator
 from .model import (
     GenerativeModel,
     GenerativeModelConfig,
@@ -70,16 +71,7 @@ class GeminiGenerativeModel(GenerativeModel):
     ) -> GenerationResponse:
         return GenerationResponse(
             text=response.text,
-            finish_reason=(
-                FinishReason.MAX_TOKENS
-                if response.candidates[0].finish_reason
-                == protos.Candidate.FinishReason.MAX_TOKENS
-                else (
-                    FinishReason.STOP
-                    if response.candidates[0].finish_reason == protos.Candidate.FinishReason.STOP
-                    else FinishReason.OTHER
-                )
-            ),
+            finish_reason=_finish_reason(response.candidates[0].finish_reason),
         )
 
     def to_json(self) -> dict:
@@ -104,10 +96,98 @@ class GeminiChatSession(GenerativeModelChatSession):
 
     def __init__(self, model: GeminiGenerativeModel, args: dict | None = None):
         self._model = model
+        self._history_policy = args.get("history_policy") if args is not None else None
         self._chat_session = self._model._model.start_chat(
             history=args.get("history", []) if args is not None else [],
         )
 
     def send_message(self, message: str) -> GenerationResponse:
-        response = self._chat_session.send_message(message)
-        return self._model.parse_generate_content_response(response)
+        response = self._send_cached(
+            message,
+            lambda: self._model.parse_generate_content_response(
+                self._chat_session.send_message(message)
+            ),
+        )
+        self._apply_history_policy()
+        return response
+
+    def send_message_stream(
+        self, message: str
+    ) -> Generator[str, None, GenerationResponse]:
+        def stream():
+            # The chat history is updated once the response is fully consumed
+            finish_reason = None
+            for chunk in self._chat_session.send_message(message, stream=True):
+                if chunk.text:
+                    yield chunk.text
+                if chunk.candidates and chunk.candidates[0].finish_reason:
+                    finish_reason = _finish_reason(chunk.candidates[0].finish_reason)
+            return finish_reason
+
+        response = yield from self._stream_cached(message, stream)
+        self._apply_history_policy()
+        return response
+
+    async def asend_message(self, message: str) -> GenerationResponse:
+        async def send():
+            response = await self._chat_session.send_message_async(message)
+            return self._model.parse_generate_content_response(response)
+
+        response = await self._asend_cached(message, send)
+        self._apply_history_policy()
+        return response
+
+    def _apply_history_policy(self):
+        if self._history_policy is None:
+            return
+        history = [
+            {
+                "role": "assistant" if content.role == "model" else content.role,
+                "content": "".join(part.text for part in content.parts),
+            }
+            for content in self._chat_session.history
+        ]
+        bounded = self._history_policy.apply(history)
+        if bounded is history:
+            return
+        self._chat_session.history = [
+            protos.Content(
+                role="model" if m["role"] == "assistant" else m["role"],
+                parts=[protos.Part(text=m["content"])],
+            )
+            for m in bounded
+        ]
+
+    def _response_cache_key(self, message: str):
+        cache = self._model.response_cache
+        if cache is None:
+            return (None, None)
+        return (
+            cache,
+            cache.key(
+                self._model._model_name,
+                self._model._generation_config,
+                self._model._system_instruction,
+                [
+                    (content.role, [part.text for part in content.parts])
+                    for content in self._chat_session.history
+                ],
+                message,
+            ),
+        )
+
+    def _on_cached_response(self, message: str, response: GenerationResponse):
+        self._chat_session.history.extend(
+            [
+                protos.Content(role="user", parts=[protos.Part(text=message)]),
+                protos.Content(role="model", parts=[protos.Part(text=response.text)]),
+            ]
+        )
+
+
+def _finish_reason(finish_reason) -> str:
+    if finish_reason == protos.Candidate.FinishReason.MAX_TOKENS:
+        return FinishReason.MAX_TOKENS
+    if finish_reason == protos.Candidate.FinishReason.STOP:
+        return FinishReason.STOP
+    return FinishReason.OTHER
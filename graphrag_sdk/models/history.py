@@ -0,0 +1,145 @@
+import logging
+from abc import ABC, abstractmethod
+from graphrag_sdk.chunker import count_tokens
+from graphrag_sdk.fixtures.prompts import HISTORY_SUMMARY_PROMPT
+from .model import GenerativeModel
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the message holding the summary of evicted turns
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+class HistoryPolicy(ABC):
+    """
+    Bounds the chat history a session resends with every message.
+
+    Histories are lists of `{"role": ..., "content": ...}` messages, where the role
+    is "system", "user" or "assistant". Pass a policy to a chat session through
+    `model.start_chat({"history_policy": policy})`.
+    """
+
+    @abstractmethod
+    def apply(self, history: list[dict]) -> list[dict]:
+        """
+        Returns the history to keep.
+
+        Args:
+            history (list[dict]): The chat history, oldest message first.
+
+        Returns:
+            list[dict]: The bounded history.
+        """
+        pass
+
+
+class SlidingWindowPolicy(HistoryPolicy):
+    """
+    Keeps the most recent turns fitting a token budget, dropping older ones.
+
+    Args:
+        max_tokens (int): The token budget of the history.
+        target_tokens (int | None): The size the history is trimmed to once over budget, defaults to `max_tokens`.
+        pin_system (bool): Always keep the leading system message.
+        min_messages (int): The number of most recent messages kept even when over budget.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        target_tokens: int | None = None,
+        pin_system: bool = True,
+        min_messages: int = 2,
+    ):
+        self.max_tokens = max_tokens
+        self.target_tokens = target_tokens or max_tokens
+        self.pin_system = pin_system
+        self.min_messages = min_messages
+
+    def apply(self, history: list[dict]) -> list[dict]:
+        tokens = [count_tokens(m["content"] or "") for m in history]
+        if sum(tokens) <= self.max_tokens:
+            return history
+
+        pinned = 1 if self.pin_system and len(history) > 0 and history[0]["role"] == "system" else 0
+        # A previous summary stays pinned next to the system message
+        if len(history) > pinned + 1 and (history[pinned]["content"] or "").startswith(SUMMARY_PREFIX):
+            summary = history[pinned : pinned + 2]
+            start = pinned + 2
+        else:
+            summary = []
+            start = pinned
+
+        budget = self.target_tokens - sum(tokens[:start])
+        kept = len(history)
+        total = 0
+        while kept > start and (
+            len(history) - kept < self.min_messages or total + tokens[kept - 1] <= budget
+        ):
+            kept -= 1
+            total += tokens[kept]
+
+        # Start on a user message so turns are not split
+        while kept < len(history) - 1 and history[kept]["role"] != "user":
+            kept += 1
+
+        evicted = history[start:kept]
+        if len(evicted) == 0:
+            return history
+
+        logger.debug(f"Evicting {len(evicted)} messages from the chat history")
+        return history[:pinned] + self._summarize(summary, evicted) + history[kept:]
+
+    def _summarize(self, summary: list[dict], evicted: list[dict]) -> list[dict]:
+        """
+        Returns the messages replacing the evicted ones, none for a sliding window.
+        """
+        return []
+
+
+class SummarizingPolicy(SlidingWindowPolicy):
+    """
+    Keeps the most recent turns fitting a token budget, and replaces older ones
+    with a summary generated by a model, updated each time turns are evicted.
+
+    The history is trimmed to `target_tokens`, half the budget by default,
+    so the summary is regenerated every few turns rather than on every turn.
+
+    Args:
+        model (GenerativeModel): The model summarizing evicted turns.
+        max_tokens (int): The token budget of the history.
+        target_tokens (int | None): The size the history is trimmed to once over budget.
+        pin_system (bool): Always keep the leading system message.
+        min_messages (int): The number of most recent messages kept even when over budget.
+    """
+
+    def __init__(
+        self,
+        model: GenerativeModel,
+        max_tokens: int = 8000,
+        target_tokens: int | None = None,
+        pin_system: bool = True,
+        min_messages: int = 2,
+    ):
+        super().__init__(
+            max_tokens, target_tokens or max_tokens // 2, pin_system, min_messages
+        )
+        self.model = model
+
+    def _summarize(self, summary: list[dict], evicted: list[dict]) -> list[dict]:
+        conversation = "\n".join(
+            f"{m['role']}: {m['content']}" for m in [*summary[:1], *evicted]
+        )
+        try:
+            text = self.model.ask(
+                HISTORY_SUMMARY_PROMPT.format(conversation=conversation)
+            ).text
+        except Exception as e:
+            logger.error(f"Failed to summarize the chat history: {e}")
+            return summary
+
+        # A user/assistant pair keeps roles alternating for every provider
+        return [
+            {"role": "user", "content": SUMMARY_PREFIX + text},
+            {"role": "assistant", "content": "Understood."},
+        ]
@@ -1,4 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Awaitable, Callable, Generator
+
+if TYPE_CHECKING:
+    from .rate_limiter import RateLimiter
+    from .response_cache import ResponseCache
 
 
 class FinishReason:
@@ -85,12 +91,175 @@ class GenerativeModelChatSession(ABC):
     def send_message(self, message: str) -> GenerationResponse:
         pass
 
+    async def asend_message(self, message: str) -> GenerationResponse:
+        """
+        Sends a message without blocking the event loop.
+        Adapters with a native asynchronous client override this method,
+        by default the blocking `send_message` runs in a worker thread.
+
+        Args:
+            message (str): The message to send.
+
+        Returns:
+            GenerationResponse: The model response.
+        """
+        return await asyncio.to_thread(self.send_message, message)
+
+    def send_message_stream(
+        self, message: str
+    ) -> Generator[str, None, GenerationResponse]:
+        """
+        Sends a message, yielding the response text as it is generated.
+        Adapters with a streaming API override this method,
+        by default the whole response is yielded at once.
+
+        Args:
+            message (str): The message to send.
+
+        Returns:
+            Generator[str, None, GenerationResponse]: The response text chunks,
+                then the whole response with its finish reason as return value.
+        """
+        response = self.send_message(message)
+        yield response.text
+        return response
+
+    def _response_cache_key(
+        self, message: str
+    ) -> tuple["ResponseCache", str] | tuple[None, None]:
+        """
+        Returns the response cache of the session's model and the cache key of a message.
+        Adapters supporting response caching override this method.
+
+        Args:
+            message (str): The message to send.
+
+        Returns:
+            tuple[ResponseCache, str] | tuple[None, None]: The cache and key,
+                or (None, None) if caching is disabled.
+        """
+        return (None, None)
+
+    def _on_cached_response(self, message: str, response: GenerationResponse) -> None:
+        """
+        Records a message answered from the cache in the session history.
+
+        Args:
+            message (str): The message sent.
+            response (GenerationResponse): The cached response.
+        """
+        pass
+
+    def _send_cached(
+        self, message: str, send: Callable[[], GenerationResponse]
+    ) -> GenerationResponse:
+        (cache, key) = self._response_cache_key(message)
+        if cache is not None:
+            response = cache.get(key)
+            if response is not None:
+                self._on_cached_response(message, response)
+                return response
+
+        response = send()
+        if cache is not None:
+            cache.set(key, response)
+        return response
+
+    def _stream_cached(
+        self, message: str, stream: Callable[[], Generator[str, None, str | None]]
+    ) -> Generator[str, None, GenerationResponse]:
+        # `stream` yields the response chunks and returns the finish reason, if known
+        (cache, key) = self._response_cache_key(message)
+        if cache is not None:
+            response = cache.get(key)
+            if response is not None:
+                self._on_cached_response(message, response)
+                yield response.text
+                return response
+
+        chunks = []
+        finish_reason = yield from _collect(stream(), chunks)
+        response = GenerationResponse("".join(chunks), finish_reason or FinishReason.OTHER)
+
+        # Only completely consumed responses are cached, and only complete ones
+        if cache is not None and response.finish_reason == FinishReason.STOP:
+            cache.set(key, response)
+        return response
+
+    async def _asend_cached(
+        self, message: str, send: Callable[[], Awaitable[GenerationResponse]]
+    ) -> GenerationResponse:
+        (cache, key) = self._response_cache_key(message)
+        if cache is not None:
+            response = cache.get(key)
+            if response is not None:
+                self._on_cached_response(message, response)
+                return response
+
+        response = await send()
+        if cache is not None:
+            cache.set(key, response)
+        return response
+
+
+def _collect(stream: Generator[str, None, str | None], chunks: list[str]):
+    # Yields the chunks of a stream, keeping them, and returns its return value
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as stop:
+            return stop.value
+        chunks.append(chunk)
+        yield chunk
+
 
 class GenerativeModel(ABC):
     """
     A generative model that can be used to generate text.
     """
 
+    response_cache: "ResponseCache" = None
+    rate_limiter: "RateLimiter" = None
+
+    def with_response_cache(self, response_cache: "ResponseCache") -> "GenerativeModel":
+        """
+        Serves repeated prompts of the model's chat sessions from a response cache.
+
+        Args:
+            response_cache (ResponseCache): The cache to use, or None to disable caching.
+
+        Returns:
+            GenerativeModel: The model.
+        """
+        self.response_cache = response_cache
+
+        return self
+
+    def with_rate_limiter(self, rate_limiter: "RateLimiter") -> "GenerativeModel":
+        """
+        Paces the requests made to the model with a rate limiter,
+        which can be shared by several models and processes.
+
+        Args:
+            rate_limiter (RateLimiter): The rate limiter to use, or None for the default one.
+
+        Returns:
+            GenerativeModel: The model.
+        """
+        self.rate_limiter = rate_limiter
+
+        return self
+
+    def rate_limit_key(self) -> str:
+        """
+        Returns the key the model's requests are rate limited under, e.g. "OpenAiGenerativeModel:gpt-4o".
+
+        Returns:
+            str: The rate limit key.
+        """
+        model_name = getattr(self, "model_name", None) or getattr(self, "_model_name", "")
+        return f"{type(self).__name__}:{model_name}"
+
     @abstractmethod
     def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
         pass
@@ -1,10 +1,12 @@
 from .model import *
-from ollama import Client, Options
+from ollama import Client, AsyncClient, Options
+from typing import Generator
 
 
 class OllamaGenerativeModel(GenerativeModel):
 
     client: Client = None
+    async_client: AsyncClient = None
 
     def __init__(
         self,
@@ -24,9 +26,16 @@ class OllamaGenerativeModel(GenerativeModel):
 
         return self.client
 
+    def _get_async_model(self) -> AsyncClient:
+        if self.async_client is None:
+            self.async_client = AsyncClient(host=self._host)
+
+        return self.async_client
+
     def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
         self.system_instruction = system_instruction
         self.client = None
+        self.async_client = None
         self._get_model()
         self.client.pull(self.model_name)
 
@@ -40,7 +49,7 @@ class OllamaGenerativeModel(GenerativeModel):
             model=self.model_name,
             messages=[
                 {"role": "system", "content": self.system_instruction},
-                {"role": "user", "content": message[:14385]},
+                {"role": "user", "content": message},
             ],
             options=Options(
                 temperature=self.generation_config.temperature,
@@ -81,6 +90,7 @@ class OllamaChatSession(GenerativeModelChatSession):
     def __init__(self, model: OllamaGenerativeModel, args: dict | None = None):
         self._model = model
         self._args = args
+        self._history_policy = args.get("history_policy") if args is not None else None
         self._history = (
             [{"role": "system", "content": self._model.system_instruction}]
             if self._model.system_instruction is not None
@@ -88,11 +98,66 @@ class OllamaChatSession(GenerativeModelChatSession):
         )
 
     def send_message(self, message: str) -> GenerationResponse:
+        content = self._send_cached(
+            message,
+            lambda: self._model.parse_generate_content_response(
+                self._model.client.chat(**self._create_request(message))
+            ),
+        )
+        return self._add_exchange(message, content)
+
+    def send_message_stream(
+        self, message: str
+    ) -> Generator[str, None, GenerationResponse]:
+        def stream():
+            finish_reason = None
+            for chunk in self._model.client.chat(
+                **self._create_request(message), stream=True
+            ):
+                if chunk["message"]["content"]:
+                    yield chunk["message"]["content"]
+                if chunk.get("done"):
+                    finish_reason = (
+                        FinishReason.MAX_TOKENS
+                        if chunk.get("done_reason") == "length"
+                        else FinishReason.STOP
+                    )
+            return finish_reason
+
+        response = yield from self._stream_cached(message, stream)
+        return self._add_exchange(message, response)
+
+    async def asend_message(self, message: str) -> GenerationResponse:
+        async def send():
+            response = await self._model._get_async_model().chat(
+                **self._create_request(message)
+            )
+            return self._model.parse_generate_content_response(response)
+
+        content = await self._asend_cached(message, send)
+        return self._add_exchange(message, content)
+
+    def _response_cache_key(self, message: str):
+        cache = self._model.response_cache
+        if cache is None:
+            return (None, None)
+        return (
+            cache,
+            cache.key(
+                self._model.model_name,
+                self._model.generation_config,
+                self._model.system_instruction,
+                self._history,
+                message,
+            ),
+        )
+
+    def _create_request(self, message: str) -> dict:
         prompt = []
         prompt.extend(self._history)
-        prompt.append({"role": "user", "content": message[:14385]})
+        prompt.append({"role": "user", "content": message})
         print("OLLAMA chat prompt: " + str(prompt))
-        response = self._model.client.chat(
+        return dict(
             model=self._model.model_name,
             messages=prompt,
             options=Options(
@@ -113,7 +178,12 @@ class OllamaChatSession(GenerativeModelChatSession):
                 ),
             ),
         )
-        content = self._model.parse_generate_content_response(response)
+
+    def _add_exchange(
+        self, message: str, content: GenerationResponse
+    ) -> GenerationResponse:
         self._history.append({"role": "user", "content": message})
         self._history.append({"role": "assistant", "content": content.text})
+        if self._history_policy is not None:
+            self._history = self._history_policy.apply(self._history)
         return content
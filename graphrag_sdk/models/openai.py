@@ -5,12 +5,15 @@ from .model import (
     FinishReason,
     GenerativeModelChatSession,
 )
-from openai import OpenAI
+from .embedding import EmbeddingModel
+from openai import OpenAI, AsyncOpenAI
+from typing import Generator
 
 
 class OpenAiGenerativeModel(GenerativeModel):
 
     client: OpenAI = None
+    async_client: AsyncOpenAI = None
 
     def __init__(
         self,
@@ -28,9 +31,16 @@ class OpenAiGenerativeModel(GenerativeModel):
 
         return self.client
 
+    def _get_async_model(self) -> AsyncOpenAI:
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI()
+
+        return self.async_client
+
     def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
         self.system_instruction = system_instruction
         self.client = None
+        self.async_client = None
         self._get_model()
 
         return self
@@ -43,7 +53,7 @@ class OpenAiGenerativeModel(GenerativeModel):
             model=self.model_name,
             messages=[
                 {"role": "system", "content": self.system_instruction},
-                {"role": "user", "content": message[:14385]},
+                {"role": "user", "content": message},
             ],
             max_tokens=self.generation_config.max_output_tokens,
             temperature=self.generation_config.temperature,
@@ -56,15 +66,7 @@ class OpenAiGenerativeModel(GenerativeModel):
     def parse_generate_content_response(self, response: any) -> GenerationResponse:
         return GenerationResponse(
             text=response.choices[0].message.content,
-            finish_reason=(
-                FinishReason.STOP
-                if response.choices[0].finish_reason == "stop"
-                else (
-                    FinishReason.MAX_TOKENS
-                    if response.choices[0].finish_reason == "length"
-                    else FinishReason.OTHER
-                )
-            ),
+            finish_reason=_finish_reason(response.choices[0].finish_reason),
         )
 
     def to_json(self) -> dict:
@@ -85,6 +87,35 @@ class OpenAiGenerativeModel(GenerativeModel):
         )
 
 
+class OpenAiEmbeddingModel(EmbeddingModel):
+
+    client: OpenAI = None
+
+    def __init__(self, model_name: str = "text-embedding-3-small", dimension: int = 1536):
+        self.model_name = model_name
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _get_model(self) -> OpenAI:
+        if self.client is None:
+            self.client = OpenAI()
+
+        return self.client
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        args = {}
+        # Only the text-embedding-3 models can shorten their embeddings
+        if self.model_name.startswith("text-embedding-3"):
+            args["dimensions"] = self._dimension
+        response = self._get_model().embeddings.create(
+            model=self.model_name, input=texts, **args
+        )
+        return [d.embedding for d in response.data]
+
+
 class OpenAiChatSession(GenerativeModelChatSession):
 
     _history = []
@@ -92,6 +123,7 @@ class OpenAiChatSession(GenerativeModelChatSession):
     def __init__(self, model: OpenAiGenerativeModel, args: dict | None = None):
         self._model = model
         self._args = args
+        self._history_policy = args.get("history_policy") if args is not None else None
         self._history = (
             [{"role": "system", "content": self._model.system_instruction}]
             if self._model.system_instruction is not None
@@ -99,10 +131,65 @@ class OpenAiChatSession(GenerativeModelChatSession):
         )
 
     def send_message(self, message: str) -> GenerationResponse:
+        content = self._send_cached(
+            message,
+            lambda: self._model.parse_generate_content_response(
+                self._model.client.chat.completions.create(
+                    **self._create_request(message)
+                )
+            ),
+        )
+        return self._add_exchange(message, content)
+
+    def send_message_stream(
+        self, message: str
+    ) -> Generator[str, None, GenerationResponse]:
+        def stream():
+            finish_reason = None
+            for chunk in self._model.client.chat.completions.create(
+                **self._create_request(message), stream=True
+            ):
+                if len(chunk.choices) == 0:
+                    continue
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.choices[0].finish_reason is not None:
+                    finish_reason = _finish_reason(chunk.choices[0].finish_reason)
+            return finish_reason
+
+        response = yield from self._stream_cached(message, stream)
+        return self._add_exchange(message, response)
+
+    async def asend_message(self, message: str) -> GenerationResponse:
+        async def send():
+            response = await self._model._get_async_model().chat.completions.create(
+                **self._create_request(message)
+            )
+            return self._model.parse_generate_content_response(response)
+
+        content = await self._asend_cached(message, send)
+        return self._add_exchange(message, content)
+
+    def _response_cache_key(self, message: str):
+        cache = self._model.response_cache
+        if cache is None:
+            return (None, None)
+        return (
+            cache,
+            cache.key(
+                self._model.model_name,
+                self._model.generation_config,
+                self._model.system_instruction,
+                self._history,
+                message,
+            ),
+        )
+
+    def _create_request(self, message: str) -> dict:
         prompt = []
         prompt.extend(self._history)
-        prompt.append({"role": "user", "content": message[:14385]})
-        response = self._model.client.chat.completions.create(
+        prompt.append({"role": "user", "content": message})
+        return dict(
             model=self._model.model_name,
             messages=prompt,
             max_tokens=(
@@ -126,7 +213,20 @@ class OpenAiChatSession(GenerativeModelChatSession):
                 else None
             ),
         )
-        content = self._model.parse_generate_content_response(response)
+
+    def _add_exchange(
+        self, message: str, content: GenerationResponse
+    ) -> GenerationResponse:
         self._history.append({"role": "user", "content": message})
         self._history.append({"role": "assistant", "content": content.text})
+        if self._history_policy is not None:
+            self._history = self._history_policy.apply(self._history)
         return content
+
+
+def _finish_reason(finish_reason: str | None) -> str:
+    if finish_reason == "stop":
+        return FinishReason.STOP
+    if finish_reason == "length":
+        return FinishReason.MAX_TOKENS
+    return FinishReason.OTHER
@@ -0,0 +1,466 @@
+import time
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, TypeVar
+from graphrag_sdk.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """
+    Checks whether an exception raised by a model client reports an exceeded rate limit or quota.
+
+    Args:
+        e (Exception): The exception.
+
+    Returns:
+        bool: True if the request was rate limited.
+    """
+    # OpenAI and Ollama expose the HTTP status, Google API errors their code
+    for attribute in ("status_code", "code"):
+        if getattr(e, attribute, None) == 429:
+            return True
+    message = str(e).lower()
+    return any(
+        m in message
+        for m in (
+            "quota exceeded",
+            "rate limit",
+            "resource has been exhausted",
+            "too many requests",
+        )
+    )
+
+
+def retry_after(e: Exception) -> float | None:
+    """
+    Extracts the delay a rate limited request should be retried after.
+
+    Args:
+        e (Exception): The rate limit exception.
+
+    Returns:
+        float | None: The delay in seconds, or None if the provider did not specify one.
+    """
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers.get("retry-after-ms")) / 1000
+        if headers.get("retry-after") is not None:
+            return float(headers.get("retry-after"))
+    except ValueError:
+        # HTTP dates are not supported
+        pass
+    return None
+
+
+class RateLimitBackend(ABC):
+    """
+    Stores the request and token buckets of rate limited keys.
+    """
+
+    @abstractmethod
+    def reserve(
+        self,
+        key: str,
+        requests: int,
+        tokens: int,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+    ) -> float:
+        """
+        Takes requests and tokens from the buckets of a key if both hold enough.
+
+        Args:
+            key (str): The rate limit key.
+            requests (int): The number of requests to take.
+            tokens (int): The number of tokens to take.
+            requests_per_minute (float | None): The request bucket refill rate, None for unlimited.
+            tokens_per_minute (float | None): The token bucket refill rate, None for unlimited.
+
+        Returns:
+            float: 0 if reserved, otherwise the number of seconds to wait before trying again.
+        """
+        pass
+
+    @abstractmethod
+    def block(self, key: str, seconds: float) -> None:
+        """
+        Blocks a key, e.g. for the Retry-After delay of a rate limited request.
+
+        Args:
+            key (str): The rate limit key.
+            seconds (float): The blocking duration.
+        """
+        pass
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Rate limit buckets shared by the threads and tasks of a process.
+    """
+
+    def __init__(self):
+        self._buckets: dict[str, list[float]] = {}
+        self._blocked: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(
+        self,
+        key: str,
+        requests: int,
+        tokens: int,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+    ) -> float:
+        with self._lock:
+            now = time.monotonic()
+            blocked = self._blocked.get(key, 0) - now
+            if blocked > 0:
+                return blocked
+
+            # Buckets start full and refill continuously up to a minute worth of quota
+            (r, t, updated) = self._buckets.get(
+                key, [requests_per_minute or 0, tokens_per_minute or 0, now]
+            )
+            elapsed = now - updated
+            wait = 0.0
+            if requests_per_minute is not None:
+                r = min(requests_per_minute, r + elapsed * requests_per_minute / 60)
+                if r < requests:
+                    wait = max(wait, (requests - r) * 60 / requests_per_minute)
+            if tokens_per_minute is not None:
+                tokens = min(tokens, tokens_per_minute)
+                t = min(tokens_per_minute, t + elapsed * tokens_per_minute / 60)
+                if t < tokens:
+                    wait = max(wait, (tokens - t) * 60 / tokens_per_minute)
+            if wait == 0:
+                r -= requests if requests_per_minute is not None else 0
+                t -= tokens if tokens_per_minute is not None else 0
+            self._buckets[key] = [r, t, now]
+            return wait
+
+    def block(self, key: str, seconds: float) -> None:
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._blocked[key] = max(self._blocked.get(key, 0), until)
+
+
+# Refills and takes from both buckets atomically, timed by the server clock
+_RESERVE_SCRIPT = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return blocked
+end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local requests = tonumber(ARGV[1])
+local tokens = tonumber(ARGV[2])
+local rpm = tonumber(ARGV[3])
+local tpm = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'r', 't', 'updated')
+local r = tonumber(state[1]) or rpm
+local t = tonumber(state[2]) or tpm
+local elapsed = now - (tonumber(state[3]) or now)
+local wait = 0
+if rpm > 0 then
+    r = math.min(rpm, r + elapsed * rpm / 60000)
+    if r < requests then
+        wait = math.max(wait, (requests - r) * 60000 / rpm)
+    end
+end
+if tpm > 0 then
+    tokens = math.min(tokens, tpm)
+    t = math.min(tpm, t + elapsed * tpm / 60000)
+    if t < tokens then
+        wait = math.max(wait, (tokens - t) * 60000 / tpm)
+    end
+end
+if wait == 0 then
+    r = r - requests
+    t = t - tokens
+end
+redis.call('HSET', KEYS[1], 'r', tostring(r), 't', tostring(t), 'updated', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Rate limit buckets stored in Redis or FalkorDB, shared by every process
+    using the same connection, e.g. several ingest workers sharing one API key.
+
+    Args:
+        connection (redis.Redis): The connection, e.g. `FalkorDB().connection`.
+        prefix (str): The prefix of the bucket keys.
+    """
+
+    def __init__(self, connection, prefix: str = "graphrag:ratelimit"):
+        self.connection = connection
+        self.prefix = prefix
+        self._reserve = connection.register_script(_RESERVE_SCRIPT)
+
+    def reserve(
+        self,
+        key: str,
+        requests: int,
+        tokens: int,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+    ) -> float:
+        wait_ms = self._reserve(
+            keys=[f"{self.prefix}:{key}", f"{self.prefix}:{key}:blocked"],
+            args=[requests, tokens, requests_per_minute or 0, tokens_per_minute or 0],
+        )
+        return int(wait_ms) / 1000
+
+    def block(self, key: str, seconds: float) -> None:
+        self.connection.set(
+            f"{self.prefix}:{key}:blocked", 1, px=max(1, int(seconds * 1000))
+        )
+
+
+class _KeyState:
+
+    def __init__(self):
+        self.factor = 1.0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Adaptive rate limiter for model requests, keyed per provider and model.
+
+    Requests take from a requests-per-minute and a tokens-per-minute bucket.
+    When the provider still rejects a request, the key is blocked for the
+    provider's Retry-After delay, or an exponential backoff, and its rates are
+    multiplicatively decreased, to be additively increased back on success (AIMD).
+    Without configured limits, only rejected requests slow the key down.
+
+    Args:
+        requests_per_minute (float | None): The default requests per minute, None for unlimited.
+        tokens_per_minute (float | None): The default tokens per minute, None for unlimited.
+        backend (RateLimitBackend | None): Where buckets are stored, in memory by default.
+        max_retries (int): The number of times a rate limited request is retried.
+
+    Examples:
+        >>> limiter = RateLimiter(
+        ...     requests_per_minute=500,
+        ...     tokens_per_minute=200000,
+        ...     backend=RedisRateLimitBackend(FalkorDB().connection),
+        ... )
+        >>> model = OpenAiGenerativeModel("gpt-4o").with_rate_limiter(limiter)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        backend: RateLimitBackend | None = None,
+        max_retries: int = 6,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        min_factor: float = 0.05,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.max_retries = max_retries
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.increase = increase
+        self.decrease = decrease
+        self.min_factor = min_factor
+        self._limits: dict[str, tuple[float | None, float | None]] = {}
+        self._states: dict[str, _KeyState] = {}
+        self._lock = threading.Lock()
+
+    def with_limits(
+        self,
+        key: str,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> "RateLimiter":
+        """
+        Overrides the default limits of a key.
+
+        Args:
+            key (str): The rate limit key, see `GenerativeModel.rate_limit_key`.
+            requests_per_minute (float | None): The requests per minute, None for unlimited.
+            tokens_per_minute (float | None): The tokens per minute, None for unlimited.
+
+        Returns:
+            RateLimiter: The rate limiter.
+        """
+        self._limits[key] = (requests_per_minute, tokens_per_minute)
+
+        return self
+
+    def _state(self, key: str) -> _KeyState:
+        with self._lock:
+            if key not in self._states:
+                self._states[key] = _KeyState()
+            return self._states[key]
+
+    def _wait(self, key: str, tokens: int) -> float:
+        (rpm, tpm) = self._limits.get(
+            key, (self.requests_per_minute, self.tokens_per_minute)
+        )
+        factor = self._state(key).factor
+        return self.backend.reserve(
+            key,
+            1,
+            tokens,
+            rpm * factor if rpm is not None else None,
+            tpm * factor if tpm is not None else None,
+        )
+
+    def acquire(self, key: str, tokens: int = 0) -> None:
+        """
+        Blocks until a request of the given size is allowed.
+
+        Args:
+            key (str): The rate limit key.
+            tokens (int): The estimated number of tokens of the request.
+        """
+        wait = self._wait(key, tokens)
+        if wait <= 0:
+            return
+        # Timed apart from the model calls, in graphrag.ratelimit.wait.duration
+        with get_metrics().span("graphrag.ratelimit.wait", {"key": key}):
+            time.sleep(wait)
+            while (wait := self._wait(key, tokens)) > 0:
+                time.sleep(wait)
+
+    async def aacquire(self, key: str, tokens: int = 0) -> None:
+        """
+        Waits, without blocking the event loop, until a request of the given size is allowed.
+
+        Args:
+            key (str): The rate limit key.
+            tokens (int): The estimated number of tokens of the request.
+        """
+        wait = self._wait(key, tokens)
+        if wait <= 0:
+            return
+        with get_metrics().span("graphrag.ratelimit.wait", {"key": key}):
+            await asyncio.sleep(wait)
+            while (wait := self._wait(key, tokens)) > 0:
+                await asyncio.sleep(wait)
+
+    def on_success(self, key: str) -> None:
+        """
+        Records an accepted request, additively increasing the key's rates.
+
+        Args:
+            key (str): The rate limit key.
+        """
+        state = self._state(key)
+        with state.lock:
+            state.failures = 0
+            state.factor = min(1.0, state.factor + self.increase)
+
+    def on_rate_limited(self, key: str, delay: float | None = None) -> None:
+        """
+        Records a rate limited request, blocking the key and decreasing its rates.
+
+        Args:
+            key (str): The rate limit key.
+            delay (float | None): The provider's Retry-After delay, if any.
+        """
+        state = self._state(key)
+        with state.lock:
+            state.failures += 1
+            state.factor = max(self.min_factor, state.factor * self.decrease)
+            if delay is None:
+                delay = min(
+                    self.max_backoff, self.min_backoff * 2 ** (state.failures - 1)
+                )
+        logger.debug(f"Rate limited on {key}, retrying in {delay}s")
+        self.backend.block(key, delay)
+
+    def call(self, key: str, fn: Callable[[], T], tokens: int = 0) -> T:
+        """
+        Calls a model within the key's limits, retrying rate limited requests.
+
+        Args:
+            key (str): The rate limit key.
+            fn (Callable[[], T]): The model call.
+            tokens (int): The estimated number of tokens of the request.
+
+        Returns:
+            T: The result of the call.
+        """
+        retries = self.max_retries
+        while True:
+            self.acquire(key, tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise e
+                if retries == 0:
+                    logger.error(f"Rate limit exceeded on {key}")
+                    raise e
+                retries -= 1
+                self.on_rate_limited(key, retry_after(e))
+                continue
+            self.on_success(key)
+            return result
+
+    async def acall(
+        self, key: str, fn: Callable[[], Awaitable[T]], tokens: int = 0
+    ) -> T:
+        """
+        Asynchronously calls a model within the key's limits, retrying rate limited requests.
+
+        Args:
+            key (str): The rate limit key.
+            fn (Callable[[], Awaitable[T]]): The model call.
+            tokens (int): The estimated number of tokens of the request.
+
+        Returns:
+            T: The result of the call.
+        """
+        retries = self.max_retries
+        while True:
+            await self.aacquire(key, tokens)
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise e
+                if retries == 0:
+                    logger.error(f"Rate limit exceeded on {key}")
+                    raise e
+                retries -= 1
+                self.on_rate_limited(key, retry_after(e))
+                continue
+            self.on_success(key)
+            return result
+
+
+_default_rate_limiter = RateLimiter()
+
+
+def default_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter used by models without one,
+    it has no limits and only backs off on rate limited requests.
+
+    Returns:
+        RateLimiter: The default rate limiter.
+    """
+    return _default_rate_limiter
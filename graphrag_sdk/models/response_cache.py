@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from .model import GenerationResponse
+
+
+class ResponseCache(ABC):
+    """
+    A cache of model responses, keyed by a hash of everything that determines a response:
+    the model name, its generation config, the system instruction and the prompt,
+    including the chat history preceding it.
+
+    Attach a cache to a model with `GenerativeModel.with_response_cache`, every chat
+    session started from that model will then serve repeated prompts from the cache.
+
+    Attributes:
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that were not found in the cache.
+
+    Examples:
+        >>> model = OpenAiGenerativeModel("gpt-4o").with_response_cache(
+        ...     SQLiteResponseCache("responses.db")
+        ... )
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        model_name: str,
+        generation_config: any,
+        system_instruction: str | None,
+        history: list,
+        message: str,
+    ) -> str:
+        """
+        Computes the cache key of a prompt.
+
+        Args:
+            model_name (str): The model name.
+            generation_config (any): The generation config of the model.
+            system_instruction (str | None): The system instruction of the model.
+            history (list): The chat history preceding the message.
+            message (str): The message sent to the model.
+
+        Returns:
+            str: The cache key.
+        """
+        if generation_config is not None and hasattr(generation_config, "to_json"):
+            generation_config = generation_config.to_json()
+        payload = json.dumps(
+            [model_name, generation_config, system_instruction, history, message],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> GenerationResponse | None:
+        """
+        Retrieves a cached response.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            GenerationResponse | None: The cached response, or None if not found.
+        """
+        response = self._get(key)
+        with self._stats_lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(self, key: str, response: GenerationResponse) -> None:
+        """
+        Stores a response.
+
+        Args:
+            key (str): The cache key.
+            response (GenerationResponse): The response to store.
+        """
+        self._set(key, response)
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits and misses.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    @abstractmethod
+    def _get(self, key: str) -> GenerationResponse | None:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, response: GenerationResponse) -> None:
+        pass
+
+
+class InMemoryResponseCache(ResponseCache):
+    """
+    In-memory LRU response cache.
+
+    Args:
+        max_size (int): The maximum number of cached responses.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        super().__init__()
+        self.max_size = max_size
+        self._entries: OrderedDict[str, GenerationResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> GenerationResponse | None:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def _set(self, key: str, response: GenerationResponse) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk response cache backed by SQLite, surviving process restarts.
+
+    Args:
+        path (str): The database file path.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, text TEXT, finish_reason TEXT)"
+            )
+
+    def _get(self, key: str) -> GenerationResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT text, finish_reason FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return GenerationResponse(text=row[0], finish_reason=row[1])
+
+    def _set(self, key: str, response: GenerationResponse) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, text, finish_reason) VALUES (?, ?, ?)",
+                (key, response.text, response.finish_reason),
+            )
+
+    def close(self) -> None:
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
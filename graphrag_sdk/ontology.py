@@ -6,16 +6,65 @@ import graphrag_sdk
 import logging
 from .relation import Relation
 from .entity import Entity
+from graphrag_sdk.helpers import quote_cypher_identifier
+from graphrag_sdk.validation import OntologyValidator
+from graphrag_sdk.vector_index import EMBEDDING_ATTRIBUTE, vector_index_query
 from typing import Optional
 
 
 logger = logging.getLogger(__name__)
 
 
+class _TrackedList(list):
+    """
+    A list calling `on_change` after every mutation.
+    """
+
+    def __init__(self, items, on_change):
+        super().__init__(items)
+        self._on_change = on_change
+
+
+def _tracked(name: str):
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        # Unset while a copy or unpickled list is being filled
+        on_change = getattr(self, "_on_change", None)
+        if on_change is not None:
+            on_change()
+        return result
+
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "remove",
+    "pop",
+    "clear",
+    "sort",
+    "reverse",
+):
+    setattr(_TrackedList, _name, _tracked(_name))
+
+
 class Ontology(object):
     """
     Represents an ontology, which is a collection of entities and relations.
 
+    Lookups by label go through indexes built on first use. They are updated by
+    `add_entity` and `add_relation`, and rebuilt after any other change to the
+    `entities` or `relations` lists, but not when a label is renamed in place.
+
     Attributes:
         entities (list[Entity]): The list of entities in the ontology.
         relations (list[Relation]): The list of relations in the ontology.
@@ -32,6 +81,66 @@ class Ontology(object):
         self.entities = entities or []
         self.relations = relations or []
 
+    @property
+    def entities(self) -> list[Entity]:
+        return self._entities
+
+    @entities.setter
+    def entities(self, value: list[Entity]):
+        self._entities = _TrackedList(value, self._entities_changed)
+        self._entities_changed()
+
+    @property
+    def relations(self) -> list[Relation]:
+        return self._relations
+
+    @relations.setter
+    def relations(self, value: list[Relation]):
+        self._relations = _TrackedList(value, self._relations_changed)
+        self._relations_changed()
+
+    def _entities_changed(self):
+        self._entities_by_label = None
+        self._validator = None
+
+    def _relations_changed(self):
+        self._relations_by_label = None
+        self._relations_by_signature = None
+        self._validator = None
+
+    def validator(self) -> OntologyValidator:
+        """
+        Returns the validators of the ontology's entities and relations,
+        compiled again after entities or relations changed.
+
+        Returns:
+            OntologyValidator: The ontology validator.
+        """
+        if self._validator is None:
+            self._validator = OntologyValidator(self)
+        return self._validator
+
+    def _entity_index(self) -> dict[str, Entity]:
+        if self._entities_by_label is None:
+            index = {}
+            for entity in self._entities:
+                index.setdefault(entity.label, entity)
+            self._entities_by_label = index
+        return self._entities_by_label
+
+    def _relation_index(self) -> tuple[dict[str, list[Relation]], dict[tuple, Relation]]:
+        if self._relations_by_label is None:
+            by_label = {}
+            by_signature = {}
+            for relation in self._relations:
+                by_label.setdefault(relation.label, []).append(relation)
+                by_signature.setdefault(
+                    (relation.label, relation.source.label, relation.target.label), relation
+                )
+            self._relations_by_label = by_label
+            self._relations_by_signature = by_signature
+        return (self._relations_by_label, self._relations_by_signature)
+
     @staticmethod
     def from_sources(
         sources: list[AbstractSource],
@@ -108,7 +217,11 @@ class Ontology(object):
         Parameters:
             entity: The entity object to be added.
         """
-        self.entities.append(entity)
+        index = self._entity_index()
+        # Appended without invalidating the index, updated in place
+        list.append(self._entities, entity)
+        index.setdefault(entity.label, entity)
+        self._validator = None
 
     def add_relation(self, relation: Relation):
         """
@@ -117,7 +230,13 @@ class Ontology(object):
         Args:
             relation (Relation): The relation to be added.
         """
-        self.relations.append(relation)
+        (by_label, by_signature) = self._relation_index()
+        list.append(self._relations, relation)
+        by_label.setdefault(relation.label, []).append(relation)
+        by_signature.setdefault(
+            (relation.label, relation.source.label, relation.target.label), relation
+        )
+        self._validator = None
 
     def to_json(self):
         """
@@ -143,25 +262,28 @@ class Ontology(object):
         """
         # Merge entities
         for entity in o.entities:
-            if entity.label not in [n.label for n in self.entities]:
+            entity1 = self.get_entity_with_label(entity.label)
+            if entity1 is None:
                 # Entity does not exist in self, add it
-                self.entities.append(entity)
+                self.add_entity(entity)
                 logger.debug(f"Adding entity {entity.label}")
             else:
                 # Entity exists in self, merge attributes
-                entity1 = next(n for n in self.entities if n.label == entity.label)
                 entity1.merge(entity)
 
         # Merge relations
         for relation in o.relations:
-            if relation.label not in [e.label for e in self.relations]:
+            relations1 = self.get_relations_with_label(relation.label)
+            if len(relations1) == 0:
                 # Relation does not exist in self, add it
-                self.relations.append(relation)
+                self.add_relation(relation)
                 logger.debug(f"Adding relation {relation.label}")
             else:
                 # Relation exists in self, merge attributes
-                relation1 = next(e for e in self.relations if e.label == relation.label)
-                relation1.combine(relation)
+                relations1[0].combine(relation)
+
+        # Merged attributes change the compiled validators
+        self._validator = None
 
         return self
 
@@ -172,16 +294,13 @@ class Ontology(object):
         Returns:
             The updated ontology object after discarding entities without relations.
         """
+        connected = set()
+        for relation in self.relations:
+            connected.add(relation.source.label)
+            connected.add(relation.target.label)
+
         entities_to_discard = [
-            entity.label
-            for entity in self.entities
-            if all(
-                [
-                    relation.source.label != entity.label
-                    and relation.target.label != entity.label
-                    for relation in self.relations
-                ]
-            )
+            entity.label for entity in self.entities if entity.label not in connected
         ]
 
         self.entities = [
@@ -208,11 +327,12 @@ class Ontology(object):
         Returns:
             The current instance of the Ontology class.
         """
+        entities = self._entity_index()
         relations_to_discard = [
             relation.label
             for relation in self.relations
-            if relation.source.label not in [entity.label for entity in self.entities]
-            or relation.target.label not in [entity.label for entity in self.entities]
+            if relation.source.label not in entities
+            or relation.target.label not in entities
         ]
 
         self.relations = [
@@ -262,7 +382,7 @@ The following entities do not have unique attributes:
         Returns:
             The entity with the specified label, or None if not found.
         """
-        return next((n for n in self.entities if n.label == label), None)
+        return self._entity_index().get(label)
 
     def get_relations_with_label(self, label: str):
         """
@@ -274,7 +394,21 @@ The following entities do not have unique attributes:
         Returns:
             A list of relations with the specified label.
         """
-        return [e for e in self.relations if e.label == label]
+        return list(self._relation_index()[0].get(label, []))
+
+    def get_relation(self, label: str, source: str, target: str) -> Relation | None:
+        """
+        Retrieves the relation with the specified label connecting two entities.
+
+        Args:
+            label (str): The label of the relation.
+            source (str): The label of the source entity.
+            target (str): The label of the target entity.
+
+        Returns:
+            The relation, or None if not found.
+        """
+        return self._relation_index()[1].get((label, source, target))
 
     def has_entity_with_label(self, label: str):
         """
@@ -286,7 +420,7 @@ The following entities do not have unique attributes:
         Returns:
             True if an entity with the given label exists, False otherwise.
         """
-        return any(n.label == label for n in self.entities)
+        return label in self._entity_index()
 
     def has_relation_with_label(self, label: str):
         """
@@ -298,7 +432,107 @@ The following entities do not have unique attributes:
         Returns:
             True if a relation with the given label exists, False otherwise.
         """
-        return any(e.label == label for e in self.relations)
+        return label in self._relation_index()[0]
+
+    def get_index_definitions(self) -> dict[str, list[str]]:
+        """
+        Returns the properties to index for each entity label, its unique attributes,
+        which entities are merged on when written to the graph.
+
+        Returns:
+            dict[str, list[str]]: The unique attribute names of each entity with any.
+        """
+        definitions = {}
+        for entity in self.entities:
+            unique_attributes = [attr.name for attr in entity.get_unique_attributes()]
+            if len(unique_attributes) > 0:
+                definitions[entity.label] = unique_attributes
+        return definitions
+
+    def ensure_indexes(self, graph: Graph, unique_constraints: bool = False) -> list[str]:
+        """
+        Creates the missing range indexes over the unique attributes of the entities,
+        so merging an entity is an index lookup instead of a label scan.
+
+        Unique constraints are opt-in, creating one fails if the graph
+        already holds duplicated entities, which is then logged.
+
+        Args:
+            graph (Graph): The graph to index.
+            unique_constraints (bool): Also constrain the unique attributes of each entity to be unique.
+
+        Returns:
+            list[str]: The created indexes and constraints, e.g. "INDEX Actor(name)".
+        """
+        definitions = self.get_index_definitions()
+        if len(definitions) == 0:
+            return []
+
+        indexed = set()
+        for label, properties, types, entity_type in graph.query(
+            "CALL db.indexes() YIELD label, properties, types, entitytype"
+        ).result_set:
+            if entity_type != "NODE":
+                continue
+            for prop in properties:
+                if "RANGE" in types.get(prop, []):
+                    indexed.add((label, prop))
+
+        constrained = set()
+        if unique_constraints:
+            for constraint in graph.list_constraints():
+                if constraint["type"] == "UNIQUE" and constraint["entitytype"] == "NODE":
+                    constrained.add((constraint["label"], tuple(constraint["properties"])))
+
+        created = []
+        for label, properties in definitions.items():
+            missing = [prop for prop in properties if (label, prop) not in indexed]
+            if len(missing) > 0:
+                node = f"n:{quote_cypher_identifier(label)}"
+                fields = ", ".join(f"n.{quote_cypher_identifier(prop)}" for prop in missing)
+                graph.query(f"CREATE INDEX FOR ({node}) ON ({fields})")
+                created.append(f"INDEX {label}({', '.join(missing)})")
+
+            if unique_constraints and (label, tuple(properties)) not in constrained:
+                try:
+                    graph.create_node_unique_constraint(label, *properties)
+                    created.append(f"UNIQUE {label}({', '.join(properties)})")
+                except Exception as e:
+                    logger.warning(f"Unique constraint on {label} not created: {e}")
+
+        if len(created) > 0:
+            logger.info(f"Created {', '.join(created)}")
+        return created
+
+    def ensure_vector_indexes(self, graph: Graph, dimension: int) -> list[str]:
+        """
+        Creates the missing vector indexes over the embeddings of the entities,
+        written at ingest when the knowledge graph has an embedding model.
+
+        Args:
+            graph (Graph): The graph to index.
+            dimension (int): The size of the embeddings.
+
+        Returns:
+            list[str]: The created indexes, e.g. "VECTOR INDEX Actor(_embedding)".
+        """
+        indexed = set()
+        for label, properties, types, entity_type in graph.query(
+            "CALL db.indexes() YIELD label, properties, types, entitytype"
+        ).result_set:
+            if entity_type == "NODE" and "VECTOR" in types.get(EMBEDDING_ATTRIBUTE, []):
+                indexed.add(label)
+
+        created = []
+        for entity in self.entities:
+            if entity.label not in indexed:
+                graph.query(vector_index_query(entity.label, dimension))
+                created.append(f"VECTOR INDEX {entity.label}({EMBEDDING_ATTRIBUTE})")
+                indexed.add(entity.label)
+
+        if len(created) > 0:
+            logger.info(f"Created {', '.join(created)}")
+        return created
 
     def __str__(self) -> str:
         """
@@ -324,9 +558,9 @@ The following entities do not have unique attributes:
         for entity in self.entities:
             query = entity.to_graph_query()
             logger.debug(f"Query: {query}")
-            graph.query(query)
+            graph.query(query, entity.to_graph_params())
 
         for relation in self.relations:
             query = relation.to_graph_query()
             logger.debug(f"Query: {query}")
-            graph.query(query)
+            graph.query(query, relation.to_graph_params())
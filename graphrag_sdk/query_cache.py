@@ -0,0 +1,152 @@
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from falkordb import Graph
+
+logger = logging.getLogger(__name__)
+
+# Clauses making a query modify the graph, such queries are never cached
+_WRITE_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|SET|DELETE|REMOVE|DROP|CALL)\b", re.IGNORECASE
+)
+
+# String literals, kept as is, or whitespace runs, collapsed
+_TOKENS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\s+")
+
+
+def normalize_cypher(cypher: str) -> str:
+    """
+    Normalizes a Cypher query so equivalent spellings share a cache entry,
+    collapsing whitespace outside string literals and dropping a trailing semicolon.
+
+    Args:
+        cypher (str): The Cypher query.
+
+    Returns:
+        str: The normalized query.
+    """
+    normalized = _TOKENS.sub(
+        lambda m: m.group(0) if m.group(0)[0] in "'\"" else " ", cypher
+    )
+    return normalized.strip().rstrip(";").strip()
+
+
+class GraphVersion:
+    """
+    Version counter of a knowledge graph, stored next to it in FalkorDB
+    and bumped by every write made through the SDK.
+
+    Args:
+        connection (redis.Redis): The FalkorDB connection.
+        graph_name (str): The knowledge graph name.
+    """
+
+    def __init__(self, connection, graph_name: str):
+        self.connection = connection
+        self.key = f"graphrag:{graph_name}:version"
+
+    def get(self) -> int:
+        """
+        Returns the current version.
+
+        Returns:
+            int: The graph version.
+        """
+        return int(self.connection.get(self.key) or 0)
+
+    def bump(self) -> int:
+        """
+        Records a write to the graph.
+
+        Returns:
+            int: The new graph version.
+        """
+        return self.connection.incr(self.key)
+
+    def delete(self) -> None:
+        """
+        Deletes the version counter.
+        """
+        self.connection.delete(self.key)
+
+
+class QueryResultCache:
+    """
+    In-memory LRU cache of read-only Cypher query results, keyed by the normalized
+    query and the graph version, so any write made through the SDK invalidates it.
+
+    Writes made to the graph outside of the SDK do not bump the version,
+    set `ttl` to bound how stale results can get in that case.
+
+    Args:
+        version (GraphVersion): The version of the queried graph.
+        max_size (int): The maximum number of cached results.
+        ttl (float | None): The number of seconds a result is served for, None for no expiry.
+
+    Attributes:
+        hits (int): The number of queries served from the cache.
+        misses (int): The number of queries executed against the graph.
+    """
+
+    def __init__(self, version: GraphVersion, max_size: int = 1000, ttl: float | None = None):
+        self.version = version
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int], tuple[float, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def query(self, graph: Graph, cypher: str, timeout: int | None = None) -> list:
+        """
+        Executes a query, serving its result set from the cache when the graph did not change.
+
+        Args:
+            graph (Graph): The graph to query.
+            cypher (str): The Cypher query.
+            timeout (int | None): The query timeout in milliseconds.
+
+        Returns:
+            list: The query result set.
+        """
+        if _WRITE_CLAUSES.search(cypher):
+            return graph.query(cypher, timeout=timeout).result_set
+
+        key = (normalize_cypher(cypher), self.version.get())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or now - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Query result cache hit: {key[0]}")
+                return entry[1]
+            self.misses += 1
+
+        result_set = graph.query(cypher, timeout=timeout).result_set
+
+        with self._lock:
+            self._entries[key] = (now, result_set)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return result_set
+
+    def clear(self) -> None:
+        """
+        Removes all cached results.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of hits and misses.
+        """
+        return {"hits": self.hits, "misses": self.misses}
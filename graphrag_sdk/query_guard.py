@@ -0,0 +1,206 @@
+import logging
+from falkordb import Graph
+from graphrag_sdk.cypher_parser import parse_cypher, tokenize_cypher
+
+logger = logging.getLogger(__name__)
+
+# Execution plan operations
+_VARIABLE_LENGTH_TRAVERSE = "Conditional Variable Length Traverse"
+_CARTESIAN_PRODUCT = "Cartesian Product"
+_FULL_SCANS = ("All Node Scan", "Node By Label Scan")
+_FILTERS = ("Filter", "Node By Index Scan", "Node By Id Seek", "Node By Label and ID Scan")
+
+
+class QueryGuard:
+    """
+    Guards the graph against expensive generated Cypher queries before they run.
+
+    Unbounded variable-length relationships are bounded to `max_hops`, the rows returned
+    are limited to `max_rows` and the query runs with a timeout. The query plan is then
+    checked with GRAPH.EXPLAIN, rejecting the query when it still expands an unbounded
+    number of hops or computes a full cartesian product, where a disconnected pattern scans
+    a whole label or every node. Products of filtered patterns, such as two movies looked
+    up by title, are accepted. Rejections raise an exception whose message is fed back to
+    the model to generate a cheaper query.
+
+    Args:
+        max_rows (int | None): The maximum number of rows returned, injected as a LIMIT, None for no limit.
+        max_hops (int): The upper bound given to unbounded variable-length relationships.
+        timeout (int | None): The query timeout in milliseconds, None for the server default.
+        allow_cartesian_products (bool): Whether plans computing full cartesian products are accepted.
+        explain (bool): Whether the query plan is checked, costing a round trip per query.
+
+    Examples:
+        >>> kg.with_query_guard(QueryGuard(max_rows=50, timeout=5000))
+        >>> kg.with_query_guard(None)  # disables the guard
+    """
+
+    def __init__(
+        self,
+        max_rows: int | None = 100,
+        max_hops: int = 5,
+        timeout: int | None = 10000,
+        allow_cartesian_products: bool = False,
+        explain: bool = True,
+    ):
+        self.max_rows = max_rows
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self.allow_cartesian_products = allow_cartesian_products
+        self.explain = explain
+
+    def check(self, graph: Graph, cypher: str) -> str:
+        """
+        Rewrites a query to bound its cost and checks its plan.
+
+        Args:
+            graph (Graph): The graph the query runs against.
+            cypher (str): The Cypher query.
+
+        Returns:
+            str: The query to run.
+
+        Raises:
+            Exception: If the query is too expensive, or cannot be planned.
+        """
+        cypher = self.bound_hops(cypher)
+        cypher = self.limit(cypher)
+
+        if self.explain:
+            self.check_plan(graph.explain(cypher))
+
+        return cypher
+
+    def bound_hops(self, cypher: str) -> str:
+        """
+        Bounds the variable-length relationships of a query to `max_hops`,
+        e.g. `-[:KNOWS*]->` becomes `-[:KNOWS*1..5]->`.
+
+        Args:
+            cypher (str): The Cypher query.
+
+        Returns:
+            str: The bounded query.
+
+        Raises:
+            Exception: If a relationship requires more than `max_hops` hops.
+        """
+        spans = []
+        for relationship in parse_cypher(cypher).relationships:
+            if relationship.hops is None:
+                continue
+            (minimum, maximum, start, end) = relationship.hops
+            if minimum > self.max_hops or (maximum is not None and maximum > self.max_hops):
+                raise Exception(
+                    f"The query traverses up to {maximum or minimum} hops, "
+                    f"variable-length relationships can span at most {self.max_hops} hops"
+                )
+            if maximum is None:
+                spans.append((start, end, f"*{minimum}..{self.max_hops}"))
+
+        # Replaced from the end so earlier offsets stay valid
+        for start, end, hops in reversed(spans):
+            cypher = cypher[:start] + hops + cypher[end:]
+        if spans:
+            logger.debug(f"Bounded variable-length relationships: {cypher}")
+        return cypher
+
+    def limit(self, cypher: str) -> str:
+        """
+        Limits the rows returned by a query to `max_rows`, adding a LIMIT clause
+        or lowering a larger literal one.
+
+        Args:
+            cypher (str): The Cypher query.
+
+        Returns:
+            str: The limited query.
+        """
+        if self.max_rows is None:
+            return cypher
+
+        tokens = list(tokenize_cypher(cypher))
+        depth = 0
+        returned = False
+        limit = None
+        for i, token in enumerate(tokens):
+            if token.kind == "symbol" and token.text in "([{":
+                depth += 1
+            elif token.kind == "symbol" and token.text in ")]}":
+                depth -= 1
+            elif depth == 0 and token.kind == "name":
+                keyword = token.text.upper()
+                if keyword == "UNION":
+                    # A trailing LIMIT would only apply to the last query of the union
+                    return cypher
+                if keyword in ("RETURN", "WITH"):
+                    (returned, limit) = (keyword == "RETURN", None)
+                elif keyword == "LIMIT":
+                    limit = tokens[i + 1] if i + 1 < len(tokens) else None
+
+        if not returned:
+            return cypher
+        if limit is None:
+            if tokens[-1].kind == "symbol" and tokens[-1].text == ";":
+                cypher = cypher[: tokens[-1].position]
+            # On a new line, in case the query ends with a comment
+            return cypher.rstrip() + f"\nLIMIT {self.max_rows}"
+        if limit.kind == "number" and limit.text.isdigit() and int(limit.text) > self.max_rows:
+            end = limit.position + len(limit.text)
+            return cypher[: limit.position] + str(self.max_rows) + cypher[end:]
+        return cypher
+
+    def check_plan(self, plan) -> None:
+        """
+        Checks the execution plan of a query.
+
+        Args:
+            plan (ExecutionPlan): The plan, returned by `Graph.explain`.
+
+        Raises:
+            Exception: If the plan expands an unbounded number of hops or computes a full cartesian product.
+        """
+        for operation in plan.collect_operations(_VARIABLE_LENGTH_TRAVERSE):
+            if "INF" in (operation.args or ""):
+                raise Exception(
+                    f"The query expands an unbounded number of hops ({operation.args.strip()}), "
+                    f"bound variable-length relationships to at most {self.max_hops} hops"
+                )
+
+        if self.allow_cartesian_products:
+            return
+        if any(
+            _unfiltered_scan(child)
+            for operation in plan.collect_operations(_CARTESIAN_PRODUCT)
+            for child in operation.children
+        ):
+            raise Exception(
+                "The query computes a full cartesian product of disconnected patterns, "
+                "connect the patterns through relationships or filter each of them on a property"
+            )
+
+    def timeout_error(self, error: Exception) -> Exception:
+        """
+        Explains a query timeout to the model.
+
+        Args:
+            error (Exception): The error raised by the query.
+
+        Returns:
+            Exception: The error to feed back to the model.
+        """
+        if "timed out" not in str(error).lower():
+            return error
+        return Exception(
+            f"The query timed out after {self.timeout} ms, generate a cheaper query: "
+            "start from nodes with a specific label and property, and avoid long traversals"
+        )
+
+
+def _unfiltered_scan(operation) -> bool:
+    # Whether a branch of the plan scans nodes without filtering them first
+    if operation.name in _FULL_SCANS:
+        return True
+    if operation.name in _FILTERS:
+        return False
+    return any(_unfiltered_scan(child) for child in operation.children)
@@ -2,6 +2,7 @@ import json
 import re
 import logging
 from .attribute import Attribute
+from graphrag_sdk.helpers import quote_cypher_identifier
 from falkordb import Node as GraphNode, Edge as GraphEdge
 from graphrag_sdk.fixtures.regex import (
     EDGE_LABEL_REGEX,
@@ -91,6 +92,8 @@ class Relation:
             Combines the attributes of another Relation object with this Relation object.
         to_graph_query() -> str:
             Generates a Cypher query string for creating the relation in a graph database.
+        to_graph_params() -> dict:
+            Generates the parameters of the query to create the relation in a graph database.
         __str__() -> str:
             Returns a string representation of the Relation object.
     """
@@ -242,11 +245,27 @@ class Relation:
     def to_graph_query(self):
         """
         Generates a Cypher query string for creating the relation in a graph database.
+        The attribute values are passed as parameters, see `to_graph_params`.
 
         Returns:
             str: The Cypher query string.
         """
-        return f"MATCH (s:{self.source.label}) MATCH (t:{self.target.label}) MERGE (s)-[r:{self.label} {{{', '.join([str(attr) for attr in self.attributes])}}}]->(t) RETURN r"
+        attributes = ", ".join(
+            [
+                f"{quote_cypher_identifier(attr.name)}: $a{i}"
+                for i, attr in enumerate(self.attributes)
+            ]
+        )
+        return f"MATCH (s:{quote_cypher_identifier(self.source.label)}) MATCH (t:{quote_cypher_identifier(self.target.label)}) MERGE (s)-[r:{quote_cypher_identifier(self.label)} {{{attributes}}}]->(t) RETURN r"
+
+    def to_graph_params(self):
+        """
+        Generates the parameters of the query returned by `to_graph_query`.
+
+        Returns:
+            dict: The query parameters.
+        """
+        return {f"a{i}": attr.type_string() for i, attr in enumerate(self.attributes)}
 
     def __str__(self) -> str:
         """
@@ -1,7 +1,7 @@
 from graphrag_sdk.steps.Step import Step
 from graphrag_sdk.source import AbstractSource
 from graphrag_sdk.document import Document
-from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import ThreadPoolExecutor
 from graphrag_sdk.ontology import Ontology
 from graphrag_sdk.fixtures.prompts import (
     CREATE_ONTOLOGY_SYSTEM,
@@ -11,15 +11,16 @@ from graphrag_sdk.fixtures.prompts import (
     BOUNDARIES_PREFIX,
 )
 import logging
-from graphrag_sdk.helpers import extract_json
-from ratelimit import limits, sleep_and_retry
-import time
+from graphrag_sdk.helpers import extract_json, submit_bounded
+from graphrag_sdk.metrics import measure_llm_call
+from graphrag_sdk.chunker import TokenChunker, count_tokens
 from graphrag_sdk.models import (
     GenerativeModel,
     GenerativeModelChatSession,
     GenerativeModelConfig,
     GenerationResponse,
     FinishReason,
+    default_rate_limiter,
 )
 import json
 from typing import Optional
@@ -42,39 +43,38 @@ class CreateOntologyStep(Step):
             "max_workers": 16,
             "max_input_tokens": 500000,
             "max_output_tokens": 8192,
+            "chunk_overlap_tokens": 200,
         },
     ) -> None:
         self.sources = sources
         self.ontology = ontology
         self.model = model.with_system_instruction(CREATE_ONTOLOGY_SYSTEM)
         self.config = config
+        self.chunker = TokenChunker.from_config(config)
 
     def _create_chat(self):
         return self.model.start_chat({"response_validation": False})
 
     def run(self, boundaries: Optional[str] = None):
-        tasks: list[Future[Ontology]] = []
-        with ThreadPoolExecutor(max_workers=self.config["max_workers"]) as executor:
-            # extract entities and relationships from each page
-
-            documents = [
-                document for source in self.sources for document in source.load()
-            ]
-            for source in documents:
-                task = executor.submit(
-                    self._process_source,
-                    self._create_chat(),
-                    source,
-                    self.ontology,
-                    boundaries,
-                )
-                tasks.append(task)
-
-            # Wait for all tasks to complete
-            wait(tasks)
-
-        for task in tasks:
-            self.ontology = self.ontology.merge_with(task.result())
+        max_workers = self.config["max_workers"]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # extract entities and relationships from each page,
+            # loading documents only as fast as they are processed
+            tasks = submit_bounded(
+                executor,
+                self._process_source,
+                (
+                    (self._create_chat(), chunk, self.ontology, boundaries)
+                    for source in self.sources
+                    for document in source.load()
+                    if document is not None and document.content
+                    for chunk in self.chunker.split(document)
+                ),
+                self.config.get("max_pending_documents", 2 * max_workers),
+            )
+
+            for task in tasks:
+                self.ontology = self.ontology.merge_with(task.result())
 
         if len(self.ontology.entities) == 0:
             raise Exception("Failed to create ontology")
@@ -90,10 +90,8 @@ class CreateOntologyStep(Step):
         o: Ontology,
         boundaries: Optional[str] = None,
     ):
-        text = document.content[: self.config["max_input_tokens"]]
-
         user_message = CREATE_ONTOLOGY_PROMPT.format(
-            text = text,
+            text = document.content,
             boundaries = BOUNDARIES_PREFIX.format(user_boundaries=boundaries) if boundaries is not None else "", 
         )
 
@@ -202,21 +200,17 @@ class CreateOntologyStep(Step):
 
         return o
 
-    @sleep_and_retry
-    @limits(calls=15, period=60)
     def _call_model(
         self,
         chat_session: GenerativeModelChatSession,
         prompt: str,
-        retry=6,
     ):
-        try:
-            return chat_session.send_message(prompt)
-        except Exception as e:
-            # If exception is caused by quota exceeded, wait 10 seconds and try again for 6 times
-            if "Quota exceeded" in str(e) and retry > 0:
-                time.sleep(10)
-                retry -= 1
-                return self._call_model(chat_session, prompt, retry)
-            else:
-                raise e
+        rate_limiter = self.model.rate_limiter or default_rate_limiter()
+        # The call is timed within the limiter, apart from the time waiting on it
+        return rate_limiter.call(
+            self.model.rate_limit_key(),
+            lambda: measure_llm_call(
+                "create_ontology", prompt, lambda: chat_session.send_message(prompt)
+            ),
+            count_tokens(prompt),
+        )
@@ -1,12 +1,14 @@
 from graphrag_sdk.steps.Step import Step
 from graphrag_sdk.source import AbstractSource
-from concurrent.futures import Future, ThreadPoolExecutor, wait
+from concurrent.futures import ThreadPoolExecutor
 from graphrag_sdk.ontology import Ontology
 from graphrag_sdk.models import (
     GenerativeModel,
     GenerativeModelChatSession,
     GenerationResponse,
     FinishReason,
+    EmbeddingModel,
+    default_rate_limiter,
 )
 
 from graphrag_sdk.fixtures.prompts import (
@@ -15,14 +17,19 @@ from graphrag_sdk.fixtures.prompts import (
     FIX_JSON_PROMPT,
 )
 import logging
-from graphrag_sdk.helpers import extract_json, map_dict_to_cypher_properties
+from graphrag_sdk.helpers import extract_json, submit_bounded
+from graphrag_sdk.graph_writer import GraphWriter
+from graphrag_sdk.fingerprint import DocumentFingerprint, FingerprintStore
+from graphrag_sdk.chunker import TokenChunker, count_tokens
+from graphrag_sdk.query_cache import GraphVersion
+from graphrag_sdk.metrics import get_metrics, measure_llm_call, ameasure_llm_call
+from graphrag_sdk.task_log import TaskLog, default_task_log
+from graphrag_sdk.entity_resolution import EntityResolver
 import json
 from falkordb import Graph
 from graphrag_sdk.document import Document
 from uuid import uuid4
-import os
-import time
-from ratelimit import limits, sleep_and_retry
+import asyncio
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -43,52 +50,260 @@ class ExtractDataStep(Step):
             "max_workers": 16,
             "max_input_tokens": 500000,
             "max_output_tokens": 8192,
+            "chunk_overlap_tokens": 200,
+            "write_batch_size": 500,
+            "max_concurrent_llm_requests": 64,
+            "max_concurrent_db_writes": 8,
         },
+        fingerprints: FingerprintStore | None = None,
+        graph_version: GraphVersion | None = None,
+        task_log: TaskLog | None = None,
+        embedding_model: EmbeddingModel | None = None,
+        entity_resolver: EntityResolver | None = None,
     ) -> None:
         self.sources = sources
         self.ontology = ontology
         self.config = config
-        self.model = model.with_system_instruction(
-            EXTRACT_DATA_SYSTEM.replace("#ONTOLOGY", str(self.ontology.to_json()))
+        self.system_instruction = EXTRACT_DATA_SYSTEM.replace(
+            "#ONTOLOGY", str(self.ontology.to_json())
         )
+        self.model = model.with_system_instruction(self.system_instruction)
         self.graph = graph
+        self.fingerprints = fingerprints
+        self.graph_version = graph_version
+        self.chunker = TokenChunker.from_config(config)
+        self.task_log = task_log
+        self.embedding_model = embedding_model
+        self.entity_resolver = entity_resolver
 
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
+    def _write_options(self) -> list[str]:
+        # Enabling embeddings or entity resolution re-ingests documents written without them
+        options = []
+        if self.embedding_model is not None:
+            options.append(
+                f"embedding:{type(self.embedding_model).__name__}:{self.embedding_model.dimension}"
+            )
+        if self.entity_resolver is not None:
+            options.append(f"entity_resolution:{self.entity_resolver.similarity}")
+        return options
 
     def _create_chat(self):
         return self.model.start_chat({"response_validation": False})
 
+    def _documents(self, instructions: str = None):
+        skipped = 0
+        for source in self.sources:
+            version = DocumentFingerprint.extraction_version(
+                self.system_instruction,
+                source.instruction,
+                instructions,
+                *self._write_options(),
+            )
+            # Chunks are fingerprinted individually, so a change re-extracts only its chunks
+            for index, document in enumerate(self._load(source)):
+                fingerprint = None
+                if self.fingerprints is not None:
+                    fingerprint = DocumentFingerprint.from_document(
+                        source.path, index, document, version
+                    )
+                    # Skip documents unchanged since their last successful ingest
+                    if self.fingerprints.is_unchanged(fingerprint):
+                        skipped += 1
+                        continue
+
+                yield (document, source.instruction, fingerprint)
+
+        if skipped > 0:
+            logger.debug(f"Skipped {skipped} unchanged documents")
+
     def run(self, instructions: str = None):
 
-        tasks: list[Future[Ontology]] = []
-        with ThreadPoolExecutor(max_workers=self.config["max_workers"]) as executor:
-            # extract entities and relationships from each page
-            documents = [
-                (document, source.instruction)
-                for source in self.sources
-                for document in source.load()
-                if document is not None
-                and document.content is not None
-                and len(document.content) > 0
-            ]
-            logger.debug(f"Processing {len(documents)} documents")
-            for document, source_instructions in documents:
-                task_id = "extract_data_step_" + str(uuid4())
-                task = executor.submit(
-                    self._process_source,
+        max_workers = self.config["max_workers"]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # extract entities and relationships from each page,
+            # loading documents only as fast as they are processed
+            tasks = submit_bounded(
+                executor,
+                self._process_source,
+                (
+                    (
+                        "extract_data_step_" + str(uuid4()),
+                        self._create_chat(),
+                        document,
+                        self.ontology,
+                        self.graph,
+                        source_instructions,
+                        instructions,
+                        fingerprint,
+                    )
+                    for document, source_instructions, fingerprint in self._documents(
+                        instructions
+                    )
+                ),
+                self.config.get("max_pending_documents", 2 * max_workers),
+            )
+
+            # Wait for all tasks to complete
+            count = sum(1 for _ in tasks)
+            logger.debug(f"Processed {count} documents")
+
+        (self.task_log or default_task_log()).flush()
+
+    async def arun(self, instructions: str = None):
+        """
+        Asynchronous counterpart of `run`.
+
+        Loading, extraction and writing run as overlapping producer/consumer stages:
+        documents are loaded one at a time into a bounded queue, extracted by up to
+        `max_concurrent_llm_requests` concurrent model calls, and the extracted data
+        is written by up to `max_concurrent_db_writes` concurrent graph writes.
+
+        Args:
+            instructions (str): Additional instructions for the model.
+        """
+        llm_concurrency = self.config.get("max_concurrent_llm_requests", 64)
+        db_concurrency = self.config.get("max_concurrent_db_writes", 8)
+        self._llm_semaphore = asyncio.Semaphore(llm_concurrency)
+        self._db_semaphore = asyncio.Semaphore(db_concurrency)
+
+        documents: asyncio.Queue = asyncio.Queue(maxsize=2 * llm_concurrency)
+        extractions: asyncio.Queue = asyncio.Queue(maxsize=2 * db_concurrency)
+
+        extractors = [
+            asyncio.create_task(self._aextract_worker(documents, extractions, instructions))
+            for _ in range(llm_concurrency)
+        ]
+        writers = [
+            asyncio.create_task(self._awrite_worker(extractions))
+            for _ in range(db_concurrency)
+        ]
+
+        # Documents are pulled from the (blocking) loaders one at a time
+        iterator = self._documents(instructions)
+        count = 0
+        try:
+            while True:
+                item = await asyncio.to_thread(next, iterator, None)
+                if item is None:
+                    break
+                await documents.put(item)
+                count += 1
+        except BaseException:
+            for task in extractors + writers:
+                task.cancel()
+            raise
+
+        for _ in extractors:
+            await documents.put(None)
+        await asyncio.gather(*extractors)
+
+        for _ in writers:
+            await extractions.put(None)
+        await asyncio.gather(*writers)
+
+        logger.debug(f"Processed {count} documents")
+        (self.task_log or default_task_log()).flush()
+
+    async def _aextract_worker(
+        self,
+        documents: asyncio.Queue,
+        extractions: asyncio.Queue,
+        instructions: str = None,
+    ):
+        while (item := await documents.get()) is not None:
+            (document, source_instructions, fingerprint) = item
+            task_id = "extract_data_step_" + str(uuid4())
+            try:
+                _task_logger = self._create_task_logger(task_id)
+                data = await self._aextract(
                     task_id,
                     self._create_chat(),
                     document,
-                    self.ontology,
-                    self.graph,
+                    _task_logger,
                     source_instructions,
                     instructions,
                 )
-                tasks.append(task)
+                await extractions.put((data, _task_logger, fingerprint))
+            except Exception as e:
+                logger.exception(e)
 
-            # Wait for all tasks to complete
-            wait(tasks)
+    async def _awrite_worker(self, extractions: asyncio.Queue):
+        while (item := await extractions.get()) is not None:
+            (data, _task_logger, fingerprint) = item
+            try:
+                async with self._db_semaphore:
+                    await asyncio.to_thread(
+                        self._write_data,
+                        self.graph,
+                        self.ontology,
+                        data,
+                        _task_logger,
+                        fingerprint,
+                    )
+            except Exception as e:
+                logger.exception(e)
+
+    def _create_task_logger(self, task_id: str) -> logging.LoggerAdapter:
+        return (self.task_log or default_task_log()).task(task_id)
+
+    def _load(self, source: AbstractSource):
+        # Times loading and chunking each document, which happen lazily
+        chunks = self._chunks(source)
+        while True:
+            with get_metrics().span("graphrag.load"):
+                document = next(chunks, None)
+            if document is None:
+                return
+            yield document
+
+    def _chunks(self, source: AbstractSource):
+        for document in source.load():
+            if (
+                document is not None
+                and document.content is not None
+                and len(document.content) > 0
+            ):
+                yield from self.chunker.split(document)
+
+    def _create_user_message(
+        self,
+        document: Document,
+        source_instructions: str = "",
+        instructions: str = "",
+    ) -> str:
+        return EXTRACT_DATA_PROMPT.format(
+            text=document.content,
+            instructions="\n".join(
+                [
+                    source_instructions if source_instructions is not None else "",
+                    instructions if instructions is not None else "",
+                ]
+            ),
+        )
+
+    def _check_responses(
+        self, responses: list[GenerationResponse], _task_logger: logging.LoggerAdapter
+    ) -> str:
+        if responses[-1].finish_reason != FinishReason.STOP:
+            _task_logger.debug(
+                f"Model stopped unexpectedly: {responses[-1].finish_reason}"
+            )
+            raise Exception(
+                f"Model stopped unexpectedly: {responses[-1].finish_reason}"
+            )
+
+        return " ".join([r.text for r in responses])
+
+    def _check_data(self, data: dict, _task_logger: logging.LoggerAdapter) -> dict:
+        if "entities" not in data or "relations" not in data:
+            _task_logger.debug(
+                "Invalid data format. Missing entities or relations. %s", data
+            )
+            raise Exception(
+                f"Invalid data format. Missing 'entities' or 'relations' in JSON."
+            )
+
+        return data
 
     def _process_source(
         self,
@@ -99,192 +314,173 @@ class ExtractDataStep(Step):
         graph: Graph,
         source_instructions: str = "",
         instructions: str = "",
-    ):
+        fingerprint: DocumentFingerprint | None = None,
+    ) -> int:
+        # Returns the number of entities and relations that failed to be written
         try:
-            _task_logger = logging.getLogger(task_id)
-            _task_logger.setLevel(logging.DEBUG)
+            metrics = get_metrics()
+            with metrics.span("graphrag.document"):
+                _task_logger = self._create_task_logger(task_id)
 
-            fh = logging.FileHandler(f"logs/{task_id}.log")
-            fh.setFormatter(
-                logging.Formatter(
-                    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-                )
-            )
-            fh.setLevel(logging.DEBUG)
-
-            _task_logger.addHandler(fh)
-
-            logger.debug(f"Processing task: {task_id}")
-            _task_logger.debug(f"Processing task: {task_id}")
-            text = document.content[: self.config["max_input_tokens"]]
-            user_message = EXTRACT_DATA_PROMPT.format(
-                text=text,
-                instructions="\n".join(
-                    [
-                        source_instructions if source_instructions is not None else "",
-                        instructions if instructions is not None else "",
-                    ]
-                ),
-            )
+                logger.debug(f"Processing task: {task_id}")
+                _task_logger.debug("Processing task: %s", task_id)
+                with metrics.span("graphrag.prompt"):
+                    user_message = self._create_user_message(
+                        document, source_instructions, instructions
+                    )
 
-            # logger.debug(f"User message: {user_message}")
-            _task_logger.debug("User message: " + user_message.replace("\n", " "))
+                # logger.debug(f"User message: {user_message}")
+                _task_logger.debug("User message: %s", user_message)
 
-            responses: list[GenerationResponse] = []
-            response_idx = 0
+                responses: list[GenerationResponse] = []
+                response_idx = 0
 
-            responses.append(self._call_model(chat_session, user_message))
-
-            _task_logger.debug(f"Model response: {responses[response_idx].text}")
-
-            while responses[response_idx].finish_reason == FinishReason.MAX_TOKENS:
-                _task_logger.debug("Asking model to continue")
-                response_idx += 1
-                responses.append(self._call_model(chat_session, "continue"))
-                _task_logger.debug(
-                    f"Model response after continue: {responses[response_idx].text}"
-                )
+                responses.append(self._call_model(chat_session, user_message))
 
-            if responses[response_idx].finish_reason != FinishReason.STOP:
-                _task_logger.debug(
-                    f"Model stopped unexpectedly: {responses[response_idx].finish_reason}"
-                )
-                raise Exception(
-                    f"Model stopped unexpectedly: {responses[response_idx].finish_reason}"
-                )
+                _task_logger.debug("Model response: %s", responses[response_idx].text)
 
-            combined_text = " ".join([r.text for r in responses])
+                while responses[response_idx].finish_reason == FinishReason.MAX_TOKENS:
+                    _task_logger.debug("Asking model to continue")
+                    response_idx += 1
+                    responses.append(self._call_model(chat_session, "continue"))
+                    _task_logger.debug(
+                        "Model response after continue: %s", responses[response_idx].text
+                    )
 
-            try:
-                data = json.loads(extract_json(combined_text))
-            except Exception as e:
-                _task_logger.debug(f"Error extracting JSON: {e}")
-                _task_logger.debug(f"Prompting model to fix JSON")
-                json_fix_response = self._call_model(
-                    self._create_chat(),
-                    FIX_JSON_PROMPT.format(json=combined_text, error=str(e)),
-                )
-                data = json.loads(extract_json(json_fix_response.text))
-                _task_logger.debug(f"Fixed JSON: {data}")
+                combined_text = self._check_responses(responses, _task_logger)
 
-            if "entities" not in data or "relations" not in data:
-                _task_logger.debug(
-                    f"Invalid data format. Missing entities or relations. {data}"
-                )
-                raise Exception(
-                    f"Invalid data format. Missing 'entities' or 'relations' in JSON."
-                )
-            for entity in data["entities"]:
                 try:
-                    self._create_entity(graph, entity, ontology)
+                    with metrics.span("graphrag.json.extract"):
+                        data = json.loads(extract_json(combined_text))
                 except Exception as e:
-                    _task_logger.error(f"Error creating entity: {e}")
-                    continue
+                    _task_logger.debug("Error extracting JSON: %s", e)
+                    _task_logger.debug("Prompting model to fix JSON")
+                    with metrics.span("graphrag.json.repair"):
+                        json_fix_response = self._call_model(
+                            self._create_chat(),
+                            FIX_JSON_PROMPT.format(json=combined_text, error=str(e)),
+                        )
+                        data = json.loads(extract_json(json_fix_response.text))
+                    _task_logger.debug("Fixed JSON: %s", data)
 
-            for relation in data["relations"]:
-                try:
-                    self._create_relation(graph, relation, ontology)
-                except Exception as e:
-                    _task_logger.error(f"Error creating relation: {e}")
-                    continue
+                self._check_data(data, _task_logger)
+                return self._write_data(graph, ontology, data, _task_logger, fingerprint)
 
         except Exception as e:
             logger.exception(e)
             raise e
 
-    def _create_entity(self, graph: Graph, args: dict, ontology: Ontology):
-        # Get unique attributes from entity
-        entity = ontology.get_entity_with_label(args["label"])
-        if entity is None:
-            print(f"Entity with label {args['label']} not found in ontology")
-            return None
-        unique_attributes_schema = [attr for attr in entity.attributes if attr.unique]
-        unique_attributes = {
-            attr.name: (
-                args["attributes"][attr.name] if attr.name in args["attributes"] else ""
+    async def _aextract(
+        self,
+        task_id: str,
+        chat_session: GenerativeModelChatSession,
+        document: Document,
+        _task_logger: logging.LoggerAdapter,
+        source_instructions: str = "",
+        instructions: str = "",
+    ) -> dict:
+        metrics = get_metrics()
+        logger.debug(f"Processing task: {task_id}")
+        _task_logger.debug("Processing task: %s", task_id)
+        with metrics.span("graphrag.prompt"):
+            user_message = self._create_user_message(
+                document, source_instructions, instructions
             )
-            for attr in unique_attributes_schema
-        }
-        unique_attributes_text = map_dict_to_cypher_properties(unique_attributes)
-        non_unique_attributes = {
-            attr.name: args["attributes"][attr.name]
-            for attr in entity.attributes
-            if not attr.unique and attr.name in args["attributes"]
-        }
-        non_unique_attributes_text = map_dict_to_cypher_properties(
-            non_unique_attributes
-        )
-        set_statement = (
-            f"SET n += {non_unique_attributes_text}"
-            if len(non_unique_attributes.keys()) > 0
-            else ""
-        )
-        query = f"MERGE (n:{args['label']} {unique_attributes_text}) {set_statement}"
-        logger.debug(f"Query: {query}")
-        result = graph.query(query)
-        return result
-
-    def _create_relation(self, graph: Graph, args: dict, ontology: Ontology):
-        relations = ontology.get_relations_with_label(args["label"])
-        if len(relations) == 0:
-            print(f"Relations with label {args['label']} not found in ontology")
-            return None
-        source_unique_attributes = (
-            args["source"]["attributes"]
-            if "source" in args and "attributes" in args["source"]
-            else {}
-        )
-        source_unique_attributes_text = map_dict_to_cypher_properties(
-            source_unique_attributes
-        )
+        _task_logger.debug("User message: %s", user_message)
 
-        target_unique_attributes = (
-            args["target"]["attributes"]
-            if "target" in args and "attributes" in args["target"]
-            else {}
-        )
-        target_unique_attributes_text = map_dict_to_cypher_properties(
-            target_unique_attributes
-        )
+        responses: list[GenerationResponse] = [
+            await self._acall_model(chat_session, user_message)
+        ]
+        _task_logger.debug("Model response: %s", responses[-1].text)
 
-        relation_attributes = (
-            map_dict_to_cypher_properties(args["attributes"])
-            if "attributes" in args
-            else {}
-        )
-        set_statement = (
-            f"SET r += {relation_attributes}"
-            if "attributes" in args
-            and len(
-                args["attributes"]
-                if isinstance(args["attributes"], list)
-                else args["attributes"].keys()
-            )
-            > 0
-            else ""
+        while responses[-1].finish_reason == FinishReason.MAX_TOKENS:
+            _task_logger.debug("Asking model to continue")
+            responses.append(await self._acall_model(chat_session, "continue"))
+            _task_logger.debug("Model response after continue: %s", responses[-1].text)
+
+        combined_text = self._check_responses(responses, _task_logger)
+
+        try:
+            with metrics.span("graphrag.json.extract"):
+                data = json.loads(extract_json(combined_text))
+        except Exception as e:
+            _task_logger.debug("Error extracting JSON: %s", e)
+            _task_logger.debug("Prompting model to fix JSON")
+            with metrics.span("graphrag.json.repair"):
+                json_fix_response = await self._acall_model(
+                    self._create_chat(),
+                    FIX_JSON_PROMPT.format(json=combined_text, error=str(e)),
+                )
+                data = json.loads(extract_json(json_fix_response.text))
+            _task_logger.debug("Fixed JSON: %s", data)
+
+        return self._check_data(data, _task_logger)
+
+    def _write_data(
+        self,
+        graph: Graph,
+        ontology: Ontology,
+        data: dict,
+        _task_logger: logging.LoggerAdapter,
+        fingerprint: DocumentFingerprint | None = None,
+    ) -> int:
+        writer = GraphWriter(
+            graph,
+            ontology,
+            self.config.get("write_batch_size", 500),
+            self.graph_version,
+            self.embedding_model,
+            self.entity_resolver,
         )
-        query = f"MATCH (s:{args['source']['label']} {source_unique_attributes_text}) MATCH (d:{args['target']['label']} {target_unique_attributes_text}) MERGE (s)-[r:{args['label']}]->(d) {set_statement}"
-        logger.debug(f"Query: {query}")
-        result = graph.query(query)
-        return result
+        for entity in data["entities"]:
+            try:
+                writer.add_entity(entity)
+            except Exception as e:
+                _task_logger.error(f"Error creating entity: {e}")
+                continue
+
+        for relation in data["relations"]:
+            try:
+                writer.add_relation(relation)
+            except Exception as e:
+                _task_logger.error(f"Error creating relation: {e}")
+                continue
+
+        failed = writer.flush()
+        if failed > 0:
+            # Not fingerprinted, so the document is extracted again on the next run
+            _task_logger.error(f"Failed to write {failed} entities and relations")
+        elif fingerprint is not None and self.fingerprints is not None:
+            self.fingerprints.save(fingerprint)
+        return failed
 
-    @sleep_and_retry
-    @limits(calls=15, period=60)
     def _call_model(
         self,
         chat_session: GenerativeModelChatSession,
         prompt: str,
-        retry=6,
     ):
-        try:
-            return chat_session.send_message(prompt)
-        except Exception as e:
-            # If exception is caused by quota exceeded, wait 10 seconds and try again for 6 times
-            if "Quota exceeded" in str(e) and retry > 0:
-                time.sleep(10)
-                retry -= 1
-                return self._call_model(chat_session, prompt, retry)
-            else:
-                if retry == 0:
-                    logger.error("Quota exceeded")
-                raise e
+        rate_limiter = self.model.rate_limiter or default_rate_limiter()
+        # The call is timed within the limiter, apart from the time waiting on it
+        return rate_limiter.call(
+            self.model.rate_limit_key(),
+            lambda: measure_llm_call(
+                "extract_data", prompt, lambda: chat_session.send_message(prompt)
+            ),
+            count_tokens(prompt),
+        )
+
+    async def _acall_model(
+        self,
+        chat_session: GenerativeModelChatSession,
+        prompt: str,
+    ):
+        rate_limiter = self.model.rate_limiter or default_rate_limiter()
+        # The semaphore is taken first, so calls waiting on it hold no rate limit capacity
+        async with self._llm_semaphore:
+            return await rate_limiter.acall(
+                self.model.rate_limit_key(),
+                lambda: ameasure_llm_call(
+                    "extract_data", prompt, lambda: chat_session.asend_message(prompt)
+                ),
+                count_tokens(prompt),
+            )
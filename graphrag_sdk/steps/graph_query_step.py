@@ -12,8 +12,12 @@ import logging
 from graphrag_sdk.helpers import (
     extract_cypher,
     validate_cypher,
-    stringify_falkordb_response,
 )
+from graphrag_sdk.query_cache import QueryResultCache
+from graphrag_sdk.cypher_cache import CypherCache
+from graphrag_sdk.query_guard import QueryGuard
+from graphrag_sdk.context_builder import ContextBuilder
+from graphrag_sdk.metrics import get_metrics, measure_llm_call
 from falkordb import Graph
 
 logger = logging.getLogger(__name__)
@@ -31,13 +35,31 @@ class GraphQueryGenerationStep(Step):
         ontology: Ontology,
         chat_session: GenerativeModelChatSession,
         config: dict = None,
+        query_cache: QueryResultCache | None = None,
+        cypher_cache: CypherCache | None = None,
+        query_guard: QueryGuard | None = None,
+        context_builder: ContextBuilder | None = None,
     ) -> None:
         self.ontology = ontology
         self.config = config or {}
         self.graph = graph
         self.chat_session = chat_session
+        self.query_cache = query_cache
+        self.cypher_cache = cypher_cache
+        self.query_guard = query_guard
+        self.context_builder = context_builder or ContextBuilder()
 
     def run(self, question: str, retries: int = 5):
+        # Reuse the statement of a similar question, skipping generation
+        if self.cypher_cache is not None:
+            cypher = self.cypher_cache.lookup(question)
+            if cypher is not None:
+                try:
+                    cypher = self._check(cypher)
+                    return (self._execute(cypher, question), cypher)
+                except Exception as e:
+                    logger.debug(f"Cached Cypher failed, generating a new one: {e}")
+
         error = False
 
         cypher = ""
@@ -51,8 +73,10 @@ class GraphQueryGenerationStep(Step):
                     )
                 )
                 logger.debug(f"Cypher Prompt: {cypher_prompt}")
-                cypher_statement_response = self.chat_session.send_message(
+                cypher_statement_response = measure_llm_call(
+                    "cypher_generation",
                     cypher_prompt,
+                    lambda: self.chat_session.send_message(cypher_prompt),
                 )
                 logger.debug(f"Cypher Statement Response: {cypher_statement_response}")
                 cypher = extract_cypher(cypher_statement_response.text)
@@ -61,17 +85,11 @@ class GraphQueryGenerationStep(Step):
                 if not cypher or len(cypher) == 0:
                     return (None, None)
 
-                validation_errors = validate_cypher(cypher, self.ontology)
-                # print(f"Is valid: {is_valid}")
-                if validation_errors is not None:
-                    raise Exception("\n".join(validation_errors))
+                cypher = self._check(cypher)
+                context = self._execute(cypher, question)
 
-                if cypher is not None:
-                    result_set = self.graph.query(cypher).result_set
-                    context = stringify_falkordb_response(result_set)
-                    logger.debug(f"Context: {context}")
-                    logger.debug(f"Context size: {len(result_set)}")
-                    logger.debug(f"Context characters: {len(str(context))}")
+                if self.cypher_cache is not None:
+                    self.cypher_cache.store(question, cypher)
 
                 return (context, cypher)
             except Exception as e:
@@ -80,3 +98,34 @@ class GraphQueryGenerationStep(Step):
                 retries -= 1
 
         raise Exception("Failed to generate Cypher query: " + str(error))
+
+    def _check(self, cypher: str) -> str:
+        with get_metrics().span("graphrag.cypher.validate"):
+            validation_errors = validate_cypher(cypher, self.ontology)
+        if validation_errors is not None:
+            raise Exception("\n".join(validation_errors))
+
+        if self.query_guard is not None:
+            with get_metrics().span("graphrag.cypher.guard"):
+                cypher = self.query_guard.check(self.graph, cypher)
+        return cypher
+
+    def _execute(self, cypher: str, question: str) -> str:
+        timeout = self.query_guard.timeout if self.query_guard is not None else None
+        with get_metrics().span("graphrag.cypher.query"):
+            try:
+                result_set = (
+                    self.query_cache.query(self.graph, cypher, timeout)
+                    if self.query_cache is not None
+                    else self.graph.query(cypher, timeout=timeout).result_set
+                )
+            except Exception as e:
+                error = self.query_guard.timeout_error(e) if self.query_guard else e
+                if error is e:
+                    raise
+                raise error from e
+        context = self.context_builder.build(result_set, cypher, question)
+        logger.debug(f"Context: {context}")
+        logger.debug(f"Context size: {context.included_rows} of {context.rows} rows")
+        logger.debug(f"Context tokens: {context.tokens}")
+        return context.text
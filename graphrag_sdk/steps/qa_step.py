@@ -2,7 +2,9 @@ from graphrag_sdk.steps.Step import Step
 from graphrag_sdk.models import GenerativeModelChatSession
 
 from graphrag_sdk.fixtures.prompts import GRAPH_QA_SYSTEM, GRAPH_QA_PROMPT
+from graphrag_sdk.metrics import get_metrics, measure_llm_call
 import logging
+from typing import Iterator
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -23,11 +25,24 @@ class QAStep(Step):
 
     def run(self, question: str, cypher: str, context: str):
 
-        qa_prompt = GRAPH_QA_PROMPT.format(
-            context=context, cypher=cypher, question=question
-        )
+        with get_metrics().span("graphrag.qa"):
+            qa_prompt = GRAPH_QA_PROMPT.format(
+                context=context, cypher=cypher, question=question
+            )
 
-        # logger.debug(f"QA Prompt: {qa_prompt}")
-        qa_response = self.chat_session.send_message(qa_prompt)
+            # logger.debug(f"QA Prompt: {qa_prompt}")
+            qa_response = measure_llm_call(
+                "qa", qa_prompt, lambda: self.chat_session.send_message(qa_prompt)
+            )
 
         return qa_response.text
+
+    def run_stream(self, question: str, cypher: str, context: str) -> Iterator[str]:
+
+        # The span covers the whole answer, until the stream is consumed
+        with get_metrics().span("graphrag.qa", {"stream": True}):
+            qa_prompt = GRAPH_QA_PROMPT.format(
+                context=context, cypher=cypher, question=question
+            )
+
+            yield from self.chat_session.send_message_stream(qa_prompt)
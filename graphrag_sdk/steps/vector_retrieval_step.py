@@ -0,0 +1,80 @@
+from graphrag_sdk.steps.Step import Step
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.models import EmbeddingModel
+from graphrag_sdk.context_builder import ContextBuilder
+from graphrag_sdk.metrics import get_metrics
+from graphrag_sdk.vector_index import query_vector_indexes
+from falkordb import Graph
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The neighborhood of the entities found, the closest first
+NEIGHBORHOOD_QUERY = """UNWIND $ids AS id
+MATCH (n) WHERE ID(n) = id
+OPTIONAL MATCH (n)-[r]-(m)
+RETURN n, r, m
+LIMIT $limit"""
+
+# The cosine distance beyond which entities are not related enough to the question
+DEFAULT_MAX_DISTANCE = 0.3
+
+
+class VectorRetrievalStep(Step):
+    """
+    Vector Retrieval Step
+
+    Retrieves the context of a question without generating Cypher: the question is
+    embedded, the closest entities are looked up in the vector indexes and their
+    neighborhood is returned. Nothing is returned when no entity is close enough to the
+    question, or when the vector indexes cannot be searched, e.g. when they were not
+    created, so the caller can fall back to Cypher generation.
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        ontology: Ontology,
+        embedding_model: EmbeddingModel,
+        config: dict = None,
+        context_builder: ContextBuilder | None = None,
+    ) -> None:
+        self.graph = graph
+        self.ontology = ontology
+        self.embedding_model = embedding_model
+        self.config = config or {}
+        self.context_builder = context_builder or ContextBuilder()
+
+    def run(self, question: str) -> tuple[str | None, str | None]:
+        top_k = self.config.get("top_k", 5)
+        max_distance = self.config.get("max_distance", DEFAULT_MAX_DISTANCE)
+
+        metrics = get_metrics()
+        with metrics.span("graphrag.vector.search"):
+            vector = self.embedding_model.embed([question])[0]
+            try:
+                hits = query_vector_indexes(
+                    self.graph, [e.label for e in self.ontology.entities], vector, top_k
+                )
+            except Exception as e:
+                logger.warning(f"Vector search failed, see Ontology.ensure_vector_indexes: {e}")
+                return (None, None)
+            if max_distance is not None:
+                hits = [(id, score) for (id, score) in hits if score <= max_distance]
+            metrics.record("graphrag.vector.hits", len(hits))
+            logger.debug(f"Vector hits: {hits}")
+
+            if len(hits) == 0:
+                return (None, None)
+
+            result_set = self.graph.query(
+                NEIGHBORHOOD_QUERY,
+                {
+                    "ids": [id for (id, _) in hits],
+                    "limit": self.config.get("max_neighbors", 100),
+                },
+            ).result_set
+
+        context = self.context_builder.build(result_set, NEIGHBORHOOD_QUERY, question)
+        logger.debug(f"Context: {context}")
+        return (context.text, NEIGHBORHOOD_QUERY)
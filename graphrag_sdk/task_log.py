@@ -0,0 +1,164 @@
+import os
+import json
+import random
+import logging
+import threading
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+logger = logging.getLogger(__name__)
+
+
+class _JsonlFormatter(logging.Formatter):
+
+    def __init__(self, max_message_chars: int):
+        super().__init__()
+        self.max_message_chars = max_message_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if len(message) > self.max_message_chars:
+            message = message[: self.max_message_chars] + "..."
+        return json.dumps(
+            {
+                "time": record.created,
+                "task": getattr(record, "task_id", None),
+                "level": record.levelname,
+                "message": message,
+            },
+            ensure_ascii=False,
+        )
+
+
+class _RotatingJsonlHandler(RotatingFileHandler):
+
+    def _open(self):
+        # The directory is only created once a record is written
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+class TaskLog:
+    """
+    Structured log of extraction tasks, one JSON object per line in a single rotating file.
+
+    Records are buffered in memory and written every `buffer_size` records or
+    as soon as an error is logged. Only a `sample_rate` share of the tasks log their
+    debug records, the prompts and responses, while errors are logged for every task.
+    Nothing is written, and no file or directory is created, until a record is logged.
+
+    The log file is written by a single process: by default it is named after the process id,
+    e.g. "logs/tasks.1234.jsonl", so ingest workers sharing a working directory do not
+    interleave or rotate each other's records. An explicit `path` must not be shared by processes.
+
+    Args:
+        path (str | None): The log file, rotated when it reaches `max_bytes`, None for the per-process default.
+        max_bytes (int): The size at which the file is rotated.
+        backup_count (int): The number of rotated files kept.
+        sample_rate (float): The share of tasks logging debug records, between 0 and 1.
+        buffer_size (int): The number of records buffered before being written.
+        max_message_chars (int): The length messages are truncated to.
+        enabled (bool): Whether anything is logged.
+
+    Examples:
+        >>> set_default_task_log(TaskLog(sample_rate=1))  # logs every prompt and response
+        >>> set_default_task_log(TaskLog(enabled=False))
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_bytes: int = 100 * 1024 * 1024,
+        backup_count: int = 5,
+        sample_rate: float = 0.01,
+        buffer_size: int = 1000,
+        max_message_chars: int = 10000,
+        enabled: bool = True,
+    ):
+        if path is None:
+            path = os.path.join("logs", f"tasks.{os.getpid()}.jsonl")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+
+        self._handler = None
+        self._file_handler = None
+        if enabled:
+            file_handler = _RotatingJsonlHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, delay=True, encoding="utf-8"
+            )
+            file_handler.setFormatter(_JsonlFormatter(max_message_chars))
+            self._file_handler = file_handler
+            self._handler = MemoryHandler(
+                buffer_size, flushLevel=logging.ERROR, target=file_handler
+            )
+
+        # Standalone loggers, not registered in the logging hierarchy
+        self._sampled = logging.Logger("graphrag_sdk.task_log", logging.DEBUG)
+        self._unsampled = logging.Logger("graphrag_sdk.task_log", logging.ERROR)
+        for task_logger in (self._sampled, self._unsampled):
+            if self._handler is not None:
+                task_logger.addHandler(self._handler)
+            task_logger.disabled = not enabled
+
+    def task(self, task_id: str) -> logging.LoggerAdapter:
+        """
+        Returns the logger of a task, tagging its records with the task id.
+
+        Args:
+            task_id (str): The task id.
+
+        Returns:
+            logging.LoggerAdapter: The task logger.
+        """
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        return logging.LoggerAdapter(
+            self._sampled if sampled else self._unsampled, {"task_id": task_id}
+        )
+
+    def flush(self) -> None:
+        """
+        Writes the buffered records.
+        """
+        if self._handler is not None:
+            self._handler.flush()
+
+    def close(self) -> None:
+        """
+        Writes the buffered records and closes the log file.
+        """
+        if self._handler is not None:
+            self._handler.close()
+            self._file_handler.close()
+
+
+_default_task_log: TaskLog | None = None
+_default_task_log_lock = threading.Lock()
+
+
+def default_task_log() -> TaskLog:
+    """
+    Returns the process-wide task log used by extraction steps without one,
+    writing a sample of the tasks to "logs/tasks.<pid>.jsonl".
+
+    Returns:
+        TaskLog: The default task log.
+    """
+    global _default_task_log
+    with _default_task_log_lock:
+        if _default_task_log is None:
+            _default_task_log = TaskLog()
+        return _default_task_log
+
+
+def set_default_task_log(task_log: TaskLog) -> None:
+    """
+    Sets the process-wide task log used by extraction steps without one.
+
+    Args:
+        task_log (TaskLog): The task log, e.g. TaskLog(enabled=False) to turn task logging off.
+    """
+    global _default_task_log
+    with _default_task_log_lock:
+        if _default_task_log is not None and _default_task_log is not task_log:
+            _default_task_log.close()
+        _default_task_log = task_log
@@ -0,0 +1,311 @@
+import logging
+from typing import Callable
+from graphrag_sdk.attribute import Attribute, AttributeType
+
+logger = logging.getLogger(__name__)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_number(value):
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return value
+
+
+def _to_boolean(value):
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return value
+
+
+def _to_string(value):
+    return str(value) if _is_number(value) else value
+
+
+# Type checks and the error raised on mismatch, per attribute type
+_CHECKS: dict[str, tuple[Callable, str]] = {
+    AttributeType.STRING: (lambda v: isinstance(v, str), "should be a string"),
+    AttributeType.NUMBER: (_is_number, "should be an number"),
+    AttributeType.BOOLEAN: (lambda v: isinstance(v, bool), "should be a boolean"),
+}
+
+# Lossless conversions of values extracted with the wrong type
+_COERCERS: dict[str, Callable] = {
+    AttributeType.STRING: _to_string,
+    AttributeType.NUMBER: _to_number,
+    AttributeType.BOOLEAN: _to_boolean,
+}
+
+
+class AttributesValidator:
+    """
+    Validator of the attributes of an entity or relation, compiled once from the ontology
+    into attribute maps and required and unique sets.
+
+    Args:
+        attributes (list[Attribute]): The attributes defined by the ontology.
+    """
+
+    def __init__(self, attributes: list[Attribute]):
+        self.attributes = {attr.name: attr for attr in attributes}
+        self.unique = tuple(attr.name for attr in attributes if attr.unique)
+        self.required = frozenset(
+            attr.name for attr in attributes if attr.required or attr.unique
+        )
+        self._checks = {attr.name: _CHECKS.get(attr.type) for attr in attributes}
+        self._coercers = {attr.name: _COERCERS.get(attr.type) for attr in attributes}
+
+    def errors(self, values: dict) -> list[str]:
+        """
+        Lists the differences between attribute values and the ontology.
+
+        Args:
+            values (dict): The attribute values.
+
+        Returns:
+            list[str]: The errors, empty if the values are valid.
+        """
+        errors = [
+            f"Attribute {name} is required" for name in self.required if name not in values
+        ]
+        for name, value in values.items():
+            if name not in self.attributes:
+                errors.append(f"Invalid attribute {name}")
+                continue
+            check = self._checks[name]
+            if check is not None and not check[0](value):
+                errors.append(f"Attribute {name} {check[1]}")
+        return errors
+
+    def validate(self, values: dict) -> None:
+        """
+        Checks attribute values against the ontology.
+
+        Args:
+            values (dict): The attribute values.
+
+        Raises:
+            Exception: If an attribute is missing, unknown or of the wrong type.
+        """
+        errors = self.errors(values)
+        if len(errors) > 0:
+            raise Exception(errors[0])
+
+    def normalize(self, values: dict) -> dict:
+        """
+        Normalizes extracted attribute values for writing: missing values become empty
+        strings, like the SDK stores them, and values of the wrong type are converted
+        when it is lossless, e.g. "1999" for a number attribute.
+
+        Args:
+            values (dict): The attribute values.
+
+        Returns:
+            dict: The normalized values.
+        """
+        if not isinstance(values, dict):
+            return {}
+        normalized = {}
+        for name, value in values.items():
+            if value is None:
+                normalized[name] = ""
+                continue
+            coerce = self._coercers.get(name)
+            normalized[name] = coerce(value) if coerce is not None else value
+        return normalized
+
+
+class EntityValidator(AttributesValidator):
+    """
+    Validator of the entities of a label.
+
+    Args:
+        entity (Entity): The ontology entity.
+    """
+
+    def __init__(self, entity):
+        super().__init__(entity.attributes)
+        self.label = entity.label
+
+    def split(self, values: dict) -> tuple[dict, dict]:
+        """
+        Normalizes extracted attribute values and splits them into the unique attributes,
+        which the entity is merged on, missing ones being empty, and the other known attributes.
+
+        Args:
+            values (dict): The attribute values.
+
+        Returns:
+            tuple[dict, dict]: The unique and the non-unique attribute values.
+        """
+        values = self.normalize(values)
+        unique = {name: values.get(name, "") for name in self.unique}
+        others = {
+            name: value
+            for name, value in values.items()
+            if name in self.attributes and name not in unique
+        }
+        return (unique, others)
+
+
+class RelationValidator(AttributesValidator):
+    """
+    Validator of the relations of a label between two entity labels.
+
+    Args:
+        relation (Relation): The ontology relation.
+    """
+
+    def __init__(self, relation):
+        super().__init__(relation.attributes)
+        self.label = relation.label
+        self.source = relation.source.label
+        self.target = relation.target.label
+
+
+class OntologyValidator:
+    """
+    Validators of an ontology's entities and relations, each compiled on first use.
+    Obtain it with `Ontology.validator()`, which compiles it again once the ontology changes.
+
+    Args:
+        ontology (Ontology): The ontology.
+
+    Examples:
+        >>> validator = ontology.validator()
+        >>> validator.entity("Actor").validate({"name": "Tom Hanks"})
+        >>> errors = validator.validate_many(entities, relations)
+    """
+
+    def __init__(self, ontology):
+        self.ontology = ontology
+        self._entities: dict[str, EntityValidator | None] = {}
+        self._relations: dict[tuple, RelationValidator | None] = {}
+
+    def entity(self, label: str) -> EntityValidator | None:
+        """
+        Returns the validator of an entity label.
+
+        Args:
+            label (str): The entity label.
+
+        Returns:
+            EntityValidator | None: The validator, None if the label is not in the ontology.
+        """
+        if label not in self._entities:
+            entity = self.ontology.get_entity_with_label(label)
+            self._entities[label] = EntityValidator(entity) if entity is not None else None
+        return self._entities[label]
+
+    def relation(self, label: str, source: str, target: str) -> RelationValidator | None:
+        """
+        Returns the validator of a relation label between two entity labels.
+
+        Args:
+            label (str): The relation label.
+            source (str): The source entity label.
+            target (str): The target entity label.
+
+        Returns:
+            RelationValidator | None: The validator, None if the relation is not in the ontology.
+        """
+        key = (label, source, target)
+        if key not in self._relations:
+            relation = self.ontology.get_relation(label, source, target)
+            self._relations[key] = RelationValidator(relation) if relation is not None else None
+        return self._relations[key]
+
+    def validate_entity(self, label: str, attributes: dict) -> None:
+        """
+        Checks an entity against the ontology.
+
+        Args:
+            label (str): The entity label.
+            attributes (dict): The entity attributes.
+
+        Raises:
+            Exception: If the entity does not match the ontology.
+        """
+        validator = self.entity(label)
+        if validator is None:
+            raise Exception(f"Entity {label} not found in ontology")
+        validator.validate(attributes)
+
+    def validate_relation(
+        self,
+        label: str,
+        source: str,
+        target: str,
+        source_attributes: dict,
+        target_attributes: dict,
+        attributes: dict,
+    ) -> None:
+        """
+        Checks a relation and its endpoints against the ontology.
+
+        Args:
+            label (str): The relation label.
+            source (str): The source entity label.
+            target (str): The target entity label.
+            source_attributes (dict): The source entity attributes.
+            target_attributes (dict): The target entity attributes.
+            attributes (dict): The relation attributes.
+
+        Raises:
+            Exception: If the relation does not match the ontology.
+        """
+        validator = self.relation(label, source, target)
+        if validator is None:
+            raise Exception(f"Relation {label} not found in ontology")
+        validator.validate(attributes)
+        self.validate_entity(source, source_attributes)
+        self.validate_entity(target, target_attributes)
+
+    def validate_many(
+        self, entities: list[dict] = None, relations: list[dict] = None
+    ) -> tuple[list[str | None], list[str | None]]:
+        """
+        Checks entities and relations in the extraction format against the ontology, e.g.
+        `{"label": "Actor", "attributes": {...}}` and `{"label": "ACTED_IN", "source":
+        {"label": "Actor", "attributes": {...}}, "target": {...}, "attributes": {...}}`.
+
+        Args:
+            entities (list[dict]): The entities.
+            relations (list[dict]): The relations.
+
+        Returns:
+            tuple[list[str | None], list[str | None]]: The error of each entity and relation, None when valid.
+        """
+        entity_errors = []
+        for entity in entities or []:
+            try:
+                self.validate_entity(entity["label"], entity.get("attributes", {}))
+                entity_errors.append(None)
+            except Exception as e:
+                entity_errors.append(str(e))
+
+        relation_errors = []
+        for relation in relations or []:
+            try:
+                self.validate_relation(
+                    relation["label"],
+                    relation["source"]["label"],
+                    relation["target"]["label"],
+                    relation["source"].get("attributes", {}),
+                    relation["target"].get("attributes", {}),
+                    relation.get("attributes", {}),
+                )
+                relation_errors.append(None)
+            except Exception as e:
+                relation_errors.append(str(e))
+
+        return (entity_errors, relation_errors)
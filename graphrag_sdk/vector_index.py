@@ -0,0 +1,80 @@
+import logging
+from falkordb import Graph
+from graphrag_sdk.helpers import quote_cypher_identifier
+
+logger = logging.getLogger(__name__)
+
+# The node property holding entity embeddings, hidden from QA contexts
+EMBEDDING_ATTRIBUTE = "_embedding"
+
+# The attribute embedded along the unique attributes, when the entity has one
+DESCRIPTION_ATTRIBUTE = "description"
+
+
+def entity_text(unique: dict, attributes: dict) -> str:
+    """
+    Returns the text embedded for an entity: its unique attribute values, then its description.
+
+    Args:
+        unique (dict): The unique attribute values.
+        attributes (dict): The other attribute values.
+
+    Returns:
+        str: The text to embed, e.g. "Tom Hanks. American actor and filmmaker".
+    """
+    values = [str(value) for value in unique.values() if value not in (None, "")]
+    description = attributes.get(DESCRIPTION_ATTRIBUTE)
+    if description not in (None, ""):
+        values.append(str(description))
+    return ". ".join(values)
+
+
+def vector_index_query(label: str, dimension: int) -> str:
+    """
+    Builds the statement creating the cosine vector index over the embeddings of a label.
+
+    Args:
+        label (str): The entity label.
+        dimension (int): The size of the embeddings.
+
+    Returns:
+        str: The Cypher statement.
+    """
+    return (
+        f"CREATE VECTOR INDEX FOR (n:{quote_cypher_identifier(label)}) "
+        f"ON (n.{quote_cypher_identifier(EMBEDDING_ATTRIBUTE)}) "
+        f"OPTIONS {{dimension: {int(dimension)}, similarityFunction: 'cosine'}}"
+    )
+
+
+def query_vector_indexes(
+    graph: Graph, labels: list[str], vector: list[float], k: int
+) -> list[tuple[int, float]]:
+    """
+    Finds the entities closest to a vector across the vector indexes of several labels,
+    in a single round trip.
+
+    Args:
+        graph (Graph): The graph to search.
+        labels (list[str]): The entity labels, each with a vector index.
+        vector (list[float]): The vector searched for.
+        k (int): The number of entities returned.
+
+    Returns:
+        list[tuple[int, float]]: The node ids and their cosine distances, the closest first.
+    """
+    if len(labels) == 0:
+        return []
+
+    params = {"vector": vector, "k": k, "attribute": EMBEDDING_ATTRIBUTE}
+    queries = []
+    for i, label in enumerate(labels):
+        params[f"label_{i}"] = label
+        queries.append(
+            f"CALL db.idx.vector.queryNodes($label_{i}, $attribute, $k, vecf32($vector)) "
+            "YIELD node, score RETURN ID(node), score"
+        )
+
+    result_set = graph.query(" UNION ALL ".join(queries), params).result_set
+    hits = sorted(((row[0], row[1]) for row in result_set), key=lambda hit: hit[1])
+    return hits[:k]
@@ -0,0 +1,249 @@
+"""
+Stand-ins for the graph, Redis connection, models and sources shared by the unit tests.
+"""
+
+import json
+import threading
+from types import SimpleNamespace
+from graphrag_sdk.document import Document
+from graphrag_sdk.models import (
+    GenerativeModel,
+    GenerativeModelChatSession,
+    GenerationResponse,
+    FinishReason,
+)
+
+
+class RecordingGraph:
+    """
+    Graph stand-in recording the queries it receives and the rows they write.
+
+    Args:
+        fail_on (str | None): Queries whose statement or parameters contain this text fail.
+        error (Exception | None): The error raised by failing queries.
+        result_set (list | None): The result set returned by every query.
+    """
+
+    def __init__(
+        self,
+        fail_on: str | None = None,
+        error: Exception | None = None,
+        result_set: list | None = None,
+    ):
+        self.fail_on = fail_on
+        self.error = error or Exception("Invalid value")
+        self.result_set = result_set or []
+        self.queries = []
+        self.rows = []
+
+    def query(self, q: str, params: dict = None, timeout: int = None):
+        if self.fail_on is not None and (self.fail_on in q or self.fail_on in str(params)):
+            raise self.error
+        self.queries.append((q, params))
+        if params is not None and "rows" in params:
+            self.rows.extend(params["rows"])
+        return SimpleNamespace(result_set=self.result_set)
+
+
+class FakePipeline:
+    """
+    Transaction stand-in running its buffered commands on execute
+    """
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        self.connection.transactions.append([name for (name, _, _) in self.commands])
+        return [
+            getattr(self.connection, name)(*args, **kwargs)
+            for (name, args, kwargs) in self.commands
+        ]
+
+
+class FakeConnection:
+    """
+    Redis connection stand-in supporting the string, hash and stream commands used by the SDK
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.hashes: dict[str, dict] = {}
+        self.streams: dict[str, list[tuple[str, dict]]] = {}
+        self.pending: dict[str, list] = {}
+        self.transactions = []
+        self._next_id = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hsetnx(self, key, field, value):
+        values = self.hashes.setdefault(key, {})
+        if field in values:
+            return False
+        values[field] = value
+        return True
+
+    def hscan_iter(self, key, count=None):
+        return iter(list(self.hashes.get(key, {}).items()))
+
+    def xgroup_create(self, name, groupname, id="0", mkstream=False):
+        self.streams.setdefault(name, [])
+
+    def xadd(self, name, fields):
+        self._next_id += 1
+        entry_id = f"{self._next_id}-0"
+        self.streams.setdefault(name, []).append((entry_id, fields))
+        return entry_id
+
+    def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        name = list(streams.keys())[0]
+        entries = [
+            (i, f) for (i, f) in self.streams.get(name, []) if i not in self.pending
+        ][:count]
+        for (entry_id, _) in entries:
+            self.pending[entry_id] = [consumername, 1]
+        return [[name, entries]] if len(entries) > 0 else []
+
+    def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        # Entries pending on stopped consumers are immediately idle
+        entries = [
+            (i, f)
+            for (i, f) in self.streams.get(name, [])
+            if i in self.pending and self.pending[i][0] == "stopped"
+        ][:count]
+        for (entry_id, _) in entries:
+            self.pending[entry_id][0] = consumername
+            self.pending[entry_id][1] += 1
+        return ["0-0", entries, []]
+
+    def xpending_range(self, name, groupname, min, max, count):
+        if min not in self.pending:
+            return []
+        return [{"message_id": min, "times_delivered": self.pending[min][1]}]
+
+    def xack(self, name, groupname, entry_id):
+        self.pending.pop(entry_id, None)
+
+    def xdel(self, name, entry_id):
+        self.streams[name] = [(i, f) for (i, f) in self.streams[name] if i != entry_id]
+
+    def xrange(self, name, count=None):
+        return self.streams.get(name, [])[:count]
+
+    def xlen(self, name):
+        return len(self.streams.get(name, []))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.hashes.pop(key, None)
+            self.streams.pop(key, None)
+
+
+class ActorModel(GenerativeModel):
+    """
+    Model extracting the actor named in a document and a movie they acted in,
+    failing on documents naming the actor "Poison"
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
+        return self
+
+    def start_chat(self, args: dict | None = None) -> GenerativeModelChatSession:
+        return ModelChatSession(self)
+
+    def ask(self, message: str) -> GenerationResponse:
+        with self._lock:
+            self.calls += 1
+        name = message.split("Actor ")[1].split("\n")[0].strip()
+        if name == "Poison":
+            raise Exception("Invalid document")
+        return GenerationResponse(
+            text=json.dumps(
+                {
+                    "entities": [
+                        {"label": "Actor", "attributes": {"name": name}},
+                        {"label": "Movie", "attributes": {"title": "Movie"}},
+                    ],
+                    "relations": [
+                        {
+                            "label": "ACTED_IN",
+                            "source": {"label": "Actor", "attributes": {"name": name}},
+                            "target": {"label": "Movie", "attributes": {"title": "Movie"}},
+                        }
+                    ],
+                }
+            ),
+            finish_reason=FinishReason.STOP,
+        )
+
+    def to_json(self) -> dict:
+        return {}
+
+    @staticmethod
+    def from_json(json: dict) -> "GenerativeModel":
+        return ActorModel()
+
+
+class ModelChatSession(GenerativeModelChatSession):
+    """
+    Chat session answering every message with its model's `ask`
+    """
+
+    def __init__(self, model: GenerativeModel):
+        self._model = model
+
+    def send_message(self, message: str) -> GenerationResponse:
+        return self._model.ask(message)
+
+
+class CypherChatSession(GenerativeModelChatSession):
+    """
+    Cypher generation session answering with the given statements in turn, then the last one
+    """
+
+    def __init__(self, statements: list[str]):
+        self.statements = statements
+        self.prompts = []
+
+    def send_message(self, message: str) -> GenerationResponse:
+        self.prompts.append(message)
+        statement = self.statements[min(len(self.prompts), len(self.statements)) - 1]
+        return GenerationResponse(f"```cypher\n{statement}\n```", FinishReason.STOP)
+
+
+class ActorSource:
+    """
+    Source loading one document per actor name
+    """
+
+    def __init__(self, names: list[str]):
+        self.path = "actors.txt"
+        self.names = names
+        self.instruction = None
+
+    def load(self):
+        for name in self.names:
+            yield Document(f"Actor {name}\n")
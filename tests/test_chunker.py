@@ -0,0 +1,76 @@
+from graphrag_sdk.document import Document
+from graphrag_sdk.chunker import TokenChunker, count_tokens
+import unittest
+
+
+class TestTokenChunker(unittest.TestCase):
+    """
+    Test splitting documents on token budgets
+    """
+
+    def _paragraphs(self, count: int) -> str:
+        return "\n\n".join(
+            " ".join(f"Sentence {p}.{s} about the movie." for s in range(10))
+            for p in range(count)
+        )
+
+    def test_short_document_is_not_split(self):
+        document = Document("A short document.")
+        chunks = list(TokenChunker(max_tokens=100, overlap_tokens=10).split(document))
+
+        self.assertEqual(len(chunks), 1)
+        self.assertIs(chunks[0], document)
+
+    def test_chunks_fit_budget_and_cover_document(self):
+        text = self._paragraphs(20)
+        chunker = TokenChunker(max_tokens=200, overlap_tokens=0)
+        chunks = list(chunker.split(Document(text)))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk.content), 200)
+            self.assertEqual(text[chunk.offset : chunk.offset + len(chunk.content)], chunk.content)
+
+        # Without overlap, chunks are contiguous and nothing is dropped
+        self.assertEqual("".join(c.content for c in chunks), text)
+
+    def test_chunks_end_on_boundaries(self):
+        chunks = list(TokenChunker(max_tokens=200, overlap_tokens=0).split(Document(self._paragraphs(20))))
+
+        for chunk in chunks[:-1]:
+            self.assertRegex(chunk.content, r"[.!?]\s+$")
+
+    def test_from_config(self):
+        chunker = TokenChunker.from_config({"max_input_tokens": 100000})
+        self.assertEqual((chunker.max_tokens, chunker.overlap_tokens), (100000, 200))
+
+        chunker = TokenChunker.from_config(
+            {"max_input_tokens": 100000, "chunk_size_tokens": 4096, "chunk_overlap_tokens": 300}
+        )
+        self.assertEqual((chunker.max_tokens, chunker.overlap_tokens), (4096, 300))
+
+        # The default overlap does not exceed small budgets
+        chunker = TokenChunker.from_config({"max_input_tokens": 200})
+        self.assertEqual((chunker.max_tokens, chunker.overlap_tokens), (200, 50))
+
+    def test_chunks_overlap(self):
+        text = self._paragraphs(20)
+        chunks = list(TokenChunker(max_tokens=200, overlap_tokens=100).split(Document(text)))
+
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertLess(chunk.offset, previous.offset + len(previous.content))
+            self.assertGreater(chunk.offset, previous.offset)
+        self.assertEqual(chunks[-1].offset + len(chunks[-1].content), len(text))
+
+    def test_text_without_boundaries_is_split(self):
+        text = "x" * 5000
+        chunks = list(TokenChunker(max_tokens=100, overlap_tokens=0).split(Document(text, offset=10)))
+
+        self.assertEqual("".join(c.content for c in chunks), text)
+        self.assertEqual(chunks[0].offset, 10)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk.content), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from graphrag_sdk.connection import ConnectionManager
+from unittest.mock import patch
+from redis import BlockingConnectionPool
+import unittest
+
+
+class _FakeFalkorDB:
+    """
+    FalkorDB client stand-in keeping the pool it was created with
+    """
+
+    def __init__(self, connection_pool=None):
+        self.connection = self
+        self.connection_pool = connection_pool
+        self.disconnected = False
+        connection_pool.disconnect = self._disconnect
+
+    def _disconnect(self):
+        self.disconnected = True
+
+
+@patch("graphrag_sdk.connection.FalkorDB", _FakeFalkorDB)
+class TestConnectionManager(unittest.TestCase):
+    """
+    Test sharing pooled clients across knowledge graphs
+    """
+
+    def tearDown(self):
+        ConnectionManager.close_all()
+
+    def test_pool_settings(self):
+        pool = ConnectionManager.create_pool(
+            "falkordb", 6380, max_connections=8, health_check_interval=10, timeout=5
+        )
+        self.assertIsInstance(pool, BlockingConnectionPool)
+        self.assertEqual(pool.max_connections, 8)
+        self.assertEqual(pool.timeout, 5)
+        self.assertEqual(pool.connection_kwargs["host"], "falkordb")
+        self.assertEqual(pool.connection_kwargs["port"], 6380)
+        self.assertEqual(pool.connection_kwargs["health_check_interval"], 10)
+        self.assertTrue(pool.connection_kwargs["decode_responses"])
+
+    def test_clients_are_shared_per_server(self):
+        db = ConnectionManager.get("falkordb", 6379, max_connections=8)
+        self.assertIs(ConnectionManager.get("falkordb", 6379), db)
+        self.assertEqual(db.connection_pool.max_connections, 8)
+
+        self.assertIsNot(ConnectionManager.get("falkordb", 6380), db)
+        self.assertIsNot(ConnectionManager.get("falkordb", 6379, "reader", "secret"), db)
+
+    def test_close(self):
+        db = ConnectionManager.get("falkordb", 6379)
+        ConnectionManager.close("falkordb", 6379)
+        self.assertTrue(db.disconnected)
+        self.assertIsNot(ConnectionManager.get("falkordb", 6379), db)
+
+
+if __name__ == "__main__":
+    unittest.main()
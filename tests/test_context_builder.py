@@ -0,0 +1,86 @@
+from graphrag_sdk.context_builder import ContextBuilder
+from graphrag_sdk.metrics import InMemoryMetrics, set_metrics
+from falkordb import Node, Edge, Path
+import unittest
+
+
+class TestContextBuilder(unittest.TestCase):
+    """
+    Test serializing query results into a compact, budgeted context
+    """
+
+    def setUp(self):
+        self.actor = Node(1, labels=["Actor"], properties={"name": "Tom Hanks"})
+        self.movie = Node(2, labels=["Movie"], properties={"title": "Big"})
+        self.role = Edge(self.actor, "ACTED_IN", self.movie, 3, properties={"role": "Josh\tBaskin"})
+
+    def test_compact_rows(self):
+        context = ContextBuilder().build(
+            [
+                [self.actor, self.role, self.movie],
+                [self.actor, self.role, self.movie],
+                [self.actor, None, [1, 2]],
+            ],
+            "MATCH (a:Actor)-[r]->(m) RETURN a, r AS role, m ORDER BY a.name;",
+        )
+        self.assertEqual(
+            context.text,
+            "a\trole\tm\n"
+            "Actor#1{name: Tom Hanks}\tACTED_IN{role: Josh Baskin}\tMovie#2{title: Big} (x2)\n"
+            "Actor#1\t\t[1, 2]",
+        )
+        self.assertEqual((context.rows, context.dropped_rows), (3, 0))
+
+    def test_keeps_row_multiplicity(self):
+        context = ContextBuilder().build([[8.0], [7.5], [8.0], [8.0]], "MATCH (m) RETURN m.rating")
+        self.assertEqual(context.text, "m.rating\n8.0 (x3)\n7.5")
+        self.assertEqual(context.included_rows, 4)
+
+    def test_paths_and_scalars(self):
+        builder = ContextBuilder()
+        path = Path([self.actor, self.movie], [self.role])
+        self.assertEqual(
+            builder.build([[path]], "MATCH p = (:Actor)-->() RETURN p").text,
+            "p\nActor#1{name: Tom Hanks}-[ACTED_IN{role: Josh Baskin}]-Movie#2{title: Big}",
+        )
+        self.assertEqual(
+            builder.build([[3]], "MATCH (a) RETURN DISTINCT count(a)").text, "count(a)\n3"
+        )
+        self.assertEqual(builder.build([], "MATCH (a) RETURN a").text, "(no rows)")
+        self.assertEqual(builder.build([["x" * 20]], None).text, "x" * 20)
+        self.assertEqual(
+            ContextBuilder(max_value_chars=5).build([["x" * 20]]).text, "xxxxx..."
+        )
+
+    def test_budget(self):
+        metrics = InMemoryMetrics()
+        set_metrics(metrics)
+        try:
+            rows = [[f"Movie {i}"] for i in range(1000)] + [["Tom Hanks"]]
+            context = ContextBuilder(max_tokens=50).build(
+                rows, "MATCH (a) RETURN a.name", "Who is Tom Hanks?"
+            )
+        finally:
+            set_metrics(None)
+
+        lines = context.text.split("\n")
+        # Unordered rows mentioning the question come first
+        self.assertEqual(lines[:3], ["a.name", "Tom Hanks", "Movie 0"])
+        self.assertEqual(
+            lines[-1], f"({context.dropped_rows} of 1001 rows omitted to fit the context)"
+        )
+        self.assertLessEqual(context.tokens, 50)
+        self.assertEqual(
+            metrics.summary()["graphrag.context.dropped_rows"]["max"], context.dropped_rows
+        )
+
+    def test_ordered_rows_keep_order(self):
+        rows = [["Big"], ["Tom Hanks"]]
+        context = ContextBuilder().build(
+            rows, "MATCH (a) RETURN a.name ORDER BY a.name", "Who is Tom Hanks?"
+        )
+        self.assertEqual(context.text, "a.name\nBig\nTom Hanks")
+
+
+if __name__ == "__main__":
+    unittest.main()
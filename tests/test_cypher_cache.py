@@ -0,0 +1,153 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.cypher_cache import InMemoryCypherCache, literals_in_question
+from graphrag_sdk.steps.graph_query_step import GraphQueryGenerationStep
+from graphrag_sdk.models import HashingEmbeddingModel
+from graphrag_sdk.models.embedding import cosine_similarity
+from tests.fakes import CypherChatSession, RecordingGraph
+import unittest
+
+CYPHER = "MATCH (a:Actor)-[:ACTED_IN]->(m:Movie) RETURN a.name, m.title"
+RESULT_SET = [["Tom Hanks", "Forrest Gump"]]
+
+
+class TestCypherCache(unittest.TestCase):
+    """
+    Test reusing the Cypher statements of similar questions
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ontology = Ontology()
+        cls.ontology.add_entity(
+            Entity("Actor", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+        cls.ontology.add_entity(
+            Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)])
+        )
+        cls.ontology.add_relation(Relation("ACTED_IN", "Actor", "Movie"))
+
+    def test_hashing_embedding(self):
+        model = HashingEmbeddingModel()
+        (a, b, c) = model.embed(
+            [
+                "Which movies did Tom Hanks act in?",
+                "which movies did tom hanks act in",
+                "How many directors are there?",
+            ]
+        )
+
+        self.assertEqual(len(a), model.dimension)
+        self.assertAlmostEqual(cosine_similarity(a, b), 1.0)
+        self.assertLess(cosine_similarity(a, c), 0.5)
+
+    def test_lookup_threshold(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel(), threshold=0.9)
+        self.assertIsNone(cache.lookup("Which movies did Tom Hanks act in?"))
+
+        cache.store("Which movies did Tom Hanks act in?", CYPHER)
+
+        self.assertEqual(cache.lookup("Which movies did Tom Hanks act in ?"), CYPHER)
+        self.assertIsNone(cache.lookup("Which movies did Meg Ryan direct?"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2})
+
+    def test_rejects_statements_with_other_literals(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel())
+        template = (
+            "MATCH (m:Movie) WHERE m.year = {year} AND m.genre = 'Drama' "
+            "RETURN m.title ORDER BY m.rating DESC LIMIT 10"
+        )
+        question = (
+            "Which drama movies released in the year {year} had the best ratings "
+            "according to the critics and the audience of the festival?"
+        )
+        cache.store(question.format(year=1999), template.format(year=1999))
+
+        self.assertEqual(
+            cache.lookup(question.format(year=1999) + " "), template.format(year=1999)
+        )
+        self.assertIsNone(cache.lookup(question.format(year=2005)))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_literals_in_question(self):
+        self.assertTrue(
+            literals_in_question(
+                "MATCH (a:Actor {name: 'Tom Hanks'})-[*1..3]-(b) RETURN b LIMIT 5",
+                "Who is connected to tom hanks?",
+            )
+        )
+        self.assertFalse(
+            literals_in_question(
+                "MATCH (a:Actor {name: 'Tom Hanks'}) RETURN a", "Who is Meg Ryan?"
+            )
+        )
+        self.assertTrue(
+            literals_in_question("MATCH (m) WHERE m.rating > 7.5 RETURN m", "Rated above 7.5?")
+        )
+
+    def test_evicts_oldest(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel(), max_size=1)
+        cache.store("first question", "MATCH (a:Actor) RETURN a")
+        cache.store("second question", "MATCH (m:Movie) RETURN m")
+
+        self.assertIsNone(cache.lookup("first question"))
+        self.assertEqual(cache.lookup("second question"), "MATCH (m:Movie) RETURN m")
+
+    def test_step_skips_generation_for_similar_questions(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel())
+        chat_session = CypherChatSession([CYPHER])
+        step = GraphQueryGenerationStep(
+            graph=RecordingGraph(result_set=RESULT_SET),
+            ontology=self.ontology,
+            chat_session=chat_session,
+            cypher_cache=cache,
+        )
+
+        (_, cypher) = step.run("Which movies did Tom Hanks act in?")
+        self.assertEqual(cypher.strip(), CYPHER)
+        self.assertEqual(len(chat_session.prompts), 1)
+
+        (context, cypher) = step.run("which movies did Tom Hanks act in")
+        self.assertEqual(cypher.strip(), CYPHER)
+        self.assertIn("Forrest Gump", context)
+        self.assertEqual(len(chat_session.prompts), 1)
+
+    def test_step_regenerates_when_cached_cypher_fails(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel())
+        cache.store("Which movies did Tom Hanks act in?", "MATCH (a:Actor) RETURN a.age")
+        chat_session = CypherChatSession([CYPHER])
+        step = GraphQueryGenerationStep(
+            graph=RecordingGraph(fail_on="a.age", result_set=RESULT_SET),
+            ontology=self.ontology,
+            chat_session=chat_session,
+            cypher_cache=cache,
+        )
+
+        (_, cypher) = step.run("Which movies did Tom Hanks act in?")
+
+        self.assertEqual(cypher.strip(), CYPHER)
+        self.assertEqual(len(chat_session.prompts), 1)
+        # The regenerated statement replaces the failing one
+        self.assertEqual(cache.lookup("Which movies did Tom Hanks act in?").strip(), CYPHER)
+
+    def test_step_validates_cached_cypher(self):
+        cache = InMemoryCypherCache(HashingEmbeddingModel())
+        cache.store("Which movies did Tom Hanks act in?", "MATCH (d:Director) RETURN d")
+        chat_session = CypherChatSession([CYPHER])
+        step = GraphQueryGenerationStep(
+            graph=RecordingGraph(result_set=RESULT_SET),
+            ontology=self.ontology,
+            chat_session=chat_session,
+            cypher_cache=cache,
+        )
+
+        (_, cypher) = step.run("Which movies did Tom Hanks act in?")
+
+        self.assertEqual(cypher.strip(), CYPHER)
+        self.assertEqual(len(chat_session.prompts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.cypher_parser import parse_cypher, find_cypher_errors, tokenize_cypher
+import unittest
+
+
+class TestCypherParser(unittest.TestCase):
+    """
+    Test the extraction of Cypher patterns and their checks against an ontology
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._ontology = Ontology(
+            [Entity("Actor", []), Entity("Movie", []), Entity("Director", [])],
+            [
+                Relation("ACTED_IN", "Actor", "Movie"),
+                Relation("DIRECTED", "Director", "Movie"),
+            ],
+        )
+
+    def _kinds(self, cypher: str) -> list[str]:
+        return [e.kind for e in find_cypher_errors(cypher, self._ontology)]
+
+    def test_patterns(self):
+        patterns = parse_cypher(
+            "MATCH (a:Actor {name: 'Tom (Hanks)'})-[r:ACTED_IN]->(m:Movie)<-[:DIRECTED]-(d) "
+            "RETURN count(m), [x IN [1, 2] | x]"
+        )
+        self.assertEqual(
+            [(n.variable, n.labels) for n in patterns.nodes][:3],
+            [("a", ["Actor"]), ("m", ["Movie"]), ("d", [])],
+        )
+        self.assertEqual(
+            [(r.types, r.direction) for r in patterns.relationships],
+            [(["ACTED_IN"], "->"), (["DIRECTED"], "<-")],
+        )
+        self.assertEqual(patterns.errors, [])
+
+    def test_tokens(self):
+        tokens = list(tokenize_cypher("MATCH (`Odd Label`) // (x:Ignored)\nRETURN $p"))
+        self.assertEqual(
+            [(t.kind, t.text) for t in tokens],
+            [
+                ("name", "MATCH"),
+                ("symbol", "("),
+                ("name", "Odd Label"),
+                ("symbol", ")"),
+                ("name", "RETURN"),
+                ("parameter", "$p"),
+            ],
+        )
+
+    def test_valid(self):
+        valid = [
+            "MATCH (a:Actor)-[:ACTED_IN]->(m:Movie) RETURN a",
+            "MATCH (m:Movie)<-[:ACTED_IN]-(a:Actor) RETURN a",
+            "MATCH (a:Actor)-[:ACTED_IN]-(m:Movie) RETURN a",
+            "MATCH (m:Movie)-[:ACTED_IN]-(a:Actor) RETURN a",
+            "MATCH (a:Actor)-[:ACTED_IN*1..3]-(b:Actor) RETURN b",
+            "MATCH (a:Actor)-[:ACTED_IN|DIRECTED]->(m:Movie) RETURN a",
+            "MATCH (a:Actor) WHERE a.name = 'x' RETURN a",
+            "MATCH (a:Actor), (d:Director) RETURN a, d",
+        ]
+        for cypher in valid:
+            self.assertEqual(self._kinds(cypher), [], cypher)
+
+    def test_invalid(self):
+        invalid = {
+            "MATCH (a:Producer) RETURN a": ["entity"],
+            "MATCH (a:Actor)-[:PRODUCED]->(m:Movie) RETURN a": ["relation"],
+            "MATCH (m:Movie)-[:ACTED_IN]->(a:Actor) RETURN a": ["direction"],
+            # The variable keeps its label across patterns
+            "MATCH (m:Movie) MATCH (m)-[:ACTED_IN]->(a:Actor) RETURN a": ["direction"],
+            "MATCH (a:Actor {name: 'Tom) RETURN a": ["syntax"],
+            "MATCH (a:Actor RETURN a": ["syntax"],
+            "": ["syntax"],
+        }
+        for cypher, kinds in invalid.items():
+            self.assertEqual(self._kinds(cypher), kinds, cypher)
+
+    def test_errors_reported_once(self):
+        errors = find_cypher_errors(
+            "MATCH (a:Producer), (b:Producer) RETURN a, b", self._ontology
+        )
+        self.assertEqual([str(e) for e in errors], ["Entity Producer not found in ontology"])
+        self.assertEqual(errors[0].label, "Producer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from graphrag_sdk.document_loaders import CSVLoader, JSONLLoader
+import os
+import tempfile
+import unittest
+
+
+class TestDocumentLoaders(unittest.TestCase):
+    """
+    Test row based document loaders
+    """
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name: str, lines: list[str]) -> str:
+        path = os.path.join(self._tmp.name, name)
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def test_csv_loader(self):
+        path = self._write("data.csv", [f"{i},name {i}" for i in range(7)])
+
+        documents = list(CSVLoader(path, rows_per_document=3).load())
+
+        self.assertEqual(len(documents), 3)
+        self.assertEqual(documents[0].content, "0,name 0\n1,name 1\n2,name 2")
+        # Trailing rows are not dropped
+        self.assertEqual(documents[2].content, "6,name 6")
+
+    def test_csv_loader_full_batches(self):
+        path = self._write("data.csv", [f"{i},name {i}" for i in range(6)])
+
+        documents = list(CSVLoader(path, rows_per_document=3).load())
+
+        self.assertEqual(len(documents), 2)
+        self.assertEqual(documents[1].content, "3,name 3\n4,name 4\n5,name 5")
+
+    def test_jsonl_loader(self):
+        path = self._write("data.jsonl", [f'{{"id": {i}}}' for i in range(5)])
+
+        loader = JSONLLoader(path, rows_per_document=2).load()
+        first = next(loader)
+
+        self.assertIn('{"id": 0}', first.content)
+        self.assertIn('{"id": 1}', first.content)
+        rest = list(loader)
+        self.assertEqual(len(rest), 2)
+        # The last document holds the single remaining row
+        self.assertEqual(rest[-1].content, '{"id": 4}\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.graph_writer import GraphWriter
+from graphrag_sdk.entity_resolution import (
+    EntityResolver,
+    blocking_keys,
+    normalize_name,
+    soundex,
+)
+from graphrag_sdk.models import HashingEmbeddingModel
+from tests.fakes import FakeConnection, RecordingGraph
+import unittest
+
+
+class _RecordingEmbeddingModel(HashingEmbeddingModel):
+    """
+    Embedding model recording the texts it embeds
+    """
+
+    def __init__(self):
+        super().__init__(8)
+        self.texts = []
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        self.texts.extend(texts)
+        return super().embed(texts)
+
+
+class _UnlockedConnection(FakeConnection):
+    """
+    Connection checking the resolver lock is released during alias lookups and claims
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.resolver = None
+
+    def hget(self, key, field):
+        assert not self.resolver._lock.locked()
+        return super().hget(key, field)
+
+    def hsetnx(self, key, field, value):
+        assert not self.resolver._lock.locked()
+        return super().hsetnx(key, field, value)
+
+
+class TestEntityResolution(unittest.TestCase):
+    """
+    Test resolving extracted entities to canonical ones
+    """
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Hanks,  Tom "), "hanks tom")
+        self.assertEqual(normalize_name("Penélope Cruz"), "penelope cruz")
+
+    def test_soundex(self):
+        self.assertEqual(soundex("robert"), "r163")
+        self.assertEqual(soundex("rupert"), "r163")
+        self.assertEqual(soundex("ashcraft"), "a261")
+        self.assertEqual(soundex("hanks"), "h520")
+        self.assertEqual(soundex("1999"), "1999")
+
+    def test_blocking_keys(self):
+        self.assertEqual(blocking_keys("tom hanks"), blocking_keys("hanks tom"))
+        self.assertEqual(blocking_keys("tom hanks")[2], blocking_keys("tom hankz")[2])
+
+    def test_resolve_name_variants(self):
+        resolver = EntityResolver()
+        canonical = {"name": "Tom Hanks"}
+        self.assertEqual(resolver.resolve("Actor", {"name": "Tom Hanks"}), canonical)
+        self.assertEqual(resolver.resolve("Actor", {"name": "tom hanks"}), canonical)
+        self.assertEqual(resolver.resolve("Actor", {"name": "Hanks, Tom"}), canonical)
+        self.assertEqual(resolver.resolve("Actor", {"name": "Tom Hankss"}), canonical)
+
+    def test_distinct_entities_kept(self):
+        resolver = EntityResolver()
+        resolver.resolve("Actor", {"name": "Tom Hanks"})
+        self.assertEqual(resolver.resolve("Actor", {"name": "Tim Hanks"}), {"name": "Tim Hanks"})
+        self.assertEqual(resolver.resolve("Director", {"name": "tom hanks"}), {"name": "tom hanks"})
+
+    def test_distinguishing_tokens_match_exactly(self):
+        resolver = EntityResolver()
+        for name, other in [
+            ("Rocky II", "Rocky III"),
+            ("Henry VII", "Henry VIII"),
+            ("Louis XIV", "Louis XV"),
+            ("Apollo 11", "Apollo 13"),
+            ("John F Kennedy", "John Kennedy"),
+        ]:
+            self.assertEqual(resolver.resolve("Person", {"name": name}), {"name": name})
+            self.assertEqual(resolver.resolve("Person", {"name": other}), {"name": other})
+        self.assertEqual(
+            resolver.resolve("Person", {"name": "Henrry VIII"}), {"name": "Henry VIII"}
+        )
+
+    def test_non_string_values_match_exactly(self):
+        resolver = EntityResolver()
+        resolver.resolve("Movie", {"title": "Big", "year": 1988})
+        self.assertEqual(
+            resolver.resolve("Movie", {"title": "big", "year": 1988}),
+            {"title": "Big", "year": 1988},
+        )
+        self.assertEqual(
+            resolver.resolve("Movie", {"title": "big", "year": 2020}),
+            {"title": "big", "year": 2020},
+        )
+        self.assertEqual(resolver.resolve("Movie", {"year": 1988}), {"year": 1988})
+
+    def test_aliases_shared_through_connection(self):
+        connection = FakeConnection()
+        first = EntityResolver(connection, "movies")
+        second = EntityResolver(connection, "movies")
+
+        # Loaded before the first resolver writes, so only the stored alias is seen
+        second.resolve("Actor", {"name": "Meg Ryan"})
+        first.resolve("Actor", {"name": "Tom Hanks"})
+        self.assertEqual(second.resolve("Actor", {"name": "Tom Hanks"}), {"name": "Tom Hanks"})
+        first.resolve("Actor", {"name": "tom hanks"})
+
+        third = EntityResolver(connection, "movies")
+        self.assertEqual(third.resolve("Actor", {"name": "Hanks, Tom"}), {"name": "Tom Hanks"})
+        self.assertIn("graphrag:movies:aliases", connection.hashes)
+
+        third.delete()
+        self.assertNotIn("graphrag:movies:aliases", connection.hashes)
+        self.assertEqual(third.resolve("Actor", {"name": "tom hanks"}), {"name": "tom hanks"})
+
+    def test_candidates_compared_once(self):
+        model = _RecordingEmbeddingModel()
+        resolver = EntityResolver(embedding_model=model, embedding_similarity=1.1)
+        resolver.resolve("Actor", {"name": "Mark Johnson"})
+
+        # "mark johnson" shares the prefix and phonetic blocks of "mark johnsen"
+        resolver.resolve("Actor", {"name": "Mark Johnsen"})
+        self.assertEqual(model.texts, ["mark johnsen", "mark johnson"])
+
+    def test_lock_released_during_io(self):
+        connection = _UnlockedConnection()
+        resolver = EntityResolver(connection, "movies")
+        connection.resolver = resolver
+
+        resolver.resolve("Actor", {"name": "Tom Hanks"})
+        self.assertEqual(resolver.resolve("Actor", {"name": "tom hanks"}), {"name": "Tom Hanks"})
+
+    def test_graph_writer_resolves_entities_and_endpoints(self):
+        ontology = Ontology(
+            [
+                Entity("Actor", [Attribute("name", AttributeType.STRING, True, True)]),
+                Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)]),
+            ],
+            [Relation("ACTED_IN", "Actor", "Movie")],
+        )
+        graph = RecordingGraph()
+        writer = GraphWriter(graph, ontology, entity_resolver=EntityResolver())
+
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Tom Hanks"}})
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Hanks, Tom"}})
+        writer.add_relation(
+            {
+                "label": "ACTED_IN",
+                "source": {"label": "Actor", "attributes": {"name": "tom hanks"}},
+                "target": {"label": "Movie", "attributes": {"title": "Big"}},
+            }
+        )
+        writer.flush()
+
+        entity_rows = graph.queries[0][1]["rows"]
+        self.assertEqual([row["unique"] for row in entity_rows], [{"name": "Tom Hanks"}] * 2)
+        relation_rows = graph.queries[1][1]["rows"]
+        self.assertEqual(relation_rows[0]["source"], {"name": "Tom Hanks"})
+        self.assertEqual(relation_rows[0]["target"], {"title": "Big"})
+
+
+if __name__ == "__main__":
+    unittest.main()
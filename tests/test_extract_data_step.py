@@ -0,0 +1,161 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from graphrag_sdk.fingerprint import FingerprintStore
+from graphrag_sdk.models import HashingEmbeddingModel, RateLimiter
+from tests.fakes import ActorModel, ActorSource, FakeConnection, RecordingGraph
+import asyncio
+import os
+import tempfile
+import unittest
+
+
+class _SemaphoreCheckingRateLimiter(RateLimiter):
+    """
+    Rate limiter recording whether the step's model call semaphore is held on each acquire
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.step = None
+        self.semaphore_held = []
+
+    async def aacquire(self, key: str, tokens: int = 0) -> None:
+        self.semaphore_held.append(self.step._llm_semaphore.locked())
+        await super().aacquire(key, tokens)
+
+
+class TestExtractDataStep(unittest.TestCase):
+    """
+    Test extraction with a fake model and graph
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ontology = Ontology()
+        cls.ontology.add_entity(
+            Entity("Actor", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+        cls.ontology.add_entity(
+            Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)])
+        )
+        cls.ontology.add_relation(Relation("ACTED_IN", "Actor", "Movie"))
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _step(
+        self,
+        model: ActorModel,
+        graph: RecordingGraph,
+        count: int,
+        fingerprints: FingerprintStore = None,
+        source: ActorSource = None,
+        **kwargs,
+    ):
+        return ExtractDataStep(
+            sources=[source or ActorSource([f"A{i}" for i in range(count)])],
+            ontology=self.ontology,
+            model=model,
+            graph=graph,
+            config={
+                "max_workers": 4,
+                "max_input_tokens": 500000,
+                "max_concurrent_llm_requests": 4,
+                "max_concurrent_db_writes": 2,
+            },
+            fingerprints=fingerprints,
+            **kwargs,
+        )
+
+    def test_arun_acquires_semaphore_before_rate_limit(self):
+        rate_limiter = _SemaphoreCheckingRateLimiter()
+        step = self._step(ActorModel().with_rate_limiter(rate_limiter), RecordingGraph(), 3)
+        step.config["max_concurrent_llm_requests"] = 1
+        rate_limiter.step = step
+
+        asyncio.run(step.arun())
+
+        self.assertEqual(rate_limiter.semaphore_held, [True] * 3)
+
+    def test_run(self):
+        model = ActorModel()
+        graph = RecordingGraph()
+
+        self._step(model, graph, 5).run()
+
+        self.assertEqual(model.calls, 5)
+        # One actor, one movie and one relation per document
+        self.assertEqual(len(graph.rows), 15)
+
+    def test_arun(self):
+        model = ActorModel()
+        graph = RecordingGraph()
+
+        asyncio.run(self._step(model, graph, 20).arun())
+
+        self.assertEqual(model.calls, 20)
+        self.assertEqual(len(graph.rows), 60)
+        names = [r["unique"]["name"] for r in graph.rows if "name" in r.get("unique", {})]
+        self.assertEqual(sorted(names), sorted(f"A{i}" for i in range(20)))
+
+    def test_skips_unchanged_documents(self):
+        fingerprints = FingerprintStore(FakeConnection(), "test")
+        model = ActorModel()
+
+        self._step(model, RecordingGraph(), 3, fingerprints).run()
+        self.assertEqual(model.calls, 3)
+
+        # Nothing changed, nothing is extracted again
+        asyncio.run(self._step(model, RecordingGraph(), 3, fingerprints).arun())
+        self.assertEqual(model.calls, 3)
+
+        # One new document
+        self._step(model, RecordingGraph(), 4, fingerprints).run()
+        self.assertEqual(model.calls, 4)
+
+        # Every document changed
+        graph = RecordingGraph()
+        self._step(model, graph, 4, fingerprints, ActorSource([f"B{i}" for i in range(4)])).run()
+        self.assertEqual(model.calls, 8)
+        self.assertEqual(len(graph.rows), 12)
+
+        fingerprints.delete()
+        self._step(model, RecordingGraph(), 4, fingerprints).run()
+        self.assertEqual(model.calls, 12)
+
+    def test_enabling_embeddings_reingests(self):
+        fingerprints = FingerprintStore(FakeConnection(), "test")
+        model = ActorModel()
+
+        self._step(model, RecordingGraph(), 2, fingerprints).run()
+        graph = RecordingGraph()
+        self._step(
+            model, graph, 2, fingerprints, embedding_model=HashingEmbeddingModel(8)
+        ).run()
+
+        self.assertEqual(model.calls, 4)
+        self.assertIn("embedding", graph.rows[0])
+
+    def test_failed_writes_not_fingerprinted(self):
+        fingerprints = FingerprintStore(FakeConnection(), "test")
+        model = ActorModel()
+
+        self._step(model, RecordingGraph(fail_on="MERGE"), 2, fingerprints).run()
+        self.assertEqual(model.calls, 2)
+
+        # The documents were not written, they are extracted again
+        self._step(model, RecordingGraph(), 2, fingerprints).run()
+        self.assertEqual(model.calls, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from benchmarks.fake_model import FakeGenerativeModel, benchmark_ontology
+from benchmarks.ingestion import SyntheticSource, CountingGraph
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from tests.fakes import RecordingGraph
+from graphrag_sdk.steps.create_ontology_step import CreateOntologyStep
+import os
+import tempfile
+import unittest
+
+
+class TestFakeGenerativeModel(unittest.TestCase):
+    """
+    Test the benchmark model drives the pipeline steps without an LLM
+    """
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_create_ontology(self):
+        step = CreateOntologyStep(
+            sources=[SyntheticSource(3, 50)],
+            ontology=Ontology(),
+            model=FakeGenerativeModel(),
+            config={"max_workers": 2, "max_input_tokens": 500000},
+        )
+        ontology = step.run()
+        self.assertEqual(ontology.to_json(), benchmark_ontology().to_json())
+
+    def test_extract_data(self):
+        graph = CountingGraph(RecordingGraph())
+        step = ExtractDataStep(
+            sources=[SyntheticSource(5, 50)],
+            ontology=benchmark_ontology(),
+            model=FakeGenerativeModel(entities_per_document=4, relations_per_document=3),
+            graph=graph,
+            config={"max_workers": 2, "max_input_tokens": 500000},
+        )
+        step.run()
+
+        # One entity and one relation statement per document
+        self.assertEqual(graph.queries, 10)
+        self.assertEqual(graph.rows, 5 * (4 + 3))
+
+        # Extractions are deterministic
+        model = FakeGenerativeModel()
+        self.assertEqual(model._extraction(42), model._extraction(42))
+
+
+if __name__ == "__main__":
+    unittest.main()
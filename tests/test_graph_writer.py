@@ -0,0 +1,118 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.graph_writer import GraphWriter
+from tests.fakes import RecordingGraph
+import unittest
+
+
+class TestGraphWriter(unittest.TestCase):
+    """
+    Test batched graph writes
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ontology = Ontology()
+        cls.ontology.add_entity(
+            Entity(
+                label="Actor",
+                attributes=[
+                    Attribute("name", AttributeType.STRING, True, True),
+                    Attribute("age", AttributeType.NUMBER, False),
+                ],
+            )
+        )
+        cls.ontology.add_entity(
+            Entity(
+                label="Movie",
+                attributes=[Attribute("title", AttributeType.STRING, True, True)],
+            )
+        )
+        cls.ontology.add_relation(Relation("ACTED_IN", "Actor", "Movie"))
+
+    def _acted_in(self, name: str, title: str):
+        return {
+            "label": "ACTED_IN",
+            "source": {"label": "Actor", "attributes": {"name": name}},
+            "target": {"label": "Movie", "attributes": {"title": title}},
+            "attributes": {},
+        }
+
+    def test_groups_rows_per_label(self):
+        graph = RecordingGraph()
+        writer = GraphWriter(graph, self.ontology)
+
+        for i in range(10):
+            writer.add_entity({"label": "Actor", "attributes": {"name": f"A{i}", "age": i}})
+            writer.add_entity({"label": "Movie", "attributes": {"title": f"M{i}"}})
+            writer.add_relation(self._acted_in(f"A{i}", f"M{i}"))
+
+        self.assertEqual(len(graph.queries), 0)
+        self.assertEqual(writer.flush(), 0)
+
+        self.assertEqual(len(graph.queries), 3)
+        entity_query, entity_params = graph.queries[0]
+        self.assertTrue(entity_query.startswith("UNWIND $rows AS row MERGE (n:`Actor`"))
+        self.assertEqual(len(entity_params["rows"]), 10)
+        self.assertEqual(
+            entity_params["rows"][0], {"unique": {"name": "A0"}, "attributes": {"age": 0}}
+        )
+        self.assertIn("MERGE (s)-[r:`ACTED_IN`]->(d)", graph.queries[2][0])
+
+    def test_skips_labels_missing_from_ontology(self):
+        graph = RecordingGraph()
+        writer = GraphWriter(graph, self.ontology)
+
+        self.assertFalse(writer.add_entity({"label": "Director", "attributes": {}}))
+        self.assertFalse(writer.add_relation({"label": "DIRECTED"}))
+        writer.flush()
+
+        self.assertEqual(len(graph.queries), 0)
+
+    def test_flushes_when_batch_is_full(self):
+        graph = RecordingGraph()
+        writer = GraphWriter(graph, self.ontology, batch_size=4)
+
+        for i in range(5):
+            writer.add_entity({"label": "Actor", "attributes": {"name": f"A{i}"}})
+
+        self.assertEqual(len(graph.queries), 1)
+        writer.flush()
+        self.assertEqual(len(graph.queries), 2)
+
+    def test_isolates_failing_rows(self):
+        graph = RecordingGraph(fail_on="Bad")
+        writer = GraphWriter(graph, self.ontology)
+
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Good"}})
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Bad"}})
+
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(len(graph.queries), 1)
+        self.assertEqual(graph.queries[0][1]["rows"][0]["unique"]["name"], "Good")
+
+    def test_raises_connection_errors(self):
+        graph = RecordingGraph(fail_on="Bad", error=ConnectionError("Connection refused"))
+        writer = GraphWriter(graph, self.ontology)
+
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Bad"}})
+
+        with self.assertRaises(ConnectionError):
+            writer.flush()
+
+    def test_reports_failures_of_full_batches(self):
+        graph = RecordingGraph(fail_on="Bad")
+        writer = GraphWriter(graph, self.ontology, batch_size=2)
+
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Bad"}})
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Good"}})
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Other"}})
+
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.flush(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
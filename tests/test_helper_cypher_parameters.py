@@ -0,0 +1,45 @@
+from graphrag_sdk.helpers import map_dict_to_cypher_parameters
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.attribute import Attribute, AttributeType
+import unittest
+
+
+class TestCypherParameters(unittest.TestCase):
+    """
+    Test parameterized Cypher generation
+    """
+
+    def test_same_shape_same_query(self):
+        (first, first_params) = map_dict_to_cypher_parameters(
+            {"name": 'Tom "The Actor" Hanks'}, "n"
+        )
+        (second, second_params) = map_dict_to_cypher_parameters(
+            {"name": "O'Neil"}, "n"
+        )
+
+        self.assertEqual(first, "{`name`: $n0}")
+        self.assertEqual(first, second)
+        self.assertEqual(first_params, {"n0": 'Tom "The Actor" Hanks'})
+        self.assertEqual(second_params, {"n0": "O'Neil"})
+
+    def test_none_values(self):
+        (_, params) = map_dict_to_cypher_parameters({"name": None}, "n")
+
+        self.assertEqual(params, {"n0": ""})
+
+    def test_entity_graph_query(self):
+        entity = Entity(
+            label="Actor",
+            attributes=[Attribute("name", AttributeType.STRING, True, True)],
+            description="An actor's profile",
+        )
+
+        self.assertNotIn("profile", entity.to_graph_query())
+        self.assertEqual(
+            entity.to_graph_params(),
+            {"a0": "string!*", "description": "An actor's profile"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
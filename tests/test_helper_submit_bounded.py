@@ -0,0 +1,38 @@
+from graphrag_sdk.helpers import submit_bounded
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+
+
+class TestSubmitBounded(unittest.TestCase):
+    """
+    Test submitting a stream of tasks with a bounded number in flight
+    """
+
+    def test_submission_order_and_bound(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def task(i: int) -> int:
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            # Later tasks finish first
+            time.sleep(0.001 * (20 - i))
+            with lock:
+                running[0] -= 1
+            return i
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = [
+                future.result()
+                for future in submit_bounded(executor, task, ((i,) for i in range(20)), 4)
+            ]
+
+        self.assertEqual(results, list(range(20)))
+        self.assertLessEqual(running[1], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
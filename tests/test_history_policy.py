@@ -0,0 +1,119 @@
+from graphrag_sdk.models import (
+    GenerativeModel,
+    GenerationResponse,
+    FinishReason,
+    SlidingWindowPolicy,
+    SummarizingPolicy,
+)
+from graphrag_sdk.models.history import SUMMARY_PREFIX
+from graphrag_sdk.models.openai import OpenAiGenerativeModel
+from types import SimpleNamespace
+import unittest
+
+
+def _conversation(turns: int) -> list[dict]:
+    history = [{"role": "system", "content": "You are a helpful assistant."}]
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} " + "word " * 20})
+        history.append({"role": "assistant", "content": f"Answer {i} " + "word " * 20})
+    return history
+
+
+class _SummaryModel(GenerativeModel):
+    """
+    Model answering with numbered summaries
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_system_instruction(self, system_instruction: str) -> "GenerativeModel":
+        return self
+
+    def start_chat(self, args: dict | None = None):
+        raise NotImplementedError()
+
+    def ask(self, message: str) -> GenerationResponse:
+        self.calls += 1
+        return GenerationResponse(f"summary {self.calls}", FinishReason.STOP)
+
+    def to_json(self) -> dict:
+        return {}
+
+    @staticmethod
+    def from_json(json: dict) -> "GenerativeModel":
+        return _SummaryModel()
+
+
+class _StubCompletions:
+
+    def create(self, model: str, messages: list, **kwargs):
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="Answer " + "word " * 20),
+                    finish_reason="stop",
+                )
+            ]
+        )
+
+
+class TestHistoryPolicy(unittest.TestCase):
+    """
+    Test bounding chat histories
+    """
+
+    def test_history_within_budget_is_kept(self):
+        history = _conversation(2)
+
+        self.assertIs(SlidingWindowPolicy(max_tokens=1000).apply(history), history)
+
+    def test_sliding_window(self):
+        history = _conversation(10)
+        bounded = SlidingWindowPolicy(max_tokens=200).apply(history)
+
+        self.assertEqual(bounded[0], history[0])
+        self.assertEqual(bounded[1]["role"], "user")
+        self.assertEqual(bounded[-2:], history[-2:])
+        self.assertLess(len(bounded), len(history))
+
+    def test_keeps_latest_messages_over_budget(self):
+        history = _conversation(3)
+        bounded = SlidingWindowPolicy(max_tokens=10, min_messages=2).apply(history)
+
+        self.assertEqual(bounded, [history[0]] + history[-2:])
+
+    def test_summarizes_evicted_turns(self):
+        model = _SummaryModel()
+        policy = SummarizingPolicy(model, max_tokens=200)
+
+        history = policy.apply(_conversation(10))
+        self.assertEqual(history[1]["content"], SUMMARY_PREFIX + "summary 1")
+        self.assertEqual(history[2]["role"], "assistant")
+
+        # The summary is carried over and updated on the next eviction
+        for i in range(10):
+            history = policy.apply(
+                history
+                + [
+                    {"role": "user", "content": "More " + "word " * 20},
+                    {"role": "assistant", "content": "More " + "word " * 20},
+                ]
+            )
+        self.assertEqual(history[1]["content"], SUMMARY_PREFIX + f"summary {model.calls}")
+        self.assertLess(model.calls, 10)
+
+    def test_chat_session_history_is_bounded(self):
+        model = OpenAiGenerativeModel("gpt-4o", system_instruction="You are helpful.")
+        model.client = SimpleNamespace(chat=SimpleNamespace(completions=_StubCompletions()))
+        session = model.start_chat({"history_policy": SlidingWindowPolicy(max_tokens=200)})
+
+        for i in range(20):
+            session.send_message(f"Question {i} " + "word " * 20)
+
+        self.assertEqual(session._history[0]["role"], "system")
+        self.assertLess(len(session._history), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from graphrag_sdk.fingerprint import FingerprintStore
+from graphrag_sdk.ingest_queue import IngestQueue, IngestWorker, enqueue_documents
+from graphrag_sdk.task_log import TaskLog
+from tests.fakes import ActorModel, ActorSource, FakeConnection, RecordingGraph
+import os
+import tempfile
+import unittest
+
+
+class TestIngestQueue(unittest.TestCase):
+    """
+    Test distributed ingestion through a stream of jobs
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ontology = Ontology()
+        cls.ontology.add_entity(
+            Entity("Actor", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.connection = FakeConnection()
+        self.fingerprints = FingerprintStore(self.connection, "test")
+        self.queue = IngestQueue(self.connection, "test", max_attempts=2)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _step(self, graph: RecordingGraph, names: list[str] = [], task_log: TaskLog = None):
+        return ExtractDataStep(
+            sources=[ActorSource(names)],
+            ontology=self.ontology,
+            model=ActorModel(),
+            graph=graph,
+            config={"max_workers": 4, "max_input_tokens": 500000},
+            fingerprints=self.fingerprints,
+            task_log=task_log,
+        )
+
+    def test_workers_share_jobs(self):
+        names = [f"A{i}" for i in range(10)]
+        self.assertEqual(enqueue_documents(self.queue, self._step(None, names)), 10)
+        self.assertEqual(self.queue.size(), 10)
+
+        graph = RecordingGraph()
+        first = IngestWorker(self.queue, self._step(graph), "first", concurrency=2)
+        second = IngestWorker(self.queue, self._step(graph), "second", concurrency=2)
+
+        self.assertEqual(first.run(max_jobs=4), 4)
+        self.assertEqual(second.run(stop_when_empty=True, block_ms=1), 6)
+
+        self.assertEqual(self.queue.size(), 0)
+        self.assertEqual(sorted(r["unique"]["name"] for r in graph.rows), sorted(names))
+
+        # Processed documents are fingerprinted and not enqueued again
+        self.assertEqual(enqueue_documents(self.queue, self._step(None, names)), 0)
+
+    def test_failing_jobs_are_dead_lettered(self):
+        enqueue_documents(self.queue, self._step(None, ["A0", "Poison"]))
+
+        worker = IngestWorker(self.queue, self._step(RecordingGraph()), "worker")
+        self.assertEqual(worker.run(stop_when_empty=True, block_ms=1), 1)
+
+        self.assertEqual(worker.failed, 2)
+        self.assertEqual(self.queue.size(), 0)
+        dead_letters = self.queue.dead_letters()
+        self.assertEqual(len(dead_letters), 1)
+        self.assertEqual(dead_letters[0][0]["content"], "Actor Poison\n")
+        self.assertEqual(dead_letters[0][1], "Invalid document")
+        # Jobs are re-enqueued and acknowledged atomically
+        self.assertIn(["xadd", "xack", "xdel"], self.connection.transactions)
+
+    def test_jobs_of_stopped_workers_are_claimed(self):
+        enqueue_documents(self.queue, self._step(None, ["A0", "A1"]))
+
+        # A worker reads a job then stops before acknowledging it
+        self.assertEqual(len(self.queue.read("stopped", 1)), 1)
+
+        graph = RecordingGraph()
+        worker = IngestWorker(self.queue, self._step(graph), "worker")
+        self.assertEqual(worker.run(stop_when_empty=True, block_ms=1), 2)
+        self.assertEqual(len(graph.rows), 2)
+        self.assertEqual(self.queue.size(), 0)
+
+    def test_jobs_with_failed_writes_are_retried(self):
+        enqueue_documents(self.queue, self._step(None, ["A0"]))
+
+        graph = RecordingGraph(fail_on="MERGE")
+        worker = IngestWorker(self.queue, self._step(graph), "worker")
+        self.assertEqual(worker.run(stop_when_empty=True, block_ms=1), 0)
+
+        # Retried once, then dead-lettered, and never fingerprinted
+        self.assertEqual(worker.failed, 2)
+        dead_letters = self.queue.dead_letters()
+        self.assertEqual(dead_letters[0][1], "Failed to write 1 entities and relations")
+        self.assertEqual(enqueue_documents(self.queue, self._step(None, ["A0"])), 1)
+
+    def test_task_log_flushed_on_stop(self):
+        enqueue_documents(self.queue, self._step(None, ["A0"]))
+        path = os.path.join(self._tmp.name, "tasks.jsonl")
+        task_log = TaskLog(path, sample_rate=1)
+
+        worker = IngestWorker(self.queue, self._step(RecordingGraph(), task_log=task_log), "worker")
+        worker.run(stop_when_empty=True, block_ms=1)
+
+        with open(path) as f:
+            self.assertGreater(len(f.readlines()), 0)
+        task_log.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
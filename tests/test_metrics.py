@@ -0,0 +1,107 @@
+from benchmarks.fake_model import FakeGenerativeModel, benchmark_ontology
+from benchmarks.ingestion import SyntheticSource
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from tests.fakes import RecordingGraph
+from graphrag_sdk.metrics import (
+    InMemoryMetrics,
+    NoopMetrics,
+    get_metrics,
+    measure_llm_call,
+    set_metrics,
+)
+from graphrag_sdk.models import GenerationResponse, FinishReason
+import os
+import tempfile
+import unittest
+
+
+class _AttributeMetrics(InMemoryMetrics):
+    """
+    Metrics keeping the attributes of every measurement
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.attributes = {}
+
+    def record(self, name: str, value: float, attributes: dict | None = None) -> None:
+        super().record(name, value, attributes)
+        self.attributes.setdefault(name, []).append(attributes)
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test the pipeline stages report their timings
+    """
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.metrics = InMemoryMetrics()
+        set_metrics(self.metrics)
+
+    def tearDown(self):
+        set_metrics(None)
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_default_is_noop(self):
+        set_metrics(None)
+        self.assertIsInstance(get_metrics(), NoopMetrics)
+        with get_metrics().span("stage") as span:
+            span.set_attribute("key", "value")
+
+    def test_extraction_stages(self):
+        step = ExtractDataStep(
+            sources=[SyntheticSource(4, 50)],
+            ontology=benchmark_ontology(),
+            model=FakeGenerativeModel(entities_per_document=3, relations_per_document=2),
+            graph=RecordingGraph(),
+            config={"max_workers": 2, "max_input_tokens": 500000},
+        )
+        step.run()
+
+        summary = self.metrics.summary()
+        for stage in ("document", "prompt", "llm", "json.extract"):
+            self.assertEqual(summary[f"graphrag.{stage}.duration"]["count"], 4)
+        # The loader is polled once more to find it exhausted
+        self.assertEqual(summary["graphrag.load.duration"]["count"], 5)
+        self.assertEqual(summary["graphrag.write.duration"]["count"], 8)
+        self.assertEqual(summary["graphrag.write.rows"]["sum"], 4 * (3 + 2))
+        self.assertGreater(summary["graphrag.llm.prompt_tokens"]["max"], 0)
+        self.assertGreater(summary["graphrag.llm.completion_tokens"]["sum"], 0)
+        self.assertNotIn("graphrag.json.repair.duration", summary)
+
+    def test_failed_spans_are_recorded(self):
+        with self.assertRaises(ValueError):
+            with self.metrics.span("stage"):
+                raise ValueError()
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary["stage.duration"]["count"], 1)
+
+    def test_durations_keep_initial_attributes(self):
+        metrics = _AttributeMetrics()
+        set_metrics(metrics)
+        measure_llm_call(
+            "extract_data",
+            "prompt",
+            lambda: GenerationResponse("completion", FinishReason.STOP),
+        )
+        with self.assertRaises(ValueError):
+            with metrics.span("stage", {"kind": "entity"}) as span:
+                span.set_attribute("rows", 42)
+                raise ValueError()
+
+        # Counts are recorded in their histograms, not on the durations
+        self.assertEqual(metrics.attributes["graphrag.llm.duration"], [{"step": "extract_data"}])
+        self.assertEqual(metrics.summary()["graphrag.llm.prompt_tokens"]["count"], 1)
+        self.assertEqual(
+            metrics.attributes["stage.duration"], [{"kind": "entity", "error": "ValueError"}]
+        )
+        self.assertEqual(span.attributes["rows"], 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.attribute import Attribute, AttributeType
+from tests.fakes import RecordingGraph
+from types import SimpleNamespace
+import unittest
+
+
+class _IndexedGraph(RecordingGraph):
+    """
+    Graph stand-in recording index and constraint creation
+    """
+
+    def __init__(self, indexes: list = [], constraints: list = []):
+        super().__init__()
+        self.indexes = list(indexes)
+        self.constraints = list(constraints)
+
+    def query(self, q: str, params: dict = None, timeout: int = None):
+        result = super().query(q, params, timeout)
+        if q.startswith("CALL db.indexes()"):
+            return SimpleNamespace(result_set=self.indexes)
+        return result
+
+    def list_constraints(self):
+        return self.constraints
+
+    def create_node_unique_constraint(self, label: str, *properties):
+        if label == "Duplicated":
+            raise Exception("Constraint violation")
+        self.constraints.append(
+            {"type": "UNIQUE", "label": label, "properties": list(properties), "entitytype": "NODE"}
+        )
+
+
+class TestOntologyIndexes(unittest.TestCase):
+    """
+    Test provisioning indexes over the unique attributes of an ontology
+    """
+
+    def setUp(self):
+        self.ontology = Ontology()
+        self.ontology.add_entity(
+            Entity(
+                "Actor",
+                [
+                    Attribute("name", AttributeType.STRING, True, True),
+                    Attribute("birth", AttributeType.NUMBER, True, True),
+                    Attribute("bio", AttributeType.STRING, False, False),
+                ],
+            )
+        )
+        self.ontology.add_entity(
+            Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)])
+        )
+        self.ontology.add_entity(
+            Entity("Note", [Attribute("text", AttributeType.STRING, False, False)])
+        )
+
+    def test_index_definitions(self):
+        self.assertEqual(
+            self.ontology.get_index_definitions(),
+            {"Actor": ["name", "birth"], "Movie": ["title"]},
+        )
+
+    def test_creates_missing_indexes(self):
+        graph = _IndexedGraph(
+            indexes=[
+                ["Actor", ["name"], {"name": ["RANGE"]}, "NODE"],
+                # A full-text index does not serve merges
+                ["Movie", ["title"], {"title": ["FULLTEXT"]}, "NODE"],
+            ]
+        )
+
+        created = self.ontology.ensure_indexes(graph)
+
+        self.assertEqual(created, ["INDEX Actor(birth)", "INDEX Movie(title)"])
+        queries = [q for (q, _) in graph.queries]
+        self.assertIn("CREATE INDEX FOR (n:`Actor`) ON (n.`birth`)", queries)
+        self.assertIn("CREATE INDEX FOR (n:`Movie`) ON (n.`title`)", queries)
+
+    def test_existing_indexes_are_kept(self):
+        graph = _IndexedGraph(
+            indexes=[
+                ["Actor", ["name", "birth"], {"name": ["RANGE"], "birth": ["RANGE"]}, "NODE"],
+                ["Movie", ["title"], {"title": ["RANGE"]}, "NODE"],
+            ]
+        )
+
+        self.assertEqual(self.ontology.ensure_indexes(graph), [])
+        self.assertEqual(len(graph.queries), 1)
+
+    def test_unique_constraints(self):
+        self.ontology.add_entity(
+            Entity("Duplicated", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+        graph = _IndexedGraph(
+            constraints=[
+                {"type": "UNIQUE", "label": "Movie", "properties": ["title"], "entitytype": "NODE"}
+            ]
+        )
+
+        created = self.ontology.ensure_indexes(graph, unique_constraints=True)
+
+        self.assertIn("UNIQUE Actor(name, birth)", created)
+        self.assertNotIn("UNIQUE Movie(title)", created)
+        self.assertNotIn("UNIQUE Duplicated(name)", created)
+        self.assertIn("INDEX Duplicated(name)", created)
+
+
+if __name__ == "__main__":
+    unittest.main()
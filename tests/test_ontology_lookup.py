@@ -0,0 +1,87 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+import unittest
+
+
+def _entity(label: str, *attributes: str) -> Entity:
+    return Entity(label, [Attribute(a, AttributeType.STRING, True, True) for a in attributes])
+
+
+class TestOntologyLookup(unittest.TestCase):
+    """
+    Test label lookups stay consistent with the ontology as it changes
+    """
+
+    def setUp(self):
+        self.ontology = Ontology(
+            [_entity("Actor", "name"), _entity("Movie", "title")],
+            [Relation("ACTED_IN", "Actor", "Movie")],
+        )
+
+    def test_lookups(self):
+        self.assertEqual(self.ontology.get_entity_with_label("Actor").label, "Actor")
+        self.assertIsNone(self.ontology.get_entity_with_label("Director"))
+        self.assertTrue(self.ontology.has_entity_with_label("Movie"))
+        self.assertTrue(self.ontology.has_relation_with_label("ACTED_IN"))
+        self.assertEqual(len(self.ontology.get_relations_with_label("ACTED_IN")), 1)
+        self.assertIsNotNone(self.ontology.get_relation("ACTED_IN", "Actor", "Movie"))
+        self.assertIsNone(self.ontology.get_relation("ACTED_IN", "Movie", "Actor"))
+
+    def test_indexes_follow_mutations(self):
+        self.ontology.add_entity(_entity("Director", "name"))
+        self.ontology.add_relation(Relation("DIRECTED", "Director", "Movie"))
+        self.assertTrue(self.ontology.has_entity_with_label("Director"))
+        self.assertIsNotNone(self.ontology.get_relation("DIRECTED", "Director", "Movie"))
+
+        # Lists mutated or reassigned directly
+        self.ontology.entities.append(_entity("Studio", "name"))
+        self.assertTrue(self.ontology.has_entity_with_label("Studio"))
+
+        self.ontology.entities = [e for e in self.ontology.entities if e.label != "Actor"]
+        self.assertFalse(self.ontology.has_entity_with_label("Actor"))
+
+        self.ontology.discard_relations_without_entities()
+        self.assertFalse(self.ontology.has_relation_with_label("ACTED_IN"))
+        self.assertIsNone(self.ontology.get_relation("ACTED_IN", "Actor", "Movie"))
+
+    def test_indexes_follow_in_place_changes(self):
+        validator = self.ontology.validator()
+
+        # Replaced in place, the length is unchanged
+        self.ontology.entities[0] = _entity("Director", "name")
+        self.assertFalse(self.ontology.has_entity_with_label("Actor"))
+        self.assertTrue(self.ontology.has_entity_with_label("Director"))
+        self.assertIsNot(self.ontology.validator(), validator)
+
+        # Removed then added back, the length is unchanged
+        relation = self.ontology.relations[0]
+        self.ontology.relations.remove(relation)
+        self.ontology.relations.append(Relation("DIRECTED", "Director", "Movie"))
+        self.assertFalse(self.ontology.has_relation_with_label("ACTED_IN"))
+        self.assertIsNotNone(self.ontology.get_relation("DIRECTED", "Director", "Movie"))
+        self.assertIsNotNone(self.ontology.validator().relation("DIRECTED", "Director", "Movie"))
+
+    def test_first_entity_wins(self):
+        self.ontology.entities.append(_entity("Actor", "alias"))
+        self.assertEqual(self.ontology.get_entity_with_label("Actor").attributes[0].name, "name")
+
+    def test_merge_with(self):
+        other = Ontology(
+            [_entity("Actor", "born"), _entity("Director", "name")],
+            [Relation("ACTED_IN", "Actor", "Movie"), Relation("DIRECTED", "Director", "Movie")],
+        )
+        self.ontology.merge_with(other)
+
+        self.assertEqual([e.label for e in self.ontology.entities], ["Actor", "Movie", "Director"])
+        self.assertEqual(
+            [a.name for a in self.ontology.get_entity_with_label("Actor").attributes],
+            ["name", "born"],
+        )
+        self.assertEqual([r.label for r in self.ontology.relations], ["ACTED_IN", "DIRECTED"])
+        self.assertIsNotNone(self.ontology.get_relation("DIRECTED", "Director", "Movie"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+from graphrag_sdk.query_cache import GraphVersion, QueryResultCache, normalize_cypher
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.graph_writer import GraphWriter
+from tests.fakes import FakeConnection
+from types import SimpleNamespace
+import unittest
+
+
+class _CountingGraph:
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, q: str, params: dict = None, timeout: int = None):
+        self.queries.append(q)
+        return SimpleNamespace(result_set=[[len(self.queries)]])
+
+
+class TestQueryResultCache(unittest.TestCase):
+    """
+    Test caching query results per graph version
+    """
+
+    def setUp(self):
+        self.version = GraphVersion(FakeConnection(), "test")
+        self.graph = _CountingGraph()
+        self.cache = QueryResultCache(self.version)
+
+    def test_normalize_cypher(self):
+        self.assertEqual(
+            normalize_cypher("MATCH (a:Actor)\n  WHERE a.name = 'Tom  Hanks'\nRETURN a ;"),
+            "MATCH (a:Actor) WHERE a.name = 'Tom  Hanks' RETURN a",
+        )
+
+    def test_serves_repeated_queries(self):
+        first = self.cache.query(self.graph, "MATCH (a:Actor) RETURN a")
+        second = self.cache.query(self.graph, "MATCH (a:Actor)\nRETURN a")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.graph.queries), 1)
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_writes_invalidate_results(self):
+        self.cache.query(self.graph, "MATCH (a:Actor) RETURN a")
+
+        ontology = Ontology()
+        ontology.add_entity(
+            Entity("Actor", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+        writer = GraphWriter(self.graph, ontology, graph_version=self.version)
+        writer.add_entity({"label": "Actor", "attributes": {"name": "Tom Hanks"}})
+        writer.flush()
+        self.assertEqual(self.version.get(), 1)
+
+        # Flushing an empty writer does not invalidate anything
+        writer.flush()
+        self.assertEqual(self.version.get(), 1)
+
+        result = self.cache.query(self.graph, "MATCH (a:Actor) RETURN a")
+        self.assertEqual(result, [[3]])
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_write_queries_are_not_cached(self):
+        self.cache.query(self.graph, "MERGE (a:Actor {name: 'Tom Hanks'}) RETURN a")
+        self.cache.query(self.graph, "MERGE (a:Actor {name: 'Tom Hanks'}) RETURN a")
+
+        self.assertEqual(len(self.graph.queries), 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = QueryResultCache(self.version, max_size=2)
+        for q in ["RETURN 1", "RETURN 2", "RETURN 1", "RETURN 3", "RETURN 1"]:
+            cache.query(self.graph, q)
+
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.query_guard import QueryGuard
+from graphrag_sdk.steps.graph_query_step import GraphQueryGenerationStep
+from tests.fakes import CypherChatSession
+from falkordb.execution_plan import ExecutionPlan
+from types import SimpleNamespace
+import unittest
+
+CARTESIAN = "MATCH (a:Actor), (m:Movie) RETURN a, m"
+CONNECTED = "MATCH (a:Actor)-[:ACTED_IN]->(m:Movie) RETURN a, m"
+
+
+class _FakeGraph:
+    """
+    Graph planning a cartesian product for disconnected patterns
+    """
+
+    def __init__(self, timeout_on: str = None):
+        self.timeout_on = timeout_on
+        self.queries = []
+
+    def explain(self, q: str, params: dict = None) -> ExecutionPlan:
+        plan = ["Results", "    Project"]
+        if "," in q.split("RETURN")[0]:
+            plan += ["        Cartesian Product", "            Node By Label Scan | (a:Actor)"]
+        else:
+            plan += ["        Conditional Traverse | (a:Actor)->(m:Movie)"]
+        return ExecutionPlan(plan)
+
+    def query(self, q: str, params: dict = None, timeout: int = None):
+        self.queries.append((q, timeout))
+        if self.timeout_on is not None and self.timeout_on in q:
+            raise Exception("Query timed out")
+        return SimpleNamespace(result_set=[["Tom Hanks", "Forrest Gump"]])
+
+
+class TestQueryGuard(unittest.TestCase):
+    """
+    Test bounding and checking generated queries before they run
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ontology = Ontology(
+            [Entity("Actor", []), Entity("Movie", [])],
+            [Relation("ACTED_IN", "Actor", "Movie"), Relation("KNOWS", "Actor", "Actor")],
+        )
+
+    def test_bound_hops(self):
+        guard = QueryGuard(max_hops=4)
+        self.assertEqual(
+            guard.bound_hops("MATCH (a)-[*]-(b), (c)-[:KNOWS*2..]->(d) RETURN a"),
+            "MATCH (a)-[*1..4]-(b), (c)-[:KNOWS*2..4]->(d) RETURN a",
+        )
+        self.assertEqual(
+            guard.bound_hops("MATCH (a)-[:KNOWS*1..3]->(b) RETURN b"),
+            "MATCH (a)-[:KNOWS*1..3]->(b) RETURN b",
+        )
+        with self.assertRaisesRegex(Exception, "at most 4 hops"):
+            guard.bound_hops("MATCH (a)-[:KNOWS*1..10]->(b) RETURN b")
+
+    def test_limit(self):
+        guard = QueryGuard(max_rows=10)
+        self.assertEqual(
+            guard.limit("MATCH (a) RETURN a // all;"), "MATCH (a) RETURN a // all;\nLIMIT 10"
+        )
+        self.assertEqual(guard.limit("MATCH (a) RETURN a;"), "MATCH (a) RETURN a\nLIMIT 10")
+        self.assertEqual(guard.limit("MATCH (a) RETURN a LIMIT 500"), "MATCH (a) RETURN a LIMIT 10")
+        self.assertEqual(guard.limit("MATCH (a) RETURN a LIMIT 5"), "MATCH (a) RETURN a LIMIT 5")
+        self.assertEqual(
+            guard.limit("MATCH (a) WITH a LIMIT 5 RETURN a"),
+            "MATCH (a) WITH a LIMIT 5 RETURN a\nLIMIT 10",
+        )
+        self.assertEqual(
+            guard.limit("CALL { MATCH (a) RETURN a } RETURN a"),
+            "CALL { MATCH (a) RETURN a } RETURN a\nLIMIT 10",
+        )
+        union = "MATCH (a:Actor) RETURN a UNION MATCH (a:Movie) RETURN a"
+        self.assertEqual(guard.limit(union), union)
+        self.assertEqual(QueryGuard(max_rows=None).limit("MATCH (a) RETURN a"), "MATCH (a) RETURN a")
+
+    def test_check_plan(self):
+        guard = QueryGuard()
+        with self.assertRaisesRegex(Exception, "unbounded number of hops"):
+            guard.check_plan(
+                ExecutionPlan(
+                    [
+                        "Results",
+                        "    Conditional Variable Length Traverse | (a)-[@anon_0*1..INF]->(b)",
+                        "        All Node Scan | (a)",
+                    ]
+                )
+            )
+        with self.assertRaisesRegex(Exception, "cartesian product"):
+            guard.check(_FakeGraph(), CARTESIAN)
+        QueryGuard(allow_cartesian_products=True).check(_FakeGraph(), CARTESIAN)
+
+    def test_filtered_cartesian_product(self):
+        # Two anchored lookups, e.g. MATCH (a:Movie {title: 'A'}), (b:Movie {title: 'B'})
+        QueryGuard().check_plan(
+            ExecutionPlan(
+                [
+                    "Results",
+                    "    Project",
+                    "        Cartesian Product",
+                    "            Filter",
+                    "                Node By Label Scan | (a:Movie)",
+                    "            Node By Index Scan | (b:Movie)",
+                ]
+            )
+        )
+        with self.assertRaisesRegex(Exception, "cartesian product"):
+            QueryGuard().check_plan(
+                ExecutionPlan(
+                    [
+                        "Results",
+                        "    Project",
+                        "        Cartesian Product",
+                        "            Filter",
+                        "                Node By Label Scan | (a:Movie)",
+                        "            Conditional Traverse | (b)->(c)",
+                        "                All Node Scan | (b)",
+                    ]
+                )
+            )
+
+    def test_rejection_fed_back(self):
+        graph = _FakeGraph()
+        chat_session = CypherChatSession([CARTESIAN, CONNECTED])
+        step = GraphQueryGenerationStep(
+            graph=graph,
+            ontology=self.ontology,
+            chat_session=chat_session,
+            query_guard=QueryGuard(max_rows=20, timeout=1000),
+        )
+
+        (_, cypher) = step.run("Which actors played in which movies?")
+
+        self.assertEqual(cypher.strip(), CONNECTED + "\nLIMIT 20")
+        self.assertIn("cartesian product", chat_session.prompts[1])
+        self.assertEqual(graph.queries, [(cypher, 1000)])
+
+    def test_timeout_fed_back(self):
+        chat_session = CypherChatSession([CONNECTED, "MATCH (a:Actor) RETURN a"])
+        step = GraphQueryGenerationStep(
+            graph=_FakeGraph(timeout_on="ACTED_IN"),
+            ontology=self.ontology,
+            chat_session=chat_session,
+            query_guard=QueryGuard(timeout=1000),
+        )
+
+        step.run("Which actors played in which movies?")
+
+        self.assertIn("timed out after 1000 ms", chat_session.prompts[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+from graphrag_sdk.models.rate_limiter import (
+    RateLimiter,
+    InMemoryRateLimitBackend,
+    is_rate_limit_error,
+    retry_after,
+)
+from graphrag_sdk.metrics import InMemoryMetrics, set_metrics
+from types import SimpleNamespace
+import asyncio
+import unittest
+
+
+class _RateLimitError(Exception):
+    """
+    Provider error carrying an HTTP 429 response
+    """
+
+    def __init__(self, headers: dict = {}):
+        super().__init__("Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Test the adaptive rate limiter
+    """
+
+    def test_request_bucket(self):
+        backend = InMemoryRateLimitBackend()
+
+        for _ in range(3):
+            self.assertEqual(backend.reserve("m", 1, 0, 3, None), 0)
+
+        # Empty bucket, refilled at 3 requests per minute
+        wait = backend.reserve("m", 1, 0, 3, None)
+        self.assertGreater(wait, 19)
+        self.assertLessEqual(wait, 20)
+
+        # Other keys have their own buckets
+        self.assertEqual(backend.reserve("other", 1, 0, 3, None), 0)
+
+    def test_token_bucket(self):
+        backend = InMemoryRateLimitBackend()
+
+        self.assertEqual(backend.reserve("m", 1, 600, None, 1000), 0)
+        self.assertGreater(backend.reserve("m", 1, 600, None, 1000), 0)
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        self.assertLessEqual(backend.reserve("m", 1, 5000, None, 1000), 60)
+
+    def test_unlimited(self):
+        backend = InMemoryRateLimitBackend()
+
+        for _ in range(1000):
+            self.assertEqual(backend.reserve("m", 1, 1000, None, None), 0)
+
+    def test_detects_rate_limit_errors(self):
+        self.assertTrue(is_rate_limit_error(_RateLimitError()))
+        self.assertTrue(is_rate_limit_error(Exception("429 Quota exceeded for model")))
+        self.assertFalse(is_rate_limit_error(Exception("Invalid request")))
+
+        self.assertEqual(retry_after(_RateLimitError({"retry-after": "2"})), 2)
+        self.assertEqual(retry_after(_RateLimitError({"retry-after-ms": "250"})), 0.25)
+        self.assertIsNone(retry_after(_RateLimitError()))
+
+    def test_aimd(self):
+        limiter = RateLimiter(requests_per_minute=100)
+
+        limiter.on_rate_limited("m", 0.01)
+        limiter.on_rate_limited("m", 0.01)
+        self.assertEqual(limiter._state("m").factor, 0.25)
+
+        limiter.on_success("m")
+        self.assertAlmostEqual(limiter._state("m").factor, 0.30)
+        self.assertEqual(limiter._state("other").factor, 1.0)
+
+    def test_call_retries_rate_limited_requests(self):
+        limiter = RateLimiter(max_retries=2)
+        attempts = []
+
+        def send():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise _RateLimitError({"retry-after-ms": "10"})
+            return "response"
+
+        self.assertEqual(limiter.call("m", send), "response")
+        self.assertEqual(len(attempts), 3)
+
+    def test_waits_recorded_apart_from_calls(self):
+        metrics = InMemoryMetrics()
+        set_metrics(metrics)
+        try:
+            limiter = RateLimiter(max_retries=1)
+            attempts = []
+
+            def send():
+                attempts.append(1)
+                if len(attempts) < 2:
+                    raise _RateLimitError({"retry-after-ms": "50"})
+                return "response"
+
+            limiter.call("m", send)
+        finally:
+            set_metrics(None)
+
+        self.assertGreaterEqual(
+            metrics.summary()["graphrag.ratelimit.wait.duration"]["sum"], 0.04
+        )
+
+    def test_call_gives_up_after_max_retries(self):
+        limiter = RateLimiter(max_retries=2)
+        attempts = []
+
+        def send():
+            attempts.append(1)
+            raise _RateLimitError({"retry-after-ms": "10"})
+
+        with self.assertRaises(_RateLimitError):
+            limiter.call("m", send)
+        self.assertEqual(len(attempts), 3)
+
+    def test_acall_does_not_retry_other_errors(self):
+        limiter = RateLimiter()
+        attempts = []
+
+        async def send():
+            attempts.append(1)
+            raise ValueError("Invalid request")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(limiter.acall("m", send))
+        self.assertEqual(len(attempts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
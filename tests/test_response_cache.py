@@ -0,0 +1,81 @@
+from graphrag_sdk.models import (
+    GenerationResponse,
+    FinishReason,
+    InMemoryResponseCache,
+    SQLiteResponseCache,
+)
+from graphrag_sdk.models.openai import OpenAiGenerativeModel
+from types import SimpleNamespace
+import os
+import tempfile
+import unittest
+
+
+class _StubCompletions:
+    """
+    OpenAI completions stand-in echoing the last message
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model: str, messages: list, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content="echo: " + messages[-1]["content"]),
+                    finish_reason="stop",
+                )
+            ]
+        )
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test model response caching
+    """
+
+    def test_in_memory_lru(self):
+        cache = InMemoryResponseCache(max_size=2)
+        for key in ["a", "b", "c"]:
+            cache.set(key, GenerationResponse(key, FinishReason.STOP))
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c").text, "c")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_sqlite_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            cache = SQLiteResponseCache(path)
+            cache.set("key", GenerationResponse("text", FinishReason.MAX_TOKENS))
+            cache.close()
+
+            cache = SQLiteResponseCache(path)
+            response = cache.get("key")
+            cache.close()
+
+        self.assertEqual(response.text, "text")
+        self.assertEqual(response.finish_reason, FinishReason.MAX_TOKENS)
+
+    def test_chat_session_cache(self):
+        cache = InMemoryResponseCache()
+        completions = _StubCompletions()
+        model = OpenAiGenerativeModel("gpt-4o").with_response_cache(cache)
+        model.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        for _ in range(3):
+            session = model.start_chat()
+            first = session.send_message("hello")
+            second = session.send_message("continue")
+
+        self.assertEqual(first.text, "echo: hello")
+        self.assertEqual(second.text, "echo: continue")
+        self.assertEqual(completions.calls, 2)
+        self.assertEqual(cache.stats(), {"hits": 4, "misses": 2})
+        self.assertEqual(len(session._history), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
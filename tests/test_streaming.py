@@ -0,0 +1,137 @@
+from benchmarks.fake_model import FakeGenerativeModel, benchmark_ontology
+from graphrag_sdk.chat_session import ChatSession
+from graphrag_sdk.model_config import KnowledgeGraphModelConfig
+from graphrag_sdk.models import FinishReason, InMemoryResponseCache
+from graphrag_sdk.models.openai import OpenAiGenerativeModel
+from graphrag_sdk.fixtures.prompts import GRAPH_QA_SYSTEM
+from tests.fakes import RecordingGraph
+from types import SimpleNamespace
+import unittest
+
+
+def _consume(stream) -> object:
+    # Drains a stream, returning its return value
+    while True:
+        try:
+            next(stream)
+        except StopIteration as stop:
+            return stop.value
+
+
+class _StubStreamingCompletions:
+    """
+    OpenAI completions stand-in streaming the last message word by word
+    """
+
+    def __init__(self, finish_reason: str = "stop"):
+        self.calls = 0
+        self.finish_reason = finish_reason
+
+    def create(self, model: str, messages: list, stream: bool = False, **kwargs):
+        self.calls += 1
+        words = messages[-1]["content"].split(" ")
+        return iter(
+            [
+                SimpleNamespace(
+                    choices=[
+                        SimpleNamespace(
+                            delta=SimpleNamespace(content=word + " "), finish_reason=None
+                        )
+                    ]
+                )
+                for word in words
+            ]
+            # The final chunk carries no content
+            + [
+                SimpleNamespace(
+                    choices=[
+                        SimpleNamespace(
+                            delta=SimpleNamespace(content=None),
+                            finish_reason=self.finish_reason,
+                        )
+                    ]
+                )
+            ]
+        )
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Test streaming model responses
+    """
+
+    def test_openai_stream(self):
+        completions = _StubStreamingCompletions()
+        model = OpenAiGenerativeModel("gpt-4o")
+        model.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        session = model.start_chat()
+        chunks = list(session.send_message_stream("hello streaming world"))
+
+        self.assertEqual(chunks, ["hello ", "streaming ", "world "])
+        self.assertEqual(session._history[-1]["content"], "hello streaming world ")
+
+    def test_stream_is_cached(self):
+        cache = InMemoryResponseCache()
+        completions = _StubStreamingCompletions()
+        model = OpenAiGenerativeModel("gpt-4o").with_response_cache(cache)
+        model.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        list(model.start_chat().send_message_stream("hello streaming world"))
+        session = model.start_chat()
+        chunks = list(session.send_message_stream("hello streaming world"))
+
+        self.assertEqual(chunks, ["hello streaming world "])
+        self.assertEqual(completions.calls, 1)
+        self.assertEqual(len(session._history), 2)
+
+    def test_truncated_stream_not_cached(self):
+        cache = InMemoryResponseCache()
+        completions = _StubStreamingCompletions(finish_reason="length")
+        model = OpenAiGenerativeModel("gpt-4o").with_response_cache(cache)
+        model.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+        list(model.start_chat().send_message_stream("hello streaming world"))
+        list(model.start_chat().send_message_stream("hello streaming world"))
+
+        self.assertEqual(completions.calls, 2)
+
+    def test_stream_returns_finish_reason(self):
+        for (finish_reason, expected) in [
+            ("stop", FinishReason.STOP),
+            ("length", FinishReason.MAX_TOKENS),
+        ]:
+            model = OpenAiGenerativeModel("gpt-4o")
+            model.client = SimpleNamespace(
+                chat=SimpleNamespace(completions=_StubStreamingCompletions(finish_reason))
+            )
+
+            response = _consume(model.start_chat().send_message_stream("hello world"))
+
+            self.assertEqual(response.text, "hello world ")
+            self.assertEqual(response.finish_reason, expected)
+
+    def test_default_stream_yields_whole_response(self):
+        model = FakeGenerativeModel(answer_size=20).with_system_instruction(GRAPH_QA_SYSTEM)
+        session = model.start_chat()
+
+        self.assertEqual(
+            list(session.send_message_stream("Who is Tom Hanks?")),
+            [model.ask("Who is Tom Hanks?").text],
+        )
+
+    def test_chat_session_stream(self):
+        model = FakeGenerativeModel(answer_size=20)
+        chat_session = ChatSession(
+            KnowledgeGraphModelConfig.with_model(model),
+            benchmark_ontology(),
+            RecordingGraph(result_set=[["Person 1", "Person 2", 1999]]),
+        )
+
+        answer = "".join(chat_session.send_message_stream("Who does Person 1 know?"))
+
+        self.assertEqual(answer, "answer answer answer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+from benchmarks.fake_model import FakeGenerativeModel, benchmark_ontology
+from benchmarks.ingestion import SyntheticSource
+from graphrag_sdk.steps.extract_data_step import ExtractDataStep
+from tests.fakes import RecordingGraph
+from graphrag_sdk.task_log import TaskLog
+import os
+import json
+import tempfile
+import unittest
+
+
+class TestTaskLog(unittest.TestCase):
+    """
+    Test the structured task log of extraction steps
+    """
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.path = os.path.join(self._tmp.name, "logs", "tasks.jsonl")
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _records(self, path: str = None) -> list[dict]:
+        with open(path or self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def _step(self, task_log: TaskLog, documents: int = 3) -> ExtractDataStep:
+        return ExtractDataStep(
+            sources=[SyntheticSource(documents, 50)],
+            ontology=benchmark_ontology(),
+            model=FakeGenerativeModel(entities_per_document=2, relations_per_document=1),
+            graph=RecordingGraph(),
+            config={"max_workers": 2, "max_input_tokens": 500000},
+            task_log=task_log,
+        )
+
+    def test_tasks_share_a_buffered_file(self):
+        task_log = TaskLog(self.path, sample_rate=1)
+        step = self._step(task_log)
+        self.assertFalse(os.path.exists(os.path.dirname(self.path)))
+
+        step.run()
+
+        records = self._records()
+        self.assertEqual(len(set(r["task"] for r in records)), 3)
+        self.assertTrue(all(r["level"] == "DEBUG" for r in records))
+        self.assertTrue(any(r["message"].startswith("User message: ") for r in records))
+        task_log.close()
+
+    def test_defaults(self):
+        task_log = TaskLog()
+        self.assertEqual(task_log.path, os.path.join("logs", f"tasks.{os.getpid()}.jsonl"))
+        self.assertLess(task_log.sample_rate, 1)
+        task_log.close()
+
+    def test_unsampled_tasks_only_log_errors(self):
+        task_log = TaskLog(self.path, sample_rate=0)
+        task = task_log.task("task")
+        task.debug("Prompt: %s", "ignored")
+        task.error("Failed")
+        task_log.flush()
+
+        records = self._records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["task"], "task")
+        self.assertEqual(records[0]["message"], "Failed")
+        task_log.close()
+
+    def test_disabled(self):
+        task_log = TaskLog(self.path, enabled=False)
+        self._step(task_log).run()
+        task_log.task("task").error("Failed")
+        task_log.flush()
+
+        self.assertFalse(os.path.exists(os.path.dirname(self.path)))
+
+    def test_rotation(self):
+        task_log = TaskLog(self.path, max_bytes=1000, backup_count=2, sample_rate=1, buffer_size=1)
+        task = task_log.task("task")
+        for i in range(100):
+            task.debug("Message %d %s", i, "x" * 100)
+        task_log.close()
+
+        files = sorted(os.listdir(os.path.dirname(self.path)))
+        self.assertEqual(files, ["tasks.jsonl", "tasks.jsonl.1", "tasks.jsonl.2"])
+        self.assertTrue(self._records()[-1]["message"].startswith("Message 99 "))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+import unittest
+
+
+class TestValidation(unittest.TestCase):
+    """
+    Test the compiled ontology validators
+    """
+
+    def setUp(self):
+        self.ontology = Ontology(
+            [
+                Entity(
+                    "Actor",
+                    [
+                        Attribute("name", AttributeType.STRING, True, True),
+                        Attribute("age", AttributeType.NUMBER, False, False),
+                        Attribute("alive", AttributeType.BOOLEAN, False, False),
+                    ],
+                ),
+                Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)]),
+            ],
+            [
+                Relation(
+                    "ACTED_IN",
+                    "Actor",
+                    "Movie",
+                    [Attribute("role", AttributeType.STRING, False, False)],
+                )
+            ],
+        )
+
+    def test_validate_entity(self):
+        validator = self.ontology.validator()
+        validator.validate_entity("Actor", {"name": "Tom Hanks", "age": 68})
+
+        cases = [
+            ({"age": 68}, "Attribute name is required"),
+            ({"name": "Tom Hanks", "height": 183}, "Invalid attribute height"),
+            ({"name": "Tom Hanks", "age": "68"}, "Attribute age should be an number"),
+            ({"name": "Tom Hanks", "alive": 1}, "Attribute alive should be a boolean"),
+            ({"name": 1}, "Attribute name should be a string"),
+        ]
+        for attributes, error in cases:
+            with self.assertRaisesRegex(Exception, error):
+                validator.validate_entity("Actor", attributes)
+
+        with self.assertRaisesRegex(Exception, "Entity Director not found"):
+            validator.validate_entity("Director", {})
+
+    def test_validate_relation(self):
+        validator = self.ontology.validator()
+        validator.validate_relation(
+            "ACTED_IN", "Actor", "Movie", {"name": "Tom Hanks"}, {"title": "Big"}, {"role": "Josh"}
+        )
+        with self.assertRaisesRegex(Exception, "Relation ACTED_IN not found"):
+            validator.validate_relation("ACTED_IN", "Movie", "Actor", {}, {}, {})
+        with self.assertRaisesRegex(Exception, "Attribute title is required"):
+            validator.validate_relation("ACTED_IN", "Actor", "Movie", {"name": "Tom Hanks"}, {}, {})
+
+    def test_validate_many(self):
+        (entity_errors, relation_errors) = self.ontology.validator().validate_many(
+            [
+                {"label": "Actor", "attributes": {"name": "Tom Hanks"}},
+                {"label": "Movie", "attributes": {}},
+            ],
+            [
+                {
+                    "label": "ACTED_IN",
+                    "source": {"label": "Actor", "attributes": {"name": "Tom Hanks"}},
+                    "target": {"label": "Movie", "attributes": {"title": "Big"}},
+                    "attributes": {"role": 1},
+                }
+            ],
+        )
+        self.assertEqual(entity_errors, [None, "Attribute title is required"])
+        self.assertEqual(relation_errors, ["Attribute role should be a string"])
+
+    def test_split_normalizes(self):
+        validator = self.ontology.validator().entity("Actor")
+        (unique, others) = validator.split(
+            {"age": "68", "alive": "True", "height": 183, "name": None}
+        )
+        self.assertEqual(unique, {"name": ""})
+        self.assertEqual(others, {"age": 68, "alive": True})
+
+        # Conversions are only made when lossless
+        (_, others) = validator.split({"name": "Tom Hanks", "age": "sixty"})
+        self.assertEqual(others, {"age": "sixty"})
+
+    def test_recompiled_on_change(self):
+        validator = self.ontology.validator()
+        self.assertIs(self.ontology.validator(), validator)
+        self.assertIsNone(validator.entity("Director"))
+
+        self.ontology.add_entity(
+            Entity("Director", [Attribute("name", AttributeType.STRING, True, True)])
+        )
+        self.assertIsNot(self.ontology.validator(), validator)
+        self.assertIsNotNone(self.ontology.validator().entity("Director"))
+
+        self.ontology.merge_with(
+            Ontology([], [Relation("DIRECTED", "Director", "Movie")])
+        )
+        self.assertIsNotNone(self.ontology.validator().relation("DIRECTED", "Director", "Movie"))
+
+
+if __name__ == "__main__":
+    unittest.main()
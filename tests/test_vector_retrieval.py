@@ -0,0 +1,137 @@
+from graphrag_sdk.ontology import Ontology
+from graphrag_sdk.entity import Entity
+from graphrag_sdk.relation import Relation
+from graphrag_sdk.attribute import Attribute, AttributeType
+from graphrag_sdk.graph_writer import GraphWriter
+from graphrag_sdk.models import HashingEmbeddingModel
+from graphrag_sdk.models.embedding import cosine_similarity
+from graphrag_sdk.steps.vector_retrieval_step import VectorRetrievalStep
+from graphrag_sdk.vector_index import EMBEDDING_ATTRIBUTE
+from falkordb import Node, Edge
+from types import SimpleNamespace
+import unittest
+
+
+class _VectorGraph:
+    """
+    Graph stand-in serving vector searches from the embeddings written to it
+    """
+
+    def __init__(self):
+        self.nodes: dict[int, Node] = {}
+        self.vectors: dict[int, list[float]] = {}
+        self.queries = []
+
+    def query(self, q: str, params: dict = None):
+        self.queries.append((q, params))
+        if q.startswith("CALL db.indexes()"):
+            return SimpleNamespace(result_set=[["Actor", ["name"], {"name": ["RANGE"]}, "NODE"]])
+        if "MERGE" in q:
+            for row in params["rows"]:
+                id = len(self.nodes)
+                properties = {**row["unique"], **row["attributes"]}
+                properties[EMBEDDING_ATTRIBUTE] = row["embedding"]
+                self.nodes[id] = Node(id, labels=["Actor"], properties=properties)
+                self.vectors[id] = row["embedding"]
+            return SimpleNamespace(result_set=[])
+        if "db.idx.vector.queryNodes" in q:
+            hits = [
+                [id, 1 - cosine_similarity(vector, params["vector"])]
+                for id, vector in self.vectors.items()
+            ]
+            return SimpleNamespace(result_set=hits)
+        if "UNWIND $ids" in q:
+            movie = Node(100, labels=["Movie"], properties={"title": "Big"})
+            return SimpleNamespace(
+                result_set=[
+                    [self.nodes[id], Edge(self.nodes[id], "ACTED_IN", movie), movie]
+                    for id in params["ids"]
+                ]
+            )
+        return SimpleNamespace(result_set=[])
+
+
+class TestVectorRetrieval(unittest.TestCase):
+    """
+    Test embedding entities at ingest and retrieving them by similarity
+    """
+
+    def setUp(self):
+        self.ontology = Ontology(
+            [
+                Entity(
+                    "Actor",
+                    [
+                        Attribute("name", AttributeType.STRING, True, True),
+                        Attribute("description", AttributeType.STRING, False, False),
+                    ],
+                ),
+                Entity("Movie", [Attribute("title", AttributeType.STRING, True, True)]),
+            ],
+            [Relation("ACTED_IN", "Actor", "Movie")],
+        )
+        self.embedding_model = HashingEmbeddingModel(64)
+        self.graph = _VectorGraph()
+
+    def _ingest(self):
+        writer = GraphWriter(self.graph, self.ontology, embedding_model=self.embedding_model)
+        for name in ["Tom Hanks", "Meg Ryan", "Kevin Bacon"]:
+            writer.add_entity(
+                {"label": "Actor", "attributes": {"name": name, "description": "An actor"}}
+            )
+        writer.flush()
+
+    def test_entities_embedded_at_ingest(self):
+        self._ingest()
+        (query, params) = self.graph.queries[0]
+        self.assertIn(f"n.`{EMBEDDING_ATTRIBUTE}` = vecf32(row.embedding)", query)
+        self.assertEqual(
+            params["rows"][0]["embedding"],
+            self.embedding_model.embed(["Tom Hanks. An actor"])[0],
+        )
+
+    def test_ensure_vector_indexes(self):
+        self.assertEqual(
+            self.ontology.ensure_vector_indexes(self.graph, 64),
+            [f"VECTOR INDEX Actor({EMBEDDING_ATTRIBUTE})", f"VECTOR INDEX Movie({EMBEDDING_ATTRIBUTE})"],
+        )
+        self.assertIn("OPTIONS {dimension: 64, similarityFunction: 'cosine'}", self.graph.queries[-1][0])
+
+    def test_retrieve_neighborhood(self):
+        self._ingest()
+        step = VectorRetrievalStep(
+            self.graph, self.ontology, self.embedding_model, {"top_k": 1, "max_distance": 0.5}
+        )
+
+        (context, query) = step.run("tom hanks")
+
+        self.assertIn("Actor#0{name: Tom Hanks, description: An actor}", context)
+        self.assertIn("ACTED_IN", context)
+        self.assertNotIn("Meg Ryan", context)
+        self.assertNotIn(EMBEDDING_ATTRIBUTE, context)
+        self.assertEqual(self.graph.queries[-1][0], query)
+
+    def test_nothing_close_enough(self):
+        self._ingest()
+        step = VectorRetrievalStep(
+            self.graph, self.ontology, self.embedding_model, {"max_distance": 0.1}
+        )
+        self.assertEqual(step.run("Which movies were released in 1999?"), (None, None))
+
+    def test_far_entities_not_retrieved_by_default(self):
+        self._ingest()
+        step = VectorRetrievalStep(self.graph, self.ontology, self.embedding_model)
+        self.assertEqual(step.run("How many movies are longer than two hours?"), (None, None))
+
+    def test_missing_vector_index(self):
+        self._ingest()
+        graph = _VectorGraph()
+        graph.query = lambda q, params=None: (_ for _ in ()).throw(
+            Exception("Invalid arguments for procedure 'db.idx.vector.queryNodes'")
+        )
+        step = VectorRetrievalStep(graph, self.ontology, self.embedding_model)
+        self.assertEqual(step.run("tom hanks"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()